@@ -40,18 +40,50 @@ if setup_incomplete:
 
 # --- Original code continues below ---
 
+import json
+import time
+import zlib
+import struct
 import zipfile
 import argparse
+import threading
+from collections import deque
+from contextlib import nullcontext
 import traceback  # always imported for global error handling
+from io import BytesIO
 from pathlib import Path
 import re
 #below are the deffered imports. they are imported only if needed for performance
 #from natsort import natsorted
-#from PIL import Image, UnidentifiedImageError
+#from PIL import Image
 #from tqdm import tqdm
 #from launcherlib.dialogs import ask_directory
+#from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+# Pages in these formats are already compressed; deflating them only costs time.
+# Everything else (PNG, BMP, TIFF, ...) is deflated at --compress-level.
+STORED_EXTS = ('.jpg', '.jpeg', '.webp')
+DEFAULT_COMPRESS_LEVEL = 6
+DEFAULT_THREADS = min(4, os.cpu_count() or 1)
+
+# Optional transcoding (--format/--quality/--max-dim/--grayscale)
+TRANSCODE_FORMATS = {"webp": ("WEBP", ".webp"), "jpeg": ("JPEG", ".jpg")}
+DEFAULT_QUALITY = 85
+GRAYSCALE_TOLERANCE = 8  # max channel difference still treated as gray (JPEG noise on scans)
+
+# ComicInfo.xml page metadata, so readers can lay out pages without decoding them
+COMICINFO_NAME = "ComicInfo.xml"
+HEADER_READ_BYTES = 64 * 1024  # enough for the size field of nearly every JPEG/PNG/WebP header
+
+VERIFY_REPORT = "cbz_verify.json"  # Default --verify report, written to the output folder
+
+# write_packed_member bypasses zipfile's public API; only trust it on these CPython versions
+PACKED_WRITE_VERSIONS = ((3, 8), (3, 13))
 
 # --------------------- Helper Functions ---------------------
+_log_lock = threading.Lock()  # --jobs workers share one log file
+
+
 def log_message(logfile, level, msg, log_levels=None):
     if logfile:
         if log_levels and level.upper() not in log_levels:
@@ -61,10 +93,11 @@ def log_message(logfile, level, msg, log_levels=None):
             if not logfile_path.parent.exists():
                 print(f"[ERROR] Invalid log path: {logfile_path.parent}")
                 return
-            if not logfile_path.exists():
-                logfile_path.touch()
-            with open(logfile_path, "a", encoding="utf-8") as f:
-                f.write(f"[{level}] {msg}\n")
+            with _log_lock:
+                if not logfile_path.exists():
+                    logfile_path.touch()
+                with open(logfile_path, "a", encoding="utf-8") as f:
+                    f.write(f"[{level}] {msg}\n")
         except Exception:
             pass
 
@@ -74,11 +107,12 @@ def natsorted_images(folder, exts):
     return natsorted([f for f in os.listdir(folder) if f.lower().endswith(exts)])
 
 
-def sanitize_name(path: Path):
+def sanitize_name(path: Path, reserved=None):
+    """Append _1, _2, ... until the name is free on disk and not in reserved."""
     base, ext = os.path.splitext(path.name)
     parent = path.parent
     n = 1
-    while (parent / f"{base}_{n}{ext}").exists():
+    while (parent / f"{base}_{n}{ext}").exists() or (reserved and parent / f"{base}_{n}{ext}" in reserved):
         n += 1
     return parent / f"{base}_{n}{ext}"
 
@@ -101,71 +135,442 @@ def validate_extensions(ext_string):
 
 
 # --------------------- BMP Conversion ---------------------
-def convert_bmp_safe(folder, silent, debug, logfile, log_levels=None):
-    from PIL import Image, UnidentifiedImageError
+BMP_COLLISION_POLICIES = ("sanitize", "skip", "overwrite")
+
+
+def convert_bmp_file(bmp_path, png_path):
+    """
+    Convert one BMP to PNG and delete the BMP; runs in a worker process.
+    Returns None on success, else (message, traceback text) for the main process to report.
+    """
+    from PIL import Image
+
+    try:
+        with Image.open(bmp_path) as img:
+            if img.mode in ("RGBA", "LA"):
+                img = img.convert("RGBA")
+            elif img.mode == "P" and "transparency" in img.info:
+                img = img.convert("RGBA")
+            else:
+                img = img.convert("RGB")
+            dpi = img.info.get("dpi", (600, 600))
+            img.save(png_path, format="PNG", dpi=dpi)
+        os.remove(bmp_path)
+        return None
+    except Exception as e:
+        return str(e) or type(e).__name__, traceback.format_exc()
+
+
+def convert_bmp_safe(folder, silent, debug, logfile, log_levels=None, collision="sanitize"):
+    """
+    Convert every BMP under folder (chapter subfolders included) to PNG in a
+    process pool. PNG names are decided up front, so an existing PNG is handled
+    by the collision policy (sanitize, skip or overwrite) and never prompts.
+    """
+    from concurrent.futures import ProcessPoolExecutor
 
     folder = Path(folder)
-    bmp_files = [f for f in folder.iterdir() if f.suffix.lower() == ".bmp"]
+    bmp_files = sorted(f for f in folder.rglob("*") if f.suffix.lower() == ".bmp" and f.is_file())
+    if not bmp_files:
+        return
 
+    plan = []
+    reserved = set()
     for bmp_path in bmp_files:
         png_path = bmp_path.with_suffix(".png")
 
-        if png_path.exists():
-            while True:
-                choice = input(
-                    f"⚠️ PNG already exists for {bmp_path.name}: {png_path.name}\n"
-                    "Choose action: [s]anitize and continue, [c]ancel this conversion: "
-                ).strip().lower()
-                if choice == 's':
-                    n = 1
-                    while True:
-                        new_png = png_path.with_name(f"{png_path.stem}_{n}{png_path.suffix}")
-                        if not new_png.exists():
-                            png_path = new_png
-                            break
-                        n += 1
-                    if not silent:
-                        print(f"[WARNING] Sanitized PNG name: {png_path.name}")
-                    log_message(logfile, "WARNING", f"Sanitized PNG name: {png_path.name}", log_levels)
-                    break
-                elif choice == 'c':
-                    if not silent:
-                        print(f"[WARNING] Skipped BMP conversion: {bmp_path.name}")
-                    log_message(logfile, "WARNING", f"Skipped BMP conversion: {bmp_path.name}", log_levels)
-                    png_path = None
-                    break
-                else:
-                    print("Invalid choice. Enter 's' to sanitize or 'c' to cancel.")
-
-        if not png_path:
-            continue
+        if png_path.exists() or png_path in reserved:
+            if collision == "skip":
+                if not silent:
+                    print(f"[WARNING] Skipped BMP conversion: {bmp_path.name} ({png_path.name} exists)")
+                log_message(logfile, "WARNING", f"Skipped BMP conversion: {bmp_path}", log_levels)
+                continue
+            if collision == "overwrite" and png_path not in reserved:
+                if not silent:
+                    print(f"[WARNING] Overwriting PNG: {png_path.name}")
+                log_message(logfile, "WARNING", f"Overwriting PNG: {png_path}", log_levels)
+            else:
+                png_path = sanitize_name(png_path, reserved)
+                if not silent:
+                    print(f"[WARNING] Sanitized PNG name: {png_path.name}")
+                log_message(logfile, "WARNING", f"Sanitized PNG name: {png_path}", log_levels)
+
+        reserved.add(png_path)
+        plan.append((bmp_path, png_path))
 
-        try:
-            with Image.open(bmp_path) as img:
-                if img.mode in ("RGBA", "LA"):
-                    img = img.convert("RGBA")
-                elif img.mode == "P" and "transparency" in img.info:
-                    img = img.convert("RGBA")
-                else:
-                    img = img.convert("RGB")
-                dpi = img.info.get("dpi", (600, 600))
-                img.save(png_path, format="PNG", dpi=dpi)
-            os.remove(bmp_path)
+    if not plan:
+        return
+
+    workers = min(len(plan), os.cpu_count() or 1)
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            errors = list(executor.map(convert_bmp_file, *zip(*plan)))
+    else:
+        errors = [convert_bmp_file(bmp_path, png_path) for bmp_path, png_path in plan]
+
+    for (bmp_path, png_path), error in zip(plan, errors):
+        if error is None:
             if not silent:
                 print(f"[SUCCESS] Converted {bmp_path.name} → {png_path.name}")
-            log_message(logfile, "SUCCESS", f"Converted {bmp_path.name} → {png_path.name}", log_levels)
-        except Exception as e:
+            log_message(logfile, "SUCCESS", f"Converted {bmp_path} → {png_path.name}", log_levels)
+        else:
+            message, tb = error
             if debug and not silent:
-                traceback.print_exc()
+                print(tb, end="")
             elif not silent:
-                print(f"[ERROR] Failed conversion {bmp_path.name}: {e}")
-            log_message(logfile, "ERROR", f"Failed conversion {bmp_path.name}: {e}", log_levels)
+                print(f"[ERROR] Failed conversion {bmp_path.name}: {message}")
+            log_message(logfile, "ERROR", f"Failed conversion {bmp_path}: {message}", log_levels)
+
+
+# --------------------- Member Packing ---------------------
+def pack_member(path, arcname, compress_level):
+    """
+    Read and compress one page; runs in a worker thread (zlib releases the GIL).
+    Returns (zinfo, packed_bytes) ready for write_packed_member.
+    """
+    zinfo = zipfile.ZipInfo.from_file(path, arcname)
+    with open(path, "rb") as f:
+        data = f.read()
+    return pack_bytes(zinfo, data, compress_level)
+
+
+def pack_bytes(zinfo, data, compress_level):
+    """Compress data for zinfo following the STORED_EXTS policy. Returns (zinfo, packed_bytes)."""
+    arcname = zinfo.filename
+    zinfo.file_size = len(data)
+    zinfo.CRC = zlib.crc32(data)
+
+    if compress_level and not arcname.lower().endswith(STORED_EXTS):
+        compressor = zlib.compressobj(compress_level, zlib.DEFLATED, -15)  # raw deflate stream, as zip stores it
+        packed = compressor.compress(data) + compressor.flush()
+        if len(packed) < len(data):
+            zinfo.compress_type = zipfile.ZIP_DEFLATED
+            return zinfo, packed
+
+    zinfo.compress_type = zipfile.ZIP_STORED
+    return zinfo, data
+
+
+# --------------------- Transcoding ---------------------
+def transcode_arcnames(images, options):
+    """Archive names after transcoding; a name taken twice (a.jpeg and a.jpg → a.jpg) gets _1, _2..."""
+    if not options["format"]:
+        return list(images)
+    ext = TRANSCODE_FORMATS[options["format"]][1]
+    names, taken = [], set()
+    for img in images:
+        stem = os.path.splitext(img)[0]
+        name, n = stem + ext, 1
+        while name.lower() in taken:
+            name = f"{stem}_{n}{ext}"
+            n += 1
+        taken.add(name.lower())
+        names.append(name)
+    return names
+
+
+def is_grayscale(img):
+    """True if an RGB page only carries gray values (within GRAYSCALE_TOLERANCE)."""
+    from PIL import ImageChops
+    r, g, b = img.split()
+    return all(ImageChops.difference(x, y).getextrema()[1] <= GRAYSCALE_TOLERANCE for x, y in ((r, g), (g, b)))
+
+
+def transcode_member(path, arcname, compress_level, options):
+    """
+    Downscale / re-encode one page in memory and pack it; runs in a worker process.
+    The original bytes are kept when re-encoding in the same format would not make
+    the page smaller, and when the page cannot be decoded at all (it then keeps its
+    own extension). Returns ((zinfo, packed_bytes), bytes_saved, error) where error
+    is None or the decode failure for the main process to report.
+    """
+    from io import BytesIO
+    from PIL import Image
+
+    st = os.stat(path)
+    with open(path, "rb") as f:
+        original = f.read()
+
+    try:
+        img = Image.open(BytesIO(original))
+        img.load()
+    except Exception as e:
+        arcname = os.path.splitext(arcname)[0] + os.path.splitext(path)[1]  # stems are unique, so is this name
+        zinfo = zipfile.ZipInfo(arcname, zip_date_time(st.st_mtime))
+        zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+        return pack_bytes(zinfo, original, compress_level), 0, f"cannot decode {os.path.basename(path)}: {e}"
+
+    with img:
+        src_format = img.format
+        target_format = TRANSCODE_FORMATS[options["format"]][0] if options["format"] else src_format
+        out = img
+        downscaled = False
+
+        max_dim = options["max_dim"]
+        if max_dim and max(img.size) > max_dim:
+            out = img.copy()
+            out.thumbnail((max_dim, max_dim), Image.LANCZOS)
+            downscaled = True
+
+        if out.mode not in ("L", "RGB", "RGBA"):
+            has_alpha = out.mode in ("LA", "PA") or "transparency" in out.info
+            out = out.convert("RGBA" if has_alpha else "RGB")
+        if target_format == "JPEG" and out.mode == "RGBA":
+            background = Image.new("RGB", out.size, (255, 255, 255))
+            background.paste(out, mask=out.getchannel("A"))
+            out = background
+        if options["grayscale"] and out.mode == "RGB" and is_grayscale(out):
+            out = out.convert("L")
+
+        save_args = {}
+        if target_format == "JPEG":
+            save_args = {"quality": options["quality"], "optimize": True}
+        elif target_format == "WEBP":
+            save_args = {"quality": options["quality"], "method": 4}
+        buffer = BytesIO()
+        out.save(buffer, format=target_format, **save_args)
+        data = buffer.getvalue()
+
+    if len(data) >= len(original) and not downscaled and target_format == src_format:
+        data = original
+
+    zinfo = zipfile.ZipInfo(arcname, zip_date_time(st.st_mtime))
+    zinfo.external_attr = (st.st_mode & 0xFFFF) << 16
+    return pack_bytes(zinfo, data, compress_level), len(original) - len(data), None
+
+
+def format_bytes(n):
+    for unit in ("B", "KB", "MB"):
+        if abs(n) < 1024:
+            return f"{n:.1f} {unit}" if unit != "B" else f"{n} B"
+        n /= 1024
+    return f"{n:.1f} GB"
+
+
+# --------------------- ComicInfo.xml ---------------------
+def page_dimensions(zinfo, packed):
+    """
+    Width and height of a packed page, read from its image header only (no
+    decode). Only the first HEADER_READ_BYTES are inflated unless the header
+    lies further in. Returns (0, 0) if the header cannot be read.
+    """
+    from PIL import Image
+
+    def header_size(data):
+        try:
+            with Image.open(BytesIO(data)) as img:
+                return img.size
+        except Exception:
+            return None
+
+    if zinfo.compress_type == zipfile.ZIP_DEFLATED:
+        head = zlib.decompressobj(-15).decompress(packed, HEADER_READ_BYTES)
+    else:
+        head = packed[:HEADER_READ_BYTES]
+    size = header_size(head)
+    if size is None and len(head) < zinfo.file_size:
+        size = header_size(zlib.decompress(packed, -15) if zinfo.compress_type == zipfile.ZIP_DEFLATED else packed)
+    return size or (0, 0)
+
+
+def comicinfo_xml(title, pages):
+    """
+    Build ComicInfo.xml bytes. pages is a list of (arcname, byte_size, width, height)
+    in reading order; pages wider than tall are flagged as double pages.
+    """
+    import xml.etree.ElementTree as ET
+
+    root = ET.Element("ComicInfo", {
+        "xmlns:xsd": "http://www.w3.org/2001/XMLSchema",
+        "xmlns:xsi": "http://www.w3.org/2001/XMLSchema-instance",
+    })
+    ET.SubElement(root, "Title").text = title
+    ET.SubElement(root, "PageCount").text = str(len(pages))
+    pages_el = ET.SubElement(root, "Pages")
+    for i, (arcname, byte_size, width, height) in enumerate(pages):
+        attrs = {"Image": str(i), "ImageSize": str(byte_size), "Key": arcname}
+        if width and height:
+            attrs["ImageWidth"] = str(width)
+            attrs["ImageHeight"] = str(height)
+            if width > height:
+                attrs["DoublePage"] = "true"
+        if i == 0:
+            attrs["Type"] = "FrontCover"
+        ET.SubElement(pages_el, "Page", attrs)
+    ET.indent(root)
+    return ET.tostring(root, encoding="utf-8", xml_declaration=True)
+
+
+def write_comicinfo(cbz, title, pages):
+    """Add ComicInfo.xml as the last member of an archive open for writing."""
+    zinfo = zipfile.ZipInfo(COMICINFO_NAME, time.localtime()[:6])
+    zinfo.external_attr = 0o644 << 16
+    write_packed_member(cbz, *pack_bytes(zinfo, comicinfo_xml(title, pages), DEFAULT_COMPRESS_LEVEL))
+
+
+def packed_write_supported(cbz):
+    """
+    True if cbz exposes the ZipFile internals write_packed_member relies on.
+    They are private, so the fast path is limited to CPython versions whose
+    ZipFile._open_to_write it was checked against.
+    """
+    return (
+        sys.implementation.name == "cpython"
+        and PACKED_WRITE_VERSIONS[0] <= sys.version_info[:2] <= PACKED_WRITE_VERSIONS[1]
+        and getattr(cbz, "_seekable", False)
+        and not getattr(cbz, "_writing", True)
+        and all(hasattr(cbz, attr) for attr in ("_lock", "fp", "start_dir", "_writecheck", "_didModify", "filelist", "NameToInfo"))
+    )
+
+
+def write_packed_member(cbz, zinfo, packed, compress_level=DEFAULT_COMPRESS_LEVEL):
+    """
+    Append an already compressed member to an open ZipFile.
+    zipfile has no public API for this, so this mirrors ZipFile._open_to_write;
+    where that is not known to be safe the member is inflated again and
+    written with writestr at compress_level.
+    """
+    if not packed_write_supported(cbz):
+        data = zlib.decompress(packed, -15) if zinfo.compress_type == zipfile.ZIP_DEFLATED else packed
+        cbz.writestr(zinfo, data, compress_type=zinfo.compress_type, compresslevel=compress_level or None)
+        return
+
+    zinfo.compress_size = len(packed)
+    zinfo.flag_bits = 0x00
+    if not zinfo.external_attr:
+        zinfo.external_attr = 0o600 << 16
+    zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+
+    with cbz._lock:
+        cbz.fp.seek(cbz.start_dir)
+        zinfo.header_offset = cbz.fp.tell()
+        cbz._writecheck(zinfo)
+        cbz._didModify = True
+        cbz.fp.write(zinfo.FileHeader(zip64))
+        cbz.fp.write(packed)
+        cbz.start_dir = cbz.fp.tell()
+        cbz.filelist.append(zinfo)
+        cbz.NameToInfo[zinfo.filename] = zinfo
+
+
+def zip_date_time(mtime):
+    """date_time tuple as stored in a zip header (local time, 2-second resolution)."""
+    t = time.localtime(mtime)
+    return (t.tm_year, t.tm_mon, t.tm_mday, t.tm_hour, t.tm_min, t.tm_sec // 2 * 2)
+
+
+def read_packed_member(cbz_path, zinfo):
+    """Return the compressed bytes of one member exactly as stored, without decompressing."""
+    with open(cbz_path, "rb") as f:
+        f.seek(zinfo.header_offset)
+        header = f.read(zipfile.sizeFileHeader)
+        if header[:4] != zipfile.stringFileHeader:
+            raise zipfile.BadZipFile(f"Bad local header for {zinfo.filename}")
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        f.seek(name_len + extra_len, os.SEEK_CUR)
+        return f.read(zinfo.compress_size)
+
+
+def copy_member_info(old_info, date_time=None):
+    """Fresh ZipInfo carrying an existing member's sizes, CRC and compression."""
+    zinfo = zipfile.ZipInfo(old_info.filename, date_time or old_info.date_time)
+    zinfo.compress_type = old_info.compress_type
+    zinfo.external_attr = old_info.external_attr
+    zinfo.file_size = old_info.file_size
+    zinfo.CRC = old_info.CRC
+    return zinfo
+
+
+def member_unchanged(old_info, st):
+    """Fast check against the central directory: same size and same mtime."""
+    return (old_info is not None and not old_info.flag_bits & 0x1  # encrypted members are always repacked
+            and old_info.file_size == st.st_size
+            and old_info.date_time == zip_date_time(st.st_mtime))
+
+
+def refresh_member(path, arcname, old_info, old_cbz, compress_level):
+    """
+    Reuse the archived bytes of a page when it has not changed, otherwise pack it again.
+    A page with the same size but a new mtime is compared by CRC before repacking.
+    Returns ((zinfo, packed), changed).
+    """
+    st = os.stat(path)
+    if member_unchanged(old_info, st):
+        return (copy_member_info(old_info), read_packed_member(old_cbz, old_info)), False
+
+    if old_info is not None and not old_info.flag_bits & 0x1 and old_info.file_size == st.st_size:
+        with open(path, "rb") as f:
+            crc = zlib.crc32(f.read())
+        if crc == old_info.CRC:
+            # Same content; store the new mtime so the next update takes the fast path
+            zinfo = copy_member_info(old_info, zip_date_time(st.st_mtime))
+            return (zinfo, read_packed_member(old_cbz, old_info)), False
+
+    return pack_member(path, arcname, compress_level), True
+
+
+def ordered_results(executor, fn, tasks, window):
+    """
+    Like executor.map, but keeps at most window tasks in flight so a big
+    chapter is never held in memory all at once. Results come back in order.
+    """
+    pending = deque()
+    for task in tasks:
+        pending.append(executor.submit(fn, *task))
+        if len(pending) >= window:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
 
 
 # --------------------- CBZ Creation ---------------------
-def create_cbz(folder, output_dir, exts, silent, debug, logfile, overwrite=False, log_levels=None):
+def plan_cbz_path(folder, output_dir, silent, logfile, overwrite=False, log_levels=None, reserved=None,
+                  update=False):
+    """
+    Decide the output path for folder's CBZ, handling collisions.
+    Names already handed out in this run (reserved) are never reused, so
+    planning every folder up front keeps parallel runs deterministic.
+    With update, an existing CBZ keeps its name and is refreshed in place.
+    """
+    cbz_name = Path(folder).name + ".cbz"
+    cbz_path = Path(output_dir) / cbz_name
+    taken_this_run = reserved is not None and cbz_path in reserved
+
+    if cbz_path.exists() or taken_this_run:
+        if update and not taken_this_run:
+            pass
+        elif overwrite and not taken_this_run:
+            if not silent:
+                print(f"[WARNING] Overwriting existing CBZ: {cbz_path.name}")
+            log_message(logfile, "WARNING", f"Overwriting existing CBZ: {cbz_path.name}", log_levels)
+        else:
+            cbz_path = sanitize_name(cbz_path, reserved)
+            if not silent:
+                print(f"[WARNING] CBZ collision: {cbz_name} → {cbz_path.name}")
+            log_message(logfile, "WARNING", f"CBZ collision: {cbz_name} → {cbz_path.name}", log_levels)
+
+    if reserved is not None:
+        reserved.add(cbz_path)
+    return cbz_path
+
+
+def create_cbz(folder, output_dir, exts, silent, debug, logfile, overwrite=False, log_levels=None,
+               cbz_path=None, progress=None, compress_level=DEFAULT_COMPRESS_LEVEL, threads=DEFAULT_THREADS,
+               update=False, transcode=None, comicinfo=True, transcode_pool=None):
+    """
+    Build one CBZ from folder. cbz_path skips collision handling when the path
+    was already planned; progress(n) replaces the per-archive progress bar.
+    Pages are read and compressed by `threads` worker threads and written in order.
+    With update, an existing CBZ is refreshed by update_cbz instead of rebuilt.
+    With transcode options, pages are re-encoded in a process pool instead and
+    streamed straight into the archive; transcode_pool shares one pool across
+    CBZs (it is left running), otherwise a pool is created for this CBZ.
+    With comicinfo, a ComicInfo.xml with page sizes read from the packed image
+    headers is added at the end.
+    """
     from natsort import natsorted
-    if not silent:
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+    if not silent and progress is None:
         from tqdm import tqdm
 
     try:
@@ -176,23 +581,50 @@ def create_cbz(folder, output_dir, exts, silent, debug, logfile, overwrite=False
             log_message(logfile, "WARNING", f"No images found in folder: {folder}", log_levels)
             return None
 
-        cbz_name = Path(folder).name + ".cbz"
-        cbz_path = Path(output_dir) / cbz_name
+        if cbz_path is None:
+            cbz_path = plan_cbz_path(folder, output_dir, silent, logfile, overwrite, log_levels, update=update)
 
-        if cbz_path.exists():
-            if overwrite:
-                if not silent:
-                    print(f"[WARNING] Overwriting existing CBZ: {cbz_path.name}")
-                log_message(logfile, "WARNING", f"Overwriting existing CBZ: {cbz_path.name}", log_levels)
-            else:
-                cbz_path = sanitize_name(cbz_path)
-                if not silent:
-                    print(f"[WARNING] CBZ collision: {cbz_name} → {cbz_path.name}")
-                log_message(logfile, "WARNING", f"CBZ collision: {cbz_name} → {cbz_path.name}", log_levels)
+        if update and cbz_path.exists():
+            return update_cbz(folder, images, cbz_path, silent, logfile, log_levels, progress, compress_level, threads,
+                              comicinfo)
+
+        if transcode:
+            arcnames = transcode_arcnames(images, transcode)
+            tasks = [(Path(folder) / img, name, compress_level, transcode) for img, name in zip(images, arcnames)]
+            executor, worker = transcode_pool or ProcessPoolExecutor(max_workers=threads), transcode_member
+        else:
+            tasks = [(Path(folder) / img, img, compress_level) for img in images]
+            executor, worker = ThreadPoolExecutor(max_workers=threads), pack_member
 
-        with zipfile.ZipFile(cbz_path, 'w') as cbz:
-            for img in tqdm(images, desc=f"Creating CBZ: {cbz_path.name}", unit="img", disable=silent):
-                cbz.write(Path(folder) / img, arcname=img)
+        bytes_saved = 0
+        pages = []
+        with zipfile.ZipFile(cbz_path, 'w') as cbz, (nullcontext() if executor is transcode_pool else executor):
+            members = ordered_results(executor, worker, tasks, window=threads * 2)
+            if progress is None and not silent:
+                members = tqdm(members, total=len(tasks), desc=f"Creating CBZ: {cbz_path.name}", unit="img")
+            for result in members:
+                if transcode:
+                    result, saved, error = result
+                    bytes_saved += saved
+                    if error:
+                        if not silent:
+                            print(f"[WARNING] {cbz_path.name}: {error}; page kept as-is")
+                        log_message(logfile, "WARNING", f"{cbz_path}: {error}; page kept as-is", log_levels)
+                zinfo, packed = result
+                write_packed_member(cbz, zinfo, packed, compress_level)
+                if comicinfo:
+                    pages.append((zinfo.filename, zinfo.file_size, *page_dimensions(zinfo, packed)))
+                if progress:
+                    progress(1)
+            if comicinfo:
+                write_comicinfo(cbz, Path(folder).name, pages)
+
+        if transcode:
+            total = sum(os.path.getsize(Path(folder) / img) for img in images)
+            msg = f"Transcoded {cbz_path.name}: saved {format_bytes(bytes_saved)} ({bytes_saved / total * 100 if total else 0:.1f}%)"
+            if not silent:
+                print(f"[INFO] {msg}")
+            log_message(logfile, "INFO", msg, log_levels)
 
         return cbz_path
 
@@ -205,6 +637,202 @@ def create_cbz(folder, output_dir, exts, silent, debug, logfile, overwrite=False
         return None
 
 
+def update_cbz(folder, images, cbz_path, silent, logfile, log_levels=None, progress=None,
+               compress_level=DEFAULT_COMPRESS_LEVEL, threads=DEFAULT_THREADS, comicinfo=True):
+    """
+    Refresh an existing CBZ from folder. Pages are matched to the archive's
+    central directory by name, then size and mtime (or CRC when only the mtime
+    moved). Unchanged pages are copied over as compressed bytes; only changed
+    pages are read and recompressed. The new archive replaces the old one atomically.
+    ComicInfo.xml is not a page; it is rebuilt whenever the archive is rewritten.
+    """
+    from concurrent.futures import ThreadPoolExecutor
+    if not silent and progress is None:
+        from tqdm import tqdm
+
+    with zipfile.ZipFile(cbz_path) as old:
+        old_members = old.infolist()
+    has_comicinfo = any(info.filename == COMICINFO_NAME for info in old_members)
+    old_infos = {info.filename: info for info in old_members if info.filename != COMICINFO_NAME}
+    old_order = [info.filename for info in old_members if info.filename != COMICINFO_NAME]
+
+    paths = [Path(folder) / img for img in images]
+    if old_order == images and has_comicinfo == comicinfo and all(member_unchanged(old_infos[img], p.stat()) for img, p in zip(images, paths)):
+        if progress:
+            progress(len(images))
+        if not silent:
+            print(f"[INFO] Up to date: {cbz_path.name}")
+        log_message(logfile, "INFO", f"Up to date: {cbz_path.name}", log_levels)
+        return cbz_path
+
+    tmp_path = cbz_path.with_name(cbz_path.name + ".tmp")
+    tasks = [(p, img, old_infos.get(img), cbz_path, compress_level) for p, img in zip(paths, images)]
+    changed = 0
+    pages = []
+    try:
+        with zipfile.ZipFile(tmp_path, 'w') as cbz, ThreadPoolExecutor(max_workers=threads) as executor:
+            members = ordered_results(executor, refresh_member, tasks, window=threads * 2)
+            if progress is None and not silent:
+                members = tqdm(members, total=len(tasks), desc=f"Updating CBZ: {cbz_path.name}", unit="img")
+            for (zinfo, packed), was_changed in members:
+                write_packed_member(cbz, zinfo, packed, compress_level)
+                changed += was_changed
+                if comicinfo:
+                    pages.append((zinfo.filename, zinfo.file_size, *page_dimensions(zinfo, packed)))
+                if progress:
+                    progress(1)
+            if comicinfo:
+                write_comicinfo(cbz, Path(folder).name, pages)
+        os.replace(tmp_path, cbz_path)
+    finally:
+        if tmp_path.exists():
+            tmp_path.unlink()
+
+    removed = len(set(old_infos) - set(images))
+    msg = f"Updated {cbz_path.name}: {changed} changed, {len(images) - changed} reused, {removed} removed"
+    if not silent:
+        print(f"[INFO] {msg}")
+    log_message(logfile, "INFO", msg, log_levels)
+    return cbz_path
+
+
+def create_cbzs_parallel(subfolders, output_dir, exts, jobs, silent, debug, logfile, overwrite=False, log_levels=None,
+                         compress_level=DEFAULT_COMPRESS_LEVEL, threads=DEFAULT_THREADS, update=False, transcode=None,
+                         comicinfo=True, transcode_pool=None):
+    """
+    Build the CBZs of several folders at once in a thread pool (zip writing
+    is file I/O, which releases the GIL). Output names are planned up front in
+    folder order, and progress is combined into one bar. When transcoding,
+    every job feeds the same process pool of `threads` workers.
+    Returns the created paths (None for failures) in folder order.
+    """
+    from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+    reserved = set()
+    plan = [
+        (folder, plan_cbz_path(folder, output_dir, silent, logfile, overwrite, log_levels, reserved, update))
+        for folder in subfolders
+    ]
+
+    bar = None
+    if not silent:
+        from tqdm import tqdm
+        total = sum(1 for folder in subfolders for f in os.listdir(folder) if f.lower().endswith(exts))
+        bar = tqdm(total=total, desc=f"Creating {len(plan)} CBZs ({jobs} jobs)", unit="img")
+    bar_lock = threading.Lock()
+
+    def progress(n):
+        if bar is not None:
+            with bar_lock:
+                bar.update(n)
+
+    own_pool = transcode and transcode_pool is None
+    try:
+        with (ProcessPoolExecutor(max_workers=threads) if own_pool else nullcontext(transcode_pool)) as transcode_pool, \
+                ThreadPoolExecutor(max_workers=jobs) as executor:
+            futures = [
+                executor.submit(create_cbz, folder, output_dir, exts, silent, debug, logfile,
+                                overwrite, log_levels, cbz_path, progress, compress_level, threads, update, transcode,
+                                comicinfo, transcode_pool)
+                for folder, cbz_path in plan
+            ]
+            return [future.result() for future in futures]
+    finally:
+        if bar is not None:
+            bar.close()
+
+
+# --------------------- Verification ---------------------
+def verify_cbz(cbz_path, exts, check_images=False):
+    """
+    Check one CBZ: every member is read back and its CRC-32 compared, like
+    ZipFile.testzip, but all bad members are reported instead of only the
+    first. With check_images, image members must also have a readable header.
+    Returns a report dict.
+    """
+    if check_images:
+        from PIL import Image
+
+    start = time.perf_counter()
+    result = {"path": str(cbz_path), "ok": False, "members": 0, "bad_members": [], "bad_images": [], "error": None}
+    try:
+        with zipfile.ZipFile(cbz_path) as cbz:
+            infos = [info for info in cbz.infolist() if not info.is_dir()]
+            result["members"] = len(infos)
+            for info in infos:
+                try:
+                    data = cbz.read(info)  # raises BadZipFile on a CRC mismatch
+                # RuntimeError: encrypted member, ValueError: e.g. a corrupt zip64 extra field
+                except (zipfile.BadZipFile, zlib.error, EOFError, OSError, NotImplementedError,
+                        RuntimeError, ValueError) as e:
+                    result["bad_members"].append({"name": info.filename, "error": str(e)})
+                    continue
+                if check_images and info.filename.lower().endswith(exts):
+                    try:
+                        Image.open(BytesIO(data)).close()  # parses the header only
+                    except Exception as e:
+                        result["bad_images"].append({"name": info.filename, "error": str(e)})
+    except (zipfile.BadZipFile, OSError) as e:
+        result["error"] = str(e)
+    except Exception as e:  # one unreadable archive must not abort the whole run and its report
+        result["error"] = f"{type(e).__name__}: {e}"
+
+    result["ok"] = not (result["error"] or result["bad_members"] or result["bad_images"])
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+def verify_cbzs(folder, exts, jobs, check_images, report_path, silent, logfile, log_levels=None):
+    """
+    Verify every CBZ under folder with `jobs` threads (inflating and CRC-32
+    release the GIL) and write a JSON report. Returns True if all are intact.
+    """
+    from natsort import natsorted
+    from concurrent.futures import ThreadPoolExecutor
+
+    cbz_files = natsorted((p for p in Path(folder).rglob("*") if p.suffix.lower() == ".cbz" and p.is_file()), key=str)
+    if not cbz_files:
+        if not silent:
+            print(f"[WARNING] No CBZ files found in: {folder}")
+        log_message(logfile, "WARNING", f"No CBZ files found in: {folder}", log_levels)
+        return True
+
+    if not silent:
+        from tqdm import tqdm
+        print(f"[INFO] 🔎 Verifying {len(cbz_files)} CBZs with {jobs} jobs...")
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(verify_cbz, cbz_files, [exts] * len(cbz_files), [check_images] * len(cbz_files))
+        if not silent:
+            results = tqdm(results, total=len(cbz_files), desc="Verifying CBZs", unit="cbz")
+        results = list(results)
+
+    failed = [r for r in results if not r["ok"]]
+    for r in failed:
+        name = Path(r["path"]).name
+        problems = r["error"] or ", ".join(m["name"] for m in r["bad_members"] + r["bad_images"])
+        if not silent:
+            print(f"[ERROR] Damaged CBZ: {name} ({problems})")
+        log_message(logfile, "ERROR", f"Damaged CBZ: {r['path']} ({problems})", log_levels)
+
+    report = {
+        "folder": str(folder),
+        "check_images": check_images,
+        "checked": len(results),
+        "ok": len(results) - len(failed),
+        "failed": len(failed),
+        "archives": results,
+    }
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    msg = f"Verified {len(results)} CBZs: {len(results) - len(failed)} OK, {len(failed)} damaged. Report: {report_path}"
+    if not silent:
+        print(f"[{'SUCCESS' if not failed else 'WARNING'}] {msg}")
+    log_message(logfile, "INFO" if not failed else "WARNING", msg, log_levels)
+    return not failed
+
+
 # --------------------- Usage Examples ---------------------
 def print_usage_examples():
     print("\nUsage Examples:")
@@ -213,6 +841,12 @@ def print_usage_examples():
     print("  python cbz_forger.py --input ./comics --ext .jpg,.png --skip-bmp")
     print("  python cbz_forger.py --input ./comics --silent --log cbz.log")
     print("  python cbz_forger.py --overwrite --log cbz.log")
+    print("  python cbz_forger.py --input ./comics --jobs 4")
+    print("  python cbz_forger.py --input ./comics --compress-level 9 --threads 8")
+    print("  python cbz_forger.py --input ./comics --update")
+    print("  python cbz_forger.py --input ./comics --bmp-collision skip --silent")
+    print("  python cbz_forger.py --input ./comics --format webp --quality 80 --max-dim 2000 --grayscale")
+    print("  python cbz_forger.py --input ./cbz_out --verify --verify-images --report verify.json")
     print("  python cbz_forger.py --help\n")
 
 
@@ -225,11 +859,24 @@ def print_flag_summary():
     print("{:<15} {:<50}".format("--input", "Master folder containing subfolders of images."))
     print("{:<15} {:<50}".format("--output", "Output folder for CBZ files (default = input folder)."))
     print("{:<15} {:<50}".format("--skip-bmp", "Skip BMP conversion step."))
+    print("{:<15} {:<50}".format("--bmp-collision", "When a BMP's PNG name exists: sanitize, skip or overwrite (default = sanitize)."))
     print("{:<15} {:<50}".format("--ext", "Comma-separated list of extensions to include (e.g., .jpg,.png)."))
-    print("{:<15} {:<50}".format("--silent", "Suppress all prints and progress bars (except BMP collision prompt)."))
+    print("{:<15} {:<50}".format("--silent", "Suppress all prints and progress bars."))
     print("{:<15} {:<50}".format("--debug", "Print full Python tracebacks on errors (silent takes priority)."))
     print("{:<15} {:<50}".format("--log", "Write all messages to a log file. Default=cbz_forger.log if no file is provided."))
     print("{:<15} {:<50}".format("--overwrite", "Overwrite existing CBZ files instead of sanitizing names."))
+    print("{:<15} {:<50}".format("--jobs", "Number of CBZs to build at the same time (default = 1)."))
+    print("{:<15} {:<50}".format("--compress-level", f"Deflate level 0-9 for PNG/BMP/TIFF pages; 0 stores all (default = {DEFAULT_COMPRESS_LEVEL})."))
+    print("{:<15} {:<50}".format("--threads", f"Compression threads per CBZ (default = {DEFAULT_THREADS})."))
+    print("{:<15} {:<50}".format("--update", "Refresh existing CBZs in place; only changed pages are recompressed."))
+    print("{:<15} {:<50}".format("--format", "Re-encode pages as webp or jpeg while packing."))
+    print("{:<15} {:<50}".format("--quality", f"WebP/JPEG quality for re-encoded pages (default = {DEFAULT_QUALITY})."))
+    print("{:<15} {:<50}".format("--max-dim", "Downscale pages whose longest side is larger than this (pixels)."))
+    print("{:<15} {:<50}".format("--grayscale", "Store gray RGB pages as single-channel images."))
+    print("{:<15} {:<50}".format("--no-comicinfo", "Do not add ComicInfo.xml (page count and page sizes) to the CBZs."))
+    print("{:<15} {:<50}".format("--verify", "Check the CRCs of every CBZ in the output folder instead of building."))
+    print("{:<15} {:<50}".format("--verify-images", "With --verify, also read every image header."))
+    print("{:<15} {:<50}".format("--report", f"JSON report for --verify (default = {VERIFY_REPORT} in the output folder)."))
     print("{:<15} {:<50}".format("--log-info", "Log INFO messages."))
     print("{:<15} {:<50}".format("--log-warning", "Log WARNING messages."))
     print("{:<15} {:<50}".format("--log-error", "Log ERROR messages."))
@@ -237,6 +884,13 @@ def print_flag_summary():
 
 
 # --------------------- Main Tool ---------------------
+def transcode_options(args):
+    """Transcoding options from the CLI flags, or None when no transcoding was asked for."""
+    if not (args.format or args.max_dim or args.grayscale):
+        return None
+    return {"format": args.format, "quality": args.quality, "max_dim": args.max_dim, "grayscale": args.grayscale}
+
+
 def run_cbz_forger(args):
     try:
         log_levels = None
@@ -287,14 +941,22 @@ def run_cbz_forger(args):
         if not exts:
             exts = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.tif', '.tiff')
 
+        # ---------------- Verify Mode ----------------
+        if args.verify:
+            jobs = args.jobs if args.jobs > 1 else (os.cpu_count() or 1)
+            report_path = Path(args.report) if args.report else output_path / VERIFY_REPORT
+            return verify_cbzs(output_path, exts, jobs, args.verify_images, report_path,
+                               args.silent, args.log, log_levels)
+
         # ---------------- BMP Conversion ----------------
-        if not args.skip_bmp and any(f.lower().endswith(".bmp") for f in os.listdir(input_path)):
-            convert_bmp_safe(input_path, args.silent, args.debug, args.log, log_levels)
+        if not args.skip_bmp:
+            convert_bmp_safe(input_path, args.silent, args.debug, args.log, log_levels, args.bmp_collision)
 
         # ---------------- Collect Subfolders ----------------
-        subfolders = [p for p in input_path.glob("*") if p.is_dir() and any(
+        from natsort import natsorted
+        subfolders = natsorted([p for p in input_path.glob("*") if p.is_dir() and any(
             f.lower().endswith(exts) for f in os.listdir(p)
-        )]
+        )], key=lambda p: p.name)
 
         if not subfolders:
             if not args.silent:
@@ -307,13 +969,32 @@ def run_cbz_forger(args):
             log_message(args.log, "INFO", f"Found {len(subfolders)} folders with images.", log_levels)
 
         # ---------------- Create CBZ ----------------
-        for folder in subfolders:
-            cbz_path = create_cbz(folder, output_path, exts, args.silent, args.debug,
-                                   args.log, overwrite=args.overwrite, log_levels=log_levels)
-            if cbz_path:
-                if not args.silent:
-                    print(f"[SUCCESS] Created CBZ: {cbz_path.name}")
-                log_message(args.log, "SUCCESS", f"Created CBZ: {cbz_path.name}", log_levels)
+        # One transcode pool for the whole run, however many CBZs / --jobs share it
+        transcode = transcode_options(args)
+        transcode_pool = nullcontext()
+        if transcode:
+            from concurrent.futures import ProcessPoolExecutor
+            transcode_pool = ProcessPoolExecutor(max_workers=args.threads)
+        with transcode_pool as transcode_pool:
+            if args.jobs > 1:
+                created = create_cbzs_parallel(subfolders, output_path, exts, args.jobs, args.silent, args.debug,
+                                               args.log, overwrite=args.overwrite, log_levels=log_levels,
+                                               compress_level=args.compress_level, threads=args.threads,
+                                               update=args.update, transcode=transcode,
+                                               comicinfo=not args.no_comicinfo, transcode_pool=transcode_pool)
+            else:
+                created = (
+                    create_cbz(folder, output_path, exts, args.silent, args.debug,
+                               args.log, overwrite=args.overwrite, log_levels=log_levels,
+                               compress_level=args.compress_level, threads=args.threads, update=args.update,
+                               transcode=transcode, comicinfo=not args.no_comicinfo, transcode_pool=transcode_pool)
+                    for folder in subfolders
+                )
+            for cbz_path in created:
+                if cbz_path:
+                    if not args.silent:
+                        print(f"[SUCCESS] Created CBZ: {cbz_path.name}")
+                    log_message(args.log, "SUCCESS", f"Created CBZ: {cbz_path.name}", log_levels)
 
         if not args.silent:
             print(f"[SUCCESS] Done. All CBZs saved in output folder.")
@@ -347,14 +1028,51 @@ if __name__ == "__main__":
     parser.add_argument("--input", help="Master folder containing subfolders of images.")
     parser.add_argument("--output", nargs="?", const=None, help="Output folder for CBZ files (default = input folder).")
     parser.add_argument("--skip-bmp", action="store_true", help="Skip BMP conversion step.")
+    parser.add_argument("--bmp-collision", choices=BMP_COLLISION_POLICIES, default="sanitize",
+                        help="When a BMP's PNG name already exists: sanitize (name_1.png), skip, or overwrite (default = sanitize).")
     parser.add_argument("--ext", nargs="?", const="", help="Comma-separated list of extensions to include (e.g., .jpg,.png).")
-    parser.add_argument("--silent", action="store_true", help="Suppress all prints and progress bars (except BMP collision prompt).")
+    parser.add_argument("--silent", action="store_true", help="Suppress all prints and progress bars.")
     parser.add_argument("--debug", action="store_true", help="Print full Python tracebacks on errors (silent takes priority).")
     parser.add_argument("--log", nargs="?", const="cbz_forger.log", help="Write all messages to a log file. Default=cbz_forger.log if no file is provided.")
     parser.add_argument("--overwrite", action="store_true", help="Overwrite existing CBZ files instead of sanitizing names.")
     parser.add_argument("--log-info", action="store_true", help="Log INFO messages.")
     parser.add_argument("--log-warning", action="store_true", help="Log WARNING messages.")
     parser.add_argument("--log-error", action="store_true", help="Log ERROR messages.")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of CBZs to build at the same time (default = 1).")
+    parser.add_argument("--compress-level", type=int, default=DEFAULT_COMPRESS_LEVEL,
+                        help=f"Deflate level 0-9 for PNG/BMP/TIFF pages; JPEG/WebP are always stored. 0 stores everything (default = {DEFAULT_COMPRESS_LEVEL}).")
+    parser.add_argument("--threads", type=int, default=DEFAULT_THREADS,
+                        help=f"Compression threads per CBZ (default = {DEFAULT_THREADS}).")
+    parser.add_argument("--update", action="store_true",
+                        help="Refresh existing CBZs in place instead of writing a _1 copy; unchanged pages are reused as-is.")
+    parser.add_argument("--format", choices=sorted(TRANSCODE_FORMATS), help="Re-encode pages as webp or jpeg while packing.")
+    parser.add_argument("--quality", type=int, default=DEFAULT_QUALITY,
+                        help=f"WebP/JPEG quality 1-100 for re-encoded pages (default = {DEFAULT_QUALITY}).")
+    parser.add_argument("--max-dim", type=int, default=0, help="Downscale pages whose longest side is larger than this (pixels).")
+    parser.add_argument("--grayscale", action="store_true", help="Store gray RGB pages as single-channel images.")
+    parser.add_argument("--verify", action="store_true",
+                        help="Check the CRCs of every CBZ in the output folder (default = input folder) instead of building.")
+    parser.add_argument("--verify-images", action="store_true", help="With --verify, also read every image header.")
+    parser.add_argument("--report", help=f"JSON report file for --verify (default = {VERIFY_REPORT} in the output folder).")
+    parser.add_argument("--no-comicinfo", action="store_true",
+                        help="Do not add ComicInfo.xml (page count, page sizes, double-page flags) to the CBZs.")
 
     args = parser.parse_args()
-    run_cbz_forger(args)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if not 0 <= args.compress_level <= 9:
+        parser.error("--compress-level must be between 0 and 9")
+    if args.threads < 1:
+        parser.error("--threads must be at least 1")
+    if args.update and args.overwrite:
+        parser.error("--update and --overwrite cannot be used together")
+    if not 1 <= args.quality <= 100:
+        parser.error("--quality must be between 1 and 100")
+    if args.max_dim < 0:
+        parser.error("--max-dim must be positive")
+    if args.update and transcode_options(args):
+        parser.error("--update compares pages with their source files, so it cannot be combined with transcoding")
+    if args.verify_images and not args.verify:
+        parser.error("--verify-images needs --verify")
+    if run_cbz_forger(args) is False:
+        sys.exit(1)  # --verify found damaged CBZs
@@ -0,0 +1,139 @@
+"""
+Headless batch metrics: compute metrics for every image pair of two folders in a process pool
+"""
+import os
+import sys
+import csv
+import json
+import time
+import statistics
+from contextlib import nullcontext
+from concurrent.futures import ProcessPoolExecutor
+from utils import get_sorted_image_files
+from metrics_store import MetricsStore
+
+METRIC_FIELDS = ("psnr1", "sharpness1", "noise1", "ssim", "psnr2", "sharpness2", "noise2")
+BATCH_FORMATS = ("csv", "jsonl")
+
+
+def _init_worker():
+    # One OpenCV thread per process; the pool already uses every core
+    import cv2
+    cv2.setNumThreads(1)
+
+
+def metrics_worker(task):
+    """Compute metrics for one (index, left, right) task; never raises"""
+    index, left_path, right_path = task
+    from image_metrics import calculate_metrics
+    try:
+        return index, calculate_metrics(left_path, right_path), None
+    except Exception as e:
+        return index, None, str(e)
+
+
+class ResultWriter:
+    """Streams one result row per pair as CSV or JSON Lines"""
+
+    def __init__(self, stream, fmt):
+        self.stream = stream
+        self.fmt = fmt
+        if fmt == "csv":
+            self.writer = csv.writer(stream)
+            self.writer.writerow(("index", "left", "right") + METRIC_FIELDS + ("error",))
+
+    def write(self, index, left_path, right_path, metrics, error):
+        if self.fmt == "csv":
+            values = tuple(metrics[k] for k in METRIC_FIELDS) if metrics else ("",) * len(METRIC_FIELDS)
+            self.writer.writerow((index, left_path, right_path) + values + (error or "",))
+        else:
+            row = {"index": index, "left": left_path, "right": right_path}
+            row.update(metrics or {})
+            if error:
+                row["error"] = error
+            self.stream.write(json.dumps(row) + "\n")
+        self.stream.flush()
+
+
+def print_summary(results, pairs, failures, elapsed, worst, out):
+    """Print aggregate statistics per metric and the worst pairs ranked by SSIM"""
+    print(f"\nPairs: {len(pairs)}  OK: {len(results)}  Failed: {len(failures)}  "
+          f"Time: {elapsed:.1f}s", file=out)
+    if not results:
+        return
+
+    print(f"\n{'metric':<12}{'mean':>12}{'median':>12}{'min':>12}{'max':>12}", file=out)
+    for key in METRIC_FIELDS:
+        values = [m[key] for m in results.values()]
+        print(f"{key:<12}{statistics.fmean(values):>12.4f}{statistics.median(values):>12.4f}"
+              f"{min(values):>12.4f}{max(values):>12.4f}", file=out)
+
+    ranked = sorted(results.items(), key=lambda item: (item[1]["ssim"], min(item[1]["psnr1"], item[1]["psnr2"])))
+    print(f"\nWorst {min(worst, len(ranked))} pairs by SSIM:", file=out)
+    for index, m in ranked[:worst]:
+        name = os.path.basename(pairs[index][0])
+        print(f"  #{index + 1:<5} SSIM {m['ssim']:.4f}  PSNR {m['psnr1']:.2f}  {name}", file=out)
+
+    for index, error in failures[:worst]:
+        print(f"  failed #{index + 1}: {error}", file=out)
+
+
+def run_batch(folder1, folder2, output="-", fmt="csv", jobs=None, worst=10, recompute=False):
+    """
+    Compute metrics for every pair (matched by natural sort order, like the GUI)
+    and stream one row per pair, in pair order, to output ("-" for stdout).
+    Pairs with up-to-date entries in the metrics store are reused unless
+    recompute is set; new results are written back to it. Progress and the
+    summary go to stderr. If the reader of stdout goes away (e.g. piped into
+    head), the run stops quietly. Returns the number of failed pairs.
+    """
+    files1 = get_sorted_image_files(folder1)
+    files2 = get_sorted_image_files(folder2)
+    if len(files1) != len(files2):
+        print(f"Warning: folder mismatch ({len(files1)} vs {len(files2)} images), "
+              f"only {min(len(files1), len(files2))} pairs will be compared.", file=sys.stderr)
+    pairs = list(zip(files1, files2))
+
+    store = MetricsStore()
+    stored = {} if recompute else store.get_many(pairs)
+    tasks = [(i, left, right) for i, (left, right) in enumerate(pairs) if i not in stored]
+
+    stream = sys.stdout if output == "-" else open(output, "w", newline="", encoding="utf-8")
+    writer = ResultWriter(stream, fmt)
+    results, failures = {}, []
+    start = time.perf_counter()
+
+    print(f"Computing metrics for {len(tasks)} pairs ({len(stored)} reused from cache) "
+          f"with {jobs or os.cpu_count()} processes...", file=sys.stderr)
+    try:
+        pool_context = ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker) if tasks else nullcontext()
+        with pool_context as pool:
+            computed = pool.map(metrics_worker, tasks, chunksize=4) if tasks else iter(())
+            try:
+                # Computed results come back in task order, so cached rows slot in between them
+                for index, (left_path, right_path) in enumerate(pairs):
+                    if index in stored:
+                        metrics, error = stored[index], None
+                    else:
+                        _, metrics, error = next(computed)
+                        if metrics is not None:
+                            store.put(left_path, right_path, metrics)
+                    if metrics is None:
+                        failures.append((index, error))
+                    else:
+                        results[index] = metrics
+                    writer.write(index, left_path, right_path, metrics, error)
+            except BrokenPipeError:
+                if pool is not None:
+                    pool.shutdown(wait=False, cancel_futures=True)
+                # Point stdout at devnull so the interpreter's final flush doesn't fail again
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.stdout.fileno())
+                print("Output closed early; stopping.", file=sys.stderr)
+    finally:
+        store.close()
+        if stream is not sys.stdout:
+            stream.close()
+
+    print_summary(results, pairs, failures, time.perf_counter() - start, worst, sys.stderr)
+    return len(failures)
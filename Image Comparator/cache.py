@@ -1,84 +1,165 @@
 """
-Image and metrics cache management with distance-based eviction
+Image and metrics cache management with a memory budget and distance-weighted LRU eviction
 """
-from constants import MAX_CACHE_DISTANCE
+from constants import MAX_CACHE_DISTANCE, MAX_CACHE_BYTES, CACHE_DISTANCE_WEIGHT
+
+
+def pixmap_bytes(pixmap):
+    """Approximate memory held by a pixmap (or image): width x height x bytes per pixel"""
+    try:
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
+    except AttributeError:
+        return 0
 
 
 class ImageCache:
-    """Cache for loaded images and metrics with distance-based eviction"""
-    
-    def __init__(self):
+    """
+    Cache for loaded images and metrics.
+
+    Images are kept under a byte budget (max_bytes). When a new image would
+    exceed it, the entries with the highest eviction score go first:
+    score = accesses since the entry was last used
+            + CACHE_DISTANCE_WEIGHT * distance from the current index
+    so old entries far from where the user is looking are dropped before
+    recent neighbours. The current index is never evicted by the budget, nor
+    is the image just stored (its decode would be wasted); it competes from
+    the next pass on.
+    """
+
+    def __init__(self, max_bytes=MAX_CACHE_BYTES):
         self.thumbnails = {}  # index -> {'left': pixmap, 'right': pixmap}
         self.full_images = {}  # index -> {'left': pixmap, 'right': pixmap}
         self.metrics = {}      # index -> metrics dict (never evicted)
-    
+        self.max_bytes = max_bytes
+        self.current_index = 0
+        self._sizes = {}      # (quality, index) -> bytes held by both sides
+        self._last_used = {}  # (quality, index) -> access tick
+        self._tick = 0
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
     def has_thumbnail(self, index):
         return index in self.thumbnails and \
                'left' in self.thumbnails[index] and \
                'right' in self.thumbnails[index]
-    
+
     def has_full_image(self, index):
         return index in self.full_images and \
                'left' in self.full_images[index] and \
                'right' in self.full_images[index]
-    
+
     def has_metrics(self, index):
         return index in self.metrics
-    
+
+    def _store(self, quality):
+        return self.thumbnails if quality == 'thumbnail' else self.full_images
+
+    def _touch(self, key):
+        self._tick += 1
+        self._last_used[key] = self._tick
+
     def set_image(self, index, side, pixmap, quality):
-        if quality == 'thumbnail':
-            if index not in self.thumbnails:
-                self.thumbnails[index] = {}
-            self.thumbnails[index][side] = pixmap
-        else:  # full
-            if index not in self.full_images:
-                self.full_images[index] = {}
-            self.full_images[index][side] = pixmap
-    
+        quality = 'thumbnail' if quality == 'thumbnail' else 'full'
+        store = self._store(quality)
+        key = (quality, index)
+        if index not in store:
+            store[index] = {}
+
+        old = store[index].get(side)
+        size = pixmap_bytes(pixmap) - (pixmap_bytes(old) if old is not None else 0)
+        store[index][side] = pixmap
+        self._sizes[key] = self._sizes.get(key, 0) + size
+        self.bytes += size
+        self._touch(key)
+        self.enforce_budget(keep=key)
+
     def get_image(self, index, side, prefer_full=True):
         """Get best available image"""
         if prefer_full and self.has_full_image(index):
-            return self.full_images[index].get(side)
+            pixmap, key = self.full_images[index].get(side), ('full', index)
         elif index in self.thumbnails:
-            return self.thumbnails[index].get(side)
-        return None
-    
+            pixmap, key = self.thumbnails[index].get(side), ('thumbnail', index)
+        else:
+            pixmap, key = None, None
+
+        if pixmap is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self._touch(key)
+        return pixmap
+
     def set_metrics(self, index, metrics):
         """Metrics are never evicted - they're just text/numbers"""
         self.metrics[index] = metrics
-    
+
     def get_metrics(self, index):
         return self.metrics.get(index)
-    
+
+    def _evict(self, key):
+        quality, index = key
+        del self._store(quality)[index]
+        self.bytes -= self._sizes.pop(key, 0)
+        self._last_used.pop(key, None)
+        self.evictions += 1
+
+    def _score(self, key):
+        _, index = key
+        age = self._tick - self._last_used.get(key, 0)
+        return age + CACHE_DISTANCE_WEIGHT * abs(index - self.current_index)
+
+    def enforce_budget(self, keep=None):
+        """Evict the highest-scoring images (never keep) until the cache fits in max_bytes"""
+        evicted = 0
+        if self.bytes <= self.max_bytes:
+            return evicted
+
+        candidates = sorted(
+            (key for key in self._sizes if key[1] != self.current_index and key != keep),
+            key=self._score,
+            reverse=True
+        )
+        for key in candidates:
+            if self.bytes <= self.max_bytes:
+                break
+            self._evict(key)
+            evicted += 1
+        return evicted
+
     def evict_distant(self, current_index, max_distance=MAX_CACHE_DISTANCE):
-        """Evict images too far from current position (keep metrics)"""
-        # Evict full images
-        indices_to_remove = [
-            idx for idx in self.full_images.keys()
-            if abs(idx - current_index) > max_distance
-        ]
-        for idx in indices_to_remove:
-            del self.full_images[idx]
-        
-        # Evict thumbnails
-        indices_to_remove = [
-            idx for idx in self.thumbnails.keys()
-            if abs(idx - current_index) > max_distance
+        """Evict images too far from current position, then enforce the byte budget (keep metrics)"""
+        self.current_index = current_index
+        keys_to_remove = [
+            key for key in self._sizes
+            if abs(key[1] - current_index) > max_distance
         ]
-        for idx in indices_to_remove:
-            del self.thumbnails[idx]
-        
-        return len(indices_to_remove)
-    
+        for key in keys_to_remove:
+            self._evict(key)
+
+        return len(keys_to_remove) + self.enforce_budget()
+
     def get_cache_stats(self):
         """Return cache statistics"""
         return {
             'thumbnails': len(self.thumbnails),
             'full_images': len(self.full_images),
-            'metrics': len(self.metrics)
+            'metrics': len(self.metrics),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions
         }
-    
+
     def clear(self):
         self.thumbnails.clear()
         self.full_images.clear()
-        self.metrics.clear()
\ No newline at end of file
+        self.metrics.clear()
+        self._sizes.clear()
+        self._last_used.clear()
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
@@ -1,6 +1,7 @@
 """
 Constants and configuration for Image Comparator
 """
+import os
 
 # UI Constants
 COLOR_BETTER = "#00FF00"
@@ -20,8 +21,13 @@ MAX_PRELOAD_BACKWARD = 5
 
 # Memory management
 MAX_CACHE_DISTANCE = 15  # Keep images within this distance from current
+MAX_CACHE_BYTES = 1024 * 1024 * 1024  # Byte budget for cached pixmaps (1 GB)
+CACHE_DISTANCE_WEIGHT = 4  # Eviction weight per index of distance vs. per access of age
 MAX_THREAD_COUNT = 4     # Maximum concurrent loading threads
 
+# Persistent metrics cache (reused across sessions while both files are unchanged)
+METRICS_DB_PATH = os.path.join(os.path.expanduser("~"), ".image_comparator", "metrics.db")
+
 # Valid image extensions
 VALID_IMAGE_EXTENSIONS = ('.jpg', '.jpeg', '.png', '.webp', '.tif', '.tiff')
 
@@ -4,6 +4,30 @@ import numpy as np
 from skimage.metrics import structural_similarity as ssim
 
 
+def load_image(path: Path | str) -> np.ndarray | None:
+    """
+    Decode an image file once into an 8-bit BGR NumPy array, shared by the
+    display and the metrics. Decoded like cv2.imread (IMREAD_COLOR), so EXIF
+    orientation is applied and alpha / 16-bit channels are dropped, exactly as
+    the metrics have always seen the image. Reads bytes via NumPy so non-ASCII
+    paths work on Windows. Returns None if the file can't be decoded.
+    """
+    try:
+        data = np.fromfile(str(path), dtype=np.uint8)
+    except OSError:
+        return None
+    return cv2.imdecode(data, cv2.IMREAD_COLOR)
+
+
+def as_bgr(image: np.ndarray) -> np.ndarray:
+    """Return a 3-channel BGR view of a decoded image (converts only grayscale/BGRA)."""
+    if image.ndim == 2:
+        return cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+    if image.shape[2] == 4:
+        return cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+    return image
+
+
 def calculate_psnr(img1: np.ndarray, img2: np.ndarray) -> float:
     """Calculate PSNR between two images."""
     return float(cv2.PSNR(img1, img2))
@@ -25,22 +49,30 @@ def estimate_noise(image: np.ndarray) -> float:
 
 
 def calculate_metrics(img1_path: Path | str, img2_path: Path | str) -> dict:
-    """Compute PSNR, sharpness, noise, and SSIM metrics between two images."""
+    """Compute PSNR, sharpness, noise, and SSIM metrics between two image files."""
     img1_path = Path(img1_path)
     img2_path = Path(img2_path)
 
     if not img1_path.is_file() or not img2_path.is_file():
         raise FileNotFoundError(f"One or both image paths are invalid: {img1_path}, {img2_path}")
 
-    img1 = cv2.imread(str(img1_path))
-    img2 = cv2.imread(str(img2_path))
+    img1 = load_image(img1_path)
+    img2 = load_image(img2_path)
 
     if img1 is None or img2 is None:
         raise ValueError(f"Failed to read one or both images: {img1_path}, {img2_path}")
 
-    # Keep native copies for sharpness/noise
-    img1_native = img1.copy()
-    img2_native = img2.copy()
+    return calculate_metrics_arrays(img1, img2)
+
+
+def calculate_metrics_arrays(img1: np.ndarray, img2: np.ndarray) -> dict:
+    """Compute the metrics from already decoded images (see load_image); the inputs are not modified."""
+    img1 = as_bgr(img1)
+    img2 = as_bgr(img2)
+
+    # Sharpness/noise use the native images; resizing below creates new arrays
+    img1_native = img1
+    img2_native = img2
 
     # Resize to match dimensions for PSNR + SSIM
     target_h = min(img1.shape[0], img2.shape[0])
@@ -9,6 +9,7 @@ import logging
 
 # Import your core GUI class
 from main_window import ImageCompareWindow, resource_path
+from constants import MAX_CACHE_BYTES
 
 
 # --- Environment setup ---
@@ -28,10 +29,10 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-def run_app(folder1: str, folder2: str):
+def run_app(folder1: str, folder2: str, cache_bytes: int = MAX_CACHE_BYTES):
     """
     Launch the image comparator GUI with two folders.
-    Preserves dark mode and visual styling.
+    Preserves dark mode and visual styling. cache_bytes is the image cache budget.
     """
     app = QApplication(sys.argv)
 
@@ -48,7 +49,7 @@ def run_app(folder1: str, folder2: str):
 
     # --- Initialize GUI ---
     window = QMainWindow()
-    gui = ImageCompareWindow()
+    gui = ImageCompareWindow(cache_bytes)
     gui.load_folders(folder1, folder2)
     window.setCentralWidget(gui)
     window.show()
@@ -73,6 +74,12 @@ def parse_args():
         metavar=("FOLDER1", "FOLDER2"),
         help="Specify two folders or image paths to compare."
     )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=MAX_CACHE_BYTES // (1024 * 1024),
+        help="Memory budget for cached images, in MB."
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -101,8 +108,10 @@ def main_entry():
 
         if not folder1.exists() or not folder2.exists():
             raise ValueError("Both input paths must exist.")
+        if args.cache_mb < 1:
+            raise ValueError("--cache-mb must be at least 1.")
 
-        exit_code = run_app(str(folder1), str(folder2))
+        exit_code = run_app(str(folder1), str(folder2), args.cache_mb * 1024 * 1024)
         sys.exit(exit_code)
 
     except Exception as e:
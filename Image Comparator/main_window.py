@@ -17,6 +17,7 @@ from pathlib import Path
 from graphics_view import GraphicsView
 from workers import ImageLoadWorker, MetricsWorker
 from cache import ImageCache
+from metrics_store import MetricsStore
 from constants import *
 from utils import get_sorted_image_files, format_file_size, colorize_metrics
 
@@ -31,7 +32,7 @@ def resource_path(relative_path: str) -> Path:
     return Path(__file__).resolve().parent / relative_path
 
 class ImageCompareWindow(QWidget):
-    def __init__(self):
+    def __init__(self, cache_bytes=MAX_CACHE_BYTES):
         super().__init__()
         self.image_views = []
         self.image_pairs = []
@@ -39,7 +40,8 @@ class ImageCompareWindow(QWidget):
         self.sync_enabled = True  # Zoom and scroll sync state
         
         # Caching and loading
-        self.cache = ImageCache()
+        self.cache = ImageCache(cache_bytes)
+        self.metrics_store = MetricsStore()
         self.thread_pool = QThreadPool()
         self.thread_pool.setMaxThreadCount(MAX_THREAD_COUNT)
         self.active_workers = []
@@ -429,8 +431,13 @@ class ImageCompareWindow(QWidget):
     def _update_cache_status(self):
         """Update cache status display"""
         stats = self.cache.get_cache_stats()
+        mb = 1024 * 1024
         self.cache_status.setText(
-            f"Cache: {stats['full_images']}F / {stats['thumbnails']}T / {stats['metrics']}M"
+            f"Cache: {stats['full_images']}F / {stats['thumbnails']}T / {stats['metrics']}M | "
+            f"{stats['bytes'] // mb}/{stats['max_bytes'] // mb} MB"
+        )
+        self.cache_status.setToolTip(
+            f"Hits: {stats['hits']}  Misses: {stats['misses']}  Evictions: {stats['evictions']}"
         )
     
     def _update_filesize(self):
@@ -493,12 +500,13 @@ class ImageCompareWindow(QWidget):
             self.resolution_status.setStyleSheet("color: #FF5555")
             self._load_thumbnail(index)
         
-        # Display metrics
+        # Display metrics (otherwise computed by the full quality load from the same decode)
         if self.cache.has_metrics(index):
             self.update_metrics_display(index, self.cache.get_metrics(index))
         else:
             self.metrics_label.setText("Computing metrics...")
-            self._compute_metrics(index)
+            if self.cache.has_full_image(index):
+                self._compute_metrics(index)
 
 
     def _show_placeholder(self, left_view, right_view):
@@ -612,14 +620,8 @@ class ImageCompareWindow(QWidget):
         if self.cache.has_full_image(index) or index >= len(self.image_pairs):
             return
         
-        left_path, right_path = self.image_pairs[index]
         logger.info(f"Loading full quality for index {index}")
-        
-        worker = ImageLoadWorker(index, left_path, right_path, quality='full')
-        worker.signals.image_loaded.connect(self._on_image_loaded)
-        worker.signals.error.connect(self._on_worker_error)
-        self.active_workers.append(worker)
-        self.thread_pool.start(worker)
+        self._load_full_quality_index(index)
 
     def _compute_metrics(self, index):
         """Compute metrics for image pair"""
@@ -658,6 +660,8 @@ class ImageCompareWindow(QWidget):
     def _on_metrics_ready(self, index, metrics):
         """Handle metrics ready signal"""
         self.cache.set_metrics(index, metrics)
+        if index < len(self.image_pairs):
+            self.metrics_store.put(*self.image_pairs[index], metrics)
         self._update_cache_status()
         
         if index == self.current_index:
@@ -679,7 +683,7 @@ class ImageCompareWindow(QWidget):
                     self._load_thumbnail(next_idx)
                 if not self.cache.has_full_image(next_idx):
                     self._load_full_quality_index(next_idx)
-                if not self.cache.has_metrics(next_idx):
+                elif not self.cache.has_metrics(next_idx):
                     self._compute_metrics(next_idx)
         
         for i in range(1, MAX_PRELOAD_BACKWARD + 1):
@@ -689,17 +693,19 @@ class ImageCompareWindow(QWidget):
                     self._load_thumbnail(prev_idx)
                 if not self.cache.has_full_image(prev_idx):
                     self._load_full_quality_index(prev_idx)
-                if not self.cache.has_metrics(prev_idx):
+                elif not self.cache.has_metrics(prev_idx):
                     self._compute_metrics(prev_idx)
 
     def _load_full_quality_index(self, index):
-        """Load full quality for specific index"""
+        """Load full quality for specific index, computing missing metrics from the same decode"""
         if index >= len(self.image_pairs) or self.cache.has_full_image(index):
             return
         
         left_path, right_path = self.image_pairs[index]
-        worker = ImageLoadWorker(index, left_path, right_path, quality='full')
+        worker = ImageLoadWorker(index, left_path, right_path, quality='full',
+                                 with_metrics=not self.cache.has_metrics(index))
         worker.signals.image_loaded.connect(self._on_image_loaded)
+        worker.signals.metrics_ready.connect(self._on_metrics_ready)
         worker.signals.error.connect(self._on_worker_error)
         self.active_workers.append(worker)
         self.thread_pool.start(worker)
@@ -731,6 +737,10 @@ class ImageCompareWindow(QWidget):
             self.image_pairs = list(zip(files1, files2))
             self.current_index = 0
             self.cache.clear()
+            stored = self.metrics_store.get_many(self.image_pairs)
+            for index, metrics in stored.items():
+                self.cache.set_metrics(index, metrics)
+            logger.info(f"Reused stored metrics for {len(stored)}/{len(self.image_pairs)} pairs")
             self._update_cache_status()
             self._navigate_to_current()
             logger.info(f"Loaded {len(self.image_pairs)} image pairs from folders")
@@ -786,6 +796,7 @@ class ImageCompareWindow(QWidget):
                 worker.cancel()
         
         self.thread_pool.waitForDone(2000)
+        self.metrics_store.close()
         logger.info("Application closed successfully")
         event.accept()
     
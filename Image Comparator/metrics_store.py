@@ -0,0 +1,105 @@
+"""
+Persistent on-disk metrics cache (SQLite) keyed by both files' path, size and mtime
+"""
+import os
+import json
+import sqlite3
+import logging
+from constants import METRICS_DB_PATH
+
+logger = logging.getLogger(__name__)
+
+# Bump when the metric values change for the same files; older rows are dropped.
+# 2: images are decoded like cv2.imread again (EXIF orientation, no alpha / 16-bit)
+METRICS_VERSION = 2
+
+
+def file_stamp(path):
+    """Return (absolute path, size, mtime_ns) identifying the current version of a file"""
+    st = os.stat(path)
+    return os.path.abspath(path), st.st_size, st.st_mtime_ns
+
+
+class MetricsStore:
+    """
+    Stores computed metrics per image pair so reopening the same folders shows
+    them immediately. A row is only reused while both files keep the size and
+    mtime they had when the metrics were computed; changed pairs miss and get
+    recomputed (and overwritten).
+
+    The store is best-effort: if the database can't be opened or written, it
+    logs a warning and behaves as an always-empty cache.
+    """
+
+    def __init__(self, db_path=METRICS_DB_PATH):
+        self.db_path = db_path
+        self.conn = None
+        try:
+            os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+            self.conn = sqlite3.connect(db_path)
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS metrics (
+                    left_path TEXT NOT NULL,
+                    left_size INTEGER NOT NULL,
+                    left_mtime INTEGER NOT NULL,
+                    right_path TEXT NOT NULL,
+                    right_size INTEGER NOT NULL,
+                    right_mtime INTEGER NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (left_path, right_path)
+                )
+            """)
+            if self.conn.execute("PRAGMA user_version").fetchone()[0] != METRICS_VERSION:
+                self.conn.execute("DELETE FROM metrics")
+                self.conn.execute(f"PRAGMA user_version = {METRICS_VERSION}")
+            self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Metrics store disabled ({db_path}): {e}")
+            self.conn = None
+
+    def get(self, left_path, right_path):
+        """Return stored metrics for the pair, or None if missing or either file changed"""
+        if self.conn is None:
+            return None
+        try:
+            left, right = file_stamp(left_path), file_stamp(right_path)
+            row = self.conn.execute(
+                "SELECT left_size, left_mtime, right_size, right_mtime, data FROM metrics "
+                "WHERE left_path = ? AND right_path = ?",
+                (left[0], right[0])
+            ).fetchone()
+        except (OSError, sqlite3.Error) as e:
+            logger.debug(f"Metrics store lookup failed for {left_path}, {right_path}: {e}")
+            return None
+
+        if row is None or tuple(row[:4]) != (left[1], left[2], right[1], right[2]):
+            return None
+        return json.loads(row[4])
+
+    def get_many(self, pairs):
+        """Return {index: metrics} for every (left, right) pair with up-to-date stored metrics"""
+        found = {}
+        for index, (left_path, right_path) in enumerate(pairs):
+            metrics = self.get(left_path, right_path)
+            if metrics is not None:
+                found[index] = metrics
+        return found
+
+    def put(self, left_path, right_path, metrics):
+        """Store metrics for the pair, stamped with both files' current size and mtime"""
+        if self.conn is None:
+            return
+        try:
+            left, right = file_stamp(left_path), file_stamp(right_path)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO metrics VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (*left, *right, json.dumps(metrics))
+            )
+            self.conn.commit()
+        except (OSError, sqlite3.Error) as e:
+            logger.warning(f"Failed to store metrics for {left_path}, {right_path}: {e}")
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
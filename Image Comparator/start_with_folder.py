@@ -3,9 +3,10 @@ import traceback
 from pathlib import Path
 import argparse
 import natsort
-from PyQt5.QtWidgets import QApplication, QFileDialog
-import main  # core GUI logic
 from typing import Optional
+from constants import MAX_CACHE_BYTES
+
+# PyQt5 and the GUI are imported lazily so --batch runs headless
 
 
 def get_images(folder: Path):
@@ -20,14 +21,16 @@ def get_images(folder: Path):
 
 def select_folder(title: str) -> Optional[Path]:
     """Show folder picker dialog."""
+    from PyQt5.QtWidgets import QFileDialog
     folder = QFileDialog.getExistingDirectory(None, title)
     return Path(folder) if folder else None
 
 
-def launch_gui(folder1: Path, folder2: Path, debug: bool):
+def launch_gui(folder1: Path, folder2: Path, debug: bool, cache_bytes: int = MAX_CACHE_BYTES):
     """Run the main PyQt GUI safely."""
+    import main  # core GUI logic
     try:
-        main.run_app(str(folder1), str(folder2))
+        main.run_app(str(folder1), str(folder2), cache_bytes)
     except Exception as e:
         print(f"Error launching app: {e}")
         if debug:
@@ -35,8 +38,9 @@ def launch_gui(folder1: Path, folder2: Path, debug: bool):
         input("Press Enter to exit...")
 
 
-def interactive_mode(debug: bool):
+def interactive_mode(debug: bool, cache_bytes: int = MAX_CACHE_BYTES):
     """Launch folder picker if no CLI inputs provided."""
+    from PyQt5.QtWidgets import QApplication
     app = QApplication(sys.argv)
 
     folder1 = select_folder("Select Folder 1")
@@ -63,7 +67,7 @@ def interactive_mode(debug: bool):
         input("Press Enter to exit...")
         return
 
-    launch_gui(folder1, folder2, debug)
+    launch_gui(folder1, folder2, debug, cache_bytes)
 
 
 def parse_args():
@@ -77,6 +81,45 @@ def parse_args():
         metavar=("FOLDER1", "FOLDER2"),
         help="Specify two folders directly instead of using the interactive picker."
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="Headless: compute metrics for every pair of --input and exit (no GUI)."
+    )
+    parser.add_argument(
+        "--output",
+        default="-",
+        help="Batch mode: file to stream per-pair results to ('-' for stdout)."
+    )
+    parser.add_argument(
+        "--format",
+        choices=("csv", "jsonl"),
+        default="csv",
+        help="Batch mode: result format (CSV or JSON Lines)."
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=None,
+        help="Batch mode: number of worker processes (default: CPU count)."
+    )
+    parser.add_argument(
+        "--worst",
+        type=int,
+        default=10,
+        help="Batch mode: how many worst pairs to list in the summary."
+    )
+    parser.add_argument(
+        "--recompute",
+        action="store_true",
+        help="Batch mode: ignore metrics cached from earlier runs."
+    )
+    parser.add_argument(
+        "--cache-mb",
+        type=int,
+        default=MAX_CACHE_BYTES // (1024 * 1024),
+        help="Memory budget for cached images, in MB."
+    )
     parser.add_argument(
         "--debug",
         action="store_true",
@@ -87,6 +130,29 @@ def parse_args():
 
 def main_launcher():
     args = parse_args()
+    if args.cache_mb < 1:
+        print("--cache-mb must be at least 1")
+        sys.exit(1)
+    cache_bytes = args.cache_mb * 1024 * 1024
+
+    if args.batch:
+        if not args.input:
+            print("Batch mode needs --input FOLDER1 FOLDER2")
+            sys.exit(1)
+        try:
+            from batch_metrics import run_batch
+            folder1 = Path(args.input[0]).resolve()
+            folder2 = Path(args.input[1]).resolve()
+            if not folder1.is_dir() or not folder2.is_dir():
+                raise ValueError("Both paths must be valid directories.")
+            failed = run_batch(str(folder1), str(folder2), args.output, args.format,
+                               args.jobs, args.worst, args.recompute)
+        except Exception as e:
+            print(f"Error: {e}", file=sys.stderr)  # stdout carries the results (and may be closed)
+            if args.debug:
+                traceback.print_exc()
+            sys.exit(1)
+        sys.exit(1 if failed else 0)
 
     if args.input:
         try:
@@ -94,14 +160,14 @@ def main_launcher():
             folder2 = Path(args.input[1]).resolve()
             if not folder1.is_dir() or not folder2.is_dir():
                 raise ValueError("Both paths must be valid directories.")
-            launch_gui(folder1, folder2, args.debug)
+            launch_gui(folder1, folder2, args.debug, cache_bytes)
         except Exception as e:
             print(f"Error: {e}")
             if args.debug:
                 traceback.print_exc()
             sys.exit(1)
     else:
-        interactive_mode(args.debug)
+        interactive_mode(args.debug, cache_bytes)
 
 
 if __name__ == "__main__":
@@ -6,7 +6,7 @@ import logging
 from PyQt5.QtCore import pyqtSignal, QRunnable, pyqtSlot, QObject, Qt
 from PyQt5.QtGui import QPixmap, QImage
 from constants import THUMBNAIL_SIZE
-from image_metrics import calculate_metrics
+from image_metrics import calculate_metrics, calculate_metrics_arrays, load_image
 
 logger = logging.getLogger(__name__)
 
@@ -18,15 +18,34 @@ class WorkerSignals(QObject):
     error = pyqtSignal(str)
 
 
+def array_to_qimage(array):
+    """Wrap a decoded image array in a QImage that shares its pixel buffer (no copy)"""
+    height, width = array.shape[:2]
+    if array.ndim == 2:
+        fmt = QImage.Format_Grayscale8
+    elif array.shape[2] == 4:
+        fmt = QImage.Format_ARGB32  # BGRA bytes on little-endian
+    else:
+        fmt = QImage.Format_BGR888
+    return QImage(array.data, width, height, array.strides[0], fmt)
+
+
 class ImageLoadWorker(QRunnable):
-    """Worker for loading images in thread pool"""
+    """
+    Worker for loading images in thread pool.
+
+    Each file is decoded once into a NumPy array that backs the displayed
+    QImage; with with_metrics=True the same arrays are used for the metrics,
+    so a pair is not read and decoded a second time by MetricsWorker.
+    """
     
-    def __init__(self, index, left_path, right_path, quality='full'):
+    def __init__(self, index, left_path, right_path, quality='full', with_metrics=False):
         super().__init__()
         self.index = index
         self.left_path = left_path
         self.right_path = right_path
         self.quality = quality
+        self.with_metrics = with_metrics
         self.signals = WorkerSignals()
         self.is_cancelled = False
     
@@ -35,28 +54,45 @@ class ImageLoadWorker(QRunnable):
     
     @pyqtSlot()
     def run(self):
+        arrays = []
         try:
             for side, path in [('left', self.left_path), ('right', self.right_path)]:
                 if self.is_cancelled:
                     return
                 
-                pixmap = self._load_image(path)
+                pixmap, array = self._load_image(path)
+                arrays.append(array)
                 if pixmap and not self.is_cancelled:
                     self.signals.image_loaded.emit(self.index, side, pixmap, self.quality)
         except Exception as e:
             self.signals.error.emit(f"Error loading image: {e}")
+            return
+        
+        if not self.with_metrics or self.is_cancelled:
+            return
+        if any(a is None for a in arrays):
+            self.signals.error.emit(f"Error calculating metrics: failed to decode "
+                                    f"{self.left_path} or {self.right_path}")
+            return
+        try:
+            metrics = calculate_metrics_arrays(*arrays)
+            if not self.is_cancelled:
+                self.signals.metrics_ready.emit(self.index, metrics)
+        except Exception as e:
+            self.signals.error.emit(f"Error calculating metrics: {e}")
     
     def _load_image(self, path):
-        """Load image based on quality setting"""
+        """Decode image once; return (pixmap for the quality setting, decoded array)"""
         try:
             if not os.path.exists(path):
                 logger.error(f"Image file not found: {path}")
-                return None
+                return None, None
                 
-            image = QImage(path)
-            if image.isNull():
+            array = load_image(path)
+            if array is None:
                 logger.error(f"Failed to load image (corrupted?): {path}")
-                return None
+                return None, None
+            image = array_to_qimage(array)
             
             if self.quality == 'thumbnail':
                 image = image.scaled(
@@ -66,10 +102,10 @@ class ImageLoadWorker(QRunnable):
                 )
             
             logger.debug(f"Successfully loaded {self.quality} image: {path}")
-            return QPixmap.fromImage(image)
+            return QPixmap.fromImage(image), array
         except Exception as e:
             logger.error(f"Error loading {path}: {e}")
-            return None
+            return None, None
 
 
 class MetricsWorker(QRunnable):
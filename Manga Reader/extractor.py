@@ -1,26 +1,249 @@
 import os
+import sys
+import json
 import zipfile
 import fitz  # PyMuPDF
 import shutil
+import struct
+import tempfile
+import argparse
+import threading
+import multiprocessing
 import subprocess
+from io import StringIO
+from contextlib import contextmanager, redirect_stdout
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
 from natsort import natsorted
-from collections import defaultdict
-import tempfile
+from collections import Counter, defaultdict
 
 from launcherlib.prints import print_success, print_warning, print_error, print_info, print_menu_header, print_menu_option
 from launcherlib.dialogs import ask_directory
 
 IMAGE_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.bmp', '.gif', '.tif', '.tiff')
 
+# Archives are extracted by a thread pool (zip inflating and UnRAR runs release
+# the GIL); PDF rendering is CPU bound, so those threads hand PDFs to a process pool.
+DEFAULT_JOBS = min(8, (os.cpu_count() or 1) * 2)
+PDF_PROCESSES = os.cpu_count() or 1
+
+# Page rendering (PDF pages without embedded images)
+DEFAULT_RENDER_DPI = 150  # used when a PDF has no embedded images to measure
+MIN_RENDER_DPI = 72
+MAX_RENDER_DPI = 600
+MIN_PAGES_PER_CHUNK = 4  # smaller chunks cost more in document opens than they save
+
+# Non-interactive policies (--pdf-mode, --on-encrypted, --on-mixed)
+PDF_MODES = {"ask": None, "images": "1", "render": "2", "defer": None}
+ENCRYPTED_POLICIES = ("ask", "skip", "defer")
+MIXED_POLICIES = ("ask", "proceed", "abort")
+
+# --to-cbz: pages already compressed by their format are stored, the rest deflated
+STORED_PAGE_EXTS = ('.jpg', '.jpeg', '.png', '.webp', '.gif')
+
+# Written into every destination folder: what was extracted there, from which archive version
+MANIFEST_NAME = ".extractor_manifest.json"
+# Written into every folder --to-cbz writes to: which archive each CBZ there was converted from
+CBZ_MANIFEST_NAME = ".extractor_cbz_manifest.json"
+
+
+# ---- CONSOLE ----
+class GroupedConsole:
+    """
+    Stands in for sys.stdout while the pool runs. Each worker thread prints into
+    its own buffer, and a finished archive's messages are written in one block
+    above a single status line that shows progress over all archives.
+    """
+
+    def __init__(self, real, total):
+        self.real = real
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.lock = threading.Lock()
+        self.local = threading.local()
+        self.live = hasattr(real, "isatty") and real.isatty()  # no status line when output goes to a file
+
+    # file-like interface used by print()
+    def write(self, text):
+        buffer = getattr(self.local, "buffer", None)
+        if buffer is not None:
+            return buffer.write(text)
+        with self.lock:
+            self._clear_status()
+            written = self.real.write(text)
+            self._draw_status()
+            return written
+
+    def flush(self):
+        self.real.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.real, name)
+
+    @contextmanager
+    def capture(self):
+        """Collect everything the current thread prints; yields the buffer."""
+        self.local.buffer = StringIO()
+        try:
+            yield self.local.buffer
+        finally:
+            self.local.buffer = None
+
+    def emit(self, text, ok=True):
+        """Print one archive's messages together and advance the progress line."""
+        with self.lock:
+            self._clear_status()
+            self.real.write(text)
+            self.done += 1
+            self.failed += not ok
+            self._draw_status()
+
+    def ask(self, prompt):
+        """input() for worker threads: prompts one at a time on the real console."""
+        with self.lock:
+            self._clear_status()
+            self.real.write(prompt)
+            self.real.flush()
+            answer = sys.stdin.readline().rstrip("\n")
+            self._draw_status()
+            return answer
+
+    def _status(self):
+        failed = f", {self.failed} failed" if self.failed else ""
+        return f"📦 {self.done}/{self.total} archives done{failed}"
+
+    def _clear_status(self):
+        if self.live:
+            self.real.write("\r" + " " * (len(self._status()) + 2) + "\r")
+
+    def _draw_status(self):
+        if self.live:
+            self.real.write(self._status())
+        self.real.flush()
+
+
+_console = None  # set while the pool is running
+
+
+class Deferred(Exception):
+    """An archive needs a human (password, PDF mode); it is set aside and handled after the run."""
+
+
+def ask_input(prompt):
+    """input() that also works from worker threads while the pool is running."""
+    if _console is not None:
+        return _console.ask(prompt)
+    return input(prompt)
+
+
+# ---- FILE NAMES ----
+class NameIndex:
+    """
+    Names present in each destination directory, read once with os.scandir and
+    updated as names are handed out, so picking a free name never needs a stat
+    call (slow on network shares). Names are compared with os.path.normcase, so
+    Windows' case-insensitive matching is kept.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()  # archives with different destinations run in parallel threads
+        self.dirs = {}
+        self.counters = {}  # (dir, base, ext) -> next suffix to try
+
+    def _names(self, directory):
+        key = os.path.normcase(os.path.abspath(directory))
+        names = self.dirs.get(key)
+        if names is None:
+            try:
+                with os.scandir(directory) as entries:
+                    names = {os.path.normcase(entry.name) for entry in entries}
+            except FileNotFoundError:
+                names = set()
+            self.dirs[key] = names
+        return key, names
+
+    def reserve(self, output_dir, filename):
+        """Return a free path for filename (name_1.ext, name_2.ext, ... on collision) and mark it taken."""
+        directory, name = os.path.split(os.path.join(output_dir, filename))
+        with self.lock:
+            key, names = self._names(directory)
+            if os.path.normcase(name) not in names:
+                names.add(os.path.normcase(name))
+                return os.path.join(directory, name)
+
+            base, ext = os.path.splitext(name)
+            counter_key = (key, os.path.normcase(base), os.path.normcase(ext))
+            counter = self.counters.get(counter_key, 1)
+            while os.path.normcase(f"{base}_{counter}{ext}") in names:
+                counter += 1
+            self.counters[counter_key] = counter + 1
+            candidate = f"{base}_{counter}{ext}"
+            names.add(os.path.normcase(candidate))
+            return os.path.join(directory, candidate)
+
+    def claim(self, path):
+        """Mark path taken; for files written under a name the index did not hand out."""
+        directory, name = os.path.split(path)
+        with self.lock:
+            _, names = self._names(directory)
+            names.add(os.path.normcase(name))
+
+    def release(self, path):
+        """Forget path (its file was deleted), so its name can be handed out again."""
+        directory, name = os.path.split(path)
+        with self.lock:
+            _, names = self._names(directory)
+            names.discard(os.path.normcase(name))
+
+
+_name_index = NameIndex()
+
+
 def get_unique_path(output_dir, filename):
-    """Return a unique path if filename already exists in output_dir."""
-    base, ext = os.path.splitext(filename)
-    candidate = os.path.join(output_dir, filename)
+    """Return a unique path for filename in output_dir and reserve it; call once per file written."""
+    return _name_index.reserve(output_dir, filename)
+
+def _free_names(path):
+    """path, then path_1, path_2, ... with the same folder and extension."""
+    yield path
+    base, ext = os.path.splitext(path)
     counter = 1
-    while os.path.exists(candidate):
-        candidate = os.path.join(output_dir, f"{base}_{counter}{ext}")
+    while True:
+        yield f"{base}_{counter}{ext}"
         counter += 1
-    return candidate
+
+def open_new(path):
+    """
+    Open path for writing without ever replacing a file. The index can miss a
+    file (written by another program, or by a worker process with its own
+    index), so the file is created exclusively and the next free name_N.ext is
+    used when something is already there. Returns (path used, binary file).
+    """
+    for candidate in _free_names(path):
+        try:
+            out_file = open(candidate, "xb")
+        except FileExistsError:
+            continue
+        if candidate != path:
+            _name_index.claim(candidate)
+        return candidate, out_file
+
+def move_new(src, path):
+    """Move src to path like open_new writes: never onto an existing file. Returns the path used."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    for candidate in _free_names(path):
+        if not os.path.lexists(candidate):
+            os.rename(src, candidate)
+            if candidate != path:
+                _name_index.claim(candidate)
+            return candidate
+
+def create_output(output_dir, filename):
+    """Reserve a unique path for filename and open it with open_new; returns (path, binary file)."""
+    path, out_file = open_new(get_unique_path(output_dir, filename))
+    if path != os.path.join(output_dir, filename):
+        print_warning(f"Duplicate filename sanitized: {filename}")
+    return path, out_file
 
 def detect_collisions(archives):
     groups = defaultdict(list)
@@ -45,175 +268,1007 @@ def find_archives(master_folder):
 
     return archives, extensions_found
 
+# ---- ARCHIVE PAGES ----
+def iter_cbz_pages(file_path, on_error=None):
+    """
+    Yield (member name, bytes) for the images of a CBZ, in natural order. A
+    member that cannot be read is passed to on_error(name, exception) and
+    skipped; without on_error the exception propagates.
+    """
+    with zipfile.ZipFile(file_path) as zip_ref:
+        names = natsorted(
+            name for name in zip_ref.namelist()
+            if name.lower().endswith(IMAGE_EXTS) and not name.endswith('/')
+        )
+        for name in names:
+            try:
+                data = zip_ref.read(name)
+            except Exception as e:
+                if on_error is None:
+                    raise
+                on_error(os.path.normpath(name), e)
+                continue
+            yield name, data
+
+def iter_pdf_pages(file_path, choice, scan):
+    """Yield (name, bytes) for a PDF: its embedded images once each (choice "1") or its rendered pages."""
+    doc = fitz.open(file_path)
+    try:
+        if choice == "1":
+            seen = set()
+            for xrefs in scan["images"]:
+                for xref in xrefs:
+                    if xref in seen:
+                        continue
+                    seen.add(xref)
+                    image = doc.extract_image(xref)
+                    yield f"{len(seen) - 1:03d}.{image['ext']}", image["image"]
+        else:
+            for page in doc:
+                yield f"{page.number:03d}.png", page.get_pixmap(dpi=scan["dpi"]).tobytes("png")
+    finally:
+        doc.close()
+
+def iter_rar_pages(file_path, passwords=()):
+    """
+    Yield (member name, bytes) for the images of a RAR, in natural order.
+    The archive is unpacked by one UnRAR run into a temporary folder and the
+    pages are read back from there: a solid RAR can only be decompressed
+    front to back, so piping pages out one "unrar p" at a time would start
+    over for every page. An encrypted RAR is tried with passwords; raises
+    Deferred when none of them opens it.
+    """
+    exe = unrar_executable()
+    if not exe:
+        raise RuntimeError(f"Missing UnRAR.exe in {os.path.dirname(os.path.abspath(__file__))} (or unrar on PATH)")
+    try:
+        headers = read_rar_headers(file_path)
+    except (ValueError, IndexError, struct.error):
+        headers = None
+    encrypted = headers is None or headers["encrypted"] or headers["headers_encrypted"]
+    candidates = ([] if headers and encrypted else [["-p-"]]) + [[f"-p{pw}"] for pw in passwords]
+
+    with tempfile.TemporaryDirectory(prefix="unrar-") as staging:
+        for password_args in candidates:
+            unpacked = tempfile.mkdtemp(dir=staging)  # a fresh folder per try: -o- keeps partial files
+            result = unrar_extract(exe, file_path, unpacked, password_args)
+            if result.returncode == 0:
+                break
+            if not rar_password_failed(result):
+                raise RuntimeError(f"UnRAR failed on {os.path.basename(file_path)}")
+        else:
+            raise Deferred("needs a password")
+
+        images = []
+        for root, _, files in os.walk(unpacked):
+            for f in files:
+                if f.lower().endswith(IMAGE_EXTS):
+                    images.append(os.path.relpath(os.path.join(root, f), unpacked).replace(os.sep, "/"))
+        for name in natsorted(images):
+            with open(os.path.join(unpacked, name), "rb") as f:
+                yield name, f.read()
+
 def extract_cbz(file_path, output_dir):
-    with zipfile.ZipFile(file_path, 'r') as zip_ref:
-        for name in zip_ref.namelist():
-            if name.lower().endswith(IMAGE_EXTS) and not name.endswith('/'):
-                # preserve folder structure inside output_dir
-                rel_path = os.path.normpath(name)
-                original = os.path.join(output_dir, rel_path)
-                unique = get_unique_path(output_dir, rel_path)
+    """Extract the images of a CBZ; returns the paths written."""
+    def report(rel_path, e):
+        print_error(f"Failed to extract {rel_path} from {os.path.basename(file_path)}: {e}")
 
-                if unique != original:
-                    print_warning(f"Duplicate filename sanitized: {rel_path}")
+    written = []
+    for name, data in iter_cbz_pages(file_path, on_error=report):
+        # preserve folder structure inside output_dir
+        rel_path = os.path.normpath(name)
+        os.makedirs(os.path.dirname(os.path.join(output_dir, rel_path)), exist_ok=True)
+        try:
+            unique, out_file = create_output(output_dir, rel_path)
+            with out_file:
+                out_file.write(data)
+            written.append(unique)
+        except OSError as e:
+            report(rel_path, e)
+    return written
 
-                os.makedirs(os.path.dirname(unique), exist_ok=True)
+def render_dpi(image_dpis):
+    """Render DPI for a PDF: the median resolution of its page images, clamped."""
+    if not image_dpis:
+        return DEFAULT_RENDER_DPI
+    dpi = sorted(image_dpis)[len(image_dpis) // 2]
+    return int(min(MAX_RENDER_DPI, max(MIN_RENDER_DPI, round(dpi))))
 
-                try:
-                    with zip_ref.open(name) as src, open(unique, "wb") as out_file:
-                        shutil.copyfileobj(src, out_file)
-                except Exception as e:
-                    print_error(
-                        f"Failed to extract {rel_path} from {os.path.basename(file_path)}: {e}"
-                    )
-
-def extract_pdf(file_path, output_dir):
+def page_image_dpi(page, images):
+    """Resolution of the largest of images (page.get_images() entries) drawn on page, or None."""
+    if not images:
+        return None
+    width, height = max(((img[2], img[3]) for img in images), key=lambda wh: wh[0] * wh[1])
+    page_w_in = page.rect.width / 72
+    page_h_in = page.rect.height / 72
+    if not (page_w_in and page_h_in):
+        return None
+    return max(width / page_w_in, height / page_h_in)
+
+def scan_pdf(file_path):
+    """
+    One pass over a PDF. Returns {"pages": page count, "images": [image xrefs
+    of each page], "dpi": render DPI implied by the largest image on each page}.
+    """
+    doc = fitz.open(file_path)
     try:
-        doc = fitz.open(file_path)
-        total_pages = len(doc)
-        pages_with_images = 0
-        img_index = 0
-
-        # Pass 1: check distribution
-        for i in range(total_pages):
-            if doc.get_page_images(i):
-                pages_with_images += 1
-
-        # If not all pages have images → ask user
-        if pages_with_images < total_pages:
-            print_warning(
-                f"PDF {os.path.basename(file_path)} contains {total_pages} pages "
-                f"but only {pages_with_images} pages with embedded images."
-            )
-            print_menu_header("Choose extraction mode:")
-            print_menu_option("1", "Extract embedded images only")
-            print_menu_option("2", "Render all pages as images.(⚠️ Some embedded images may not extract due to PDF encoding.)")
-            choice = input("Select (1/2): ").strip()
-        else:
-            choice = "1"
+        page_images = []
+        image_dpis = []
+        for page in doc:
+            images = page.get_images()
+            page_images.append([img[0] for img in images])
+            dpi = page_image_dpi(page, images)
+            if dpi:
+                image_dpis.append(dpi)
+        return {"pages": len(page_images), "images": page_images, "dpi": render_dpi(image_dpis)}
+    finally:
+        doc.close()
 
-        if choice == "1":
-            for i in range(total_pages):
-                for img in doc.get_page_images(i):
-                    xref = img[0]
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    ext = base_image["ext"]
-                    filename = f"{img_index:03d}.{ext}"
-                    out_path = get_unique_path(output_dir, filename)
-                    unique_path = get_unique_path(output_dir, filename)
-                    if unique_path != os.path.join(output_dir, filename):
-                        print_warning(f"Duplicate filename sanitized: {filename}")
-                    out_path = unique_path
-                    with open(out_path, "wb") as f:
-                        f.write(image_bytes)
-                    img_index += 1
-            if img_index == 0:
-                print_warning(f"No embedded images found in {os.path.basename(file_path)}")
-            else:
-                print_success(f"Extracted {img_index} images from {os.path.basename(file_path)}")
+def choose_pdf_mode(file_path, scan, pdf_mode="ask"):
+    """
+    Return "1" (embedded images) or "2" (render pages) for a scanned PDF.
+    Only a PDF with pages lacking an embedded image needs a decision: it is
+    taken from pdf_mode ("images"/"render"), asked ("ask"), or deferred to
+    the end of the run ("defer", raises Deferred).
+    """
+    total_pages = scan["pages"]
+    pages_with_images = sum(1 for xrefs in scan["images"] if xrefs)
 
-        elif choice == "2":
-            for i, page in enumerate(doc):
-                pix = page.get_pixmap()
-                filename = f"{i:03d}.png"
-                out_path = get_unique_path(output_dir, filename)
-                unique_path = get_unique_path(output_dir, filename)
-                if unique_path != os.path.join(output_dir, filename):
-                    print_warning(f"Duplicate filename sanitized: {filename}")
-                out_path = unique_path
-                pix.save(out_path)
-            print_success(f"Rendered {total_pages} pages as images in {os.path.basename(file_path)}")
+    if pages_with_images == total_pages:
+        return "1"
+    if PDF_MODES.get(pdf_mode):
+        return PDF_MODES[pdf_mode]
+    if pdf_mode == "defer":
+        raise Deferred(f"only {pages_with_images} of its {total_pages} pages have embedded images; choose an extraction mode")
+
+    print_warning(
+        f"PDF {os.path.basename(file_path)} contains {total_pages} pages "
+        f"but only {pages_with_images} pages with embedded images."
+    )
+    print_menu_header("Choose extraction mode:")
+    print_menu_option("1", "Extract embedded images only")
+    print_menu_option("2", "Render all pages as images.(⚠️ Some embedded images may not extract due to PDF encoding.)")
+    while True:
+        choice = ask_input("Select (1/2): ").strip()
+        if choice in ("1", "2"):
+            return choice
+        print_warning("Invalid choice. Please enter 1 or 2.")
+
+def extract_pdf_images(file_path, output_dir, scan):
+    """
+    Write every embedded image once, in page order; an image shared by several
+    pages is written only once. Returns the paths written.
+    """
+    written = []
+    for filename, data in iter_pdf_pages(file_path, "1", scan):
+        out_path, f = create_output(output_dir, filename)
+        with f:
+            f.write(data)
+        written.append(out_path)
 
+    if not written:
+        print_warning(f"No embedded images found in {os.path.basename(file_path)}")
+    else:
+        print_success(f"Extracted {len(written)} images from {os.path.basename(file_path)}")
+    return written
+
+def render_pages_worker(file_path, pages, dpi):
+    """Render (page number, output path) pairs with this process' own document; returns the paths used."""
+    doc = fitz.open(file_path)
+    written = []
+    try:
+        for pno, out_path in pages:
+            out_path, f = open_new(out_path)
+            with f:
+                f.write(doc[pno].get_pixmap(dpi=dpi).tobytes("png"))
+            written.append(out_path)
+    finally:
         doc.close()
-        return True
+    return written
+
+def render_pdf_pages(file_path, output_dir, scan, pool=None):
+    """
+    Render every page to PNG at the PDF's render DPI and return the paths.
+    Output names are reserved here; with a process pool the pages are split
+    into contiguous chunks, one document opened per chunk, and this process
+    never touches fitz.
+    """
+    total_pages = scan["pages"]
+    pages = []
+    for i in range(total_pages):
+        filename = f"{i:03d}.png"
+        out_path = get_unique_path(output_dir, filename)
+        if out_path != os.path.join(output_dir, filename):
+            print_warning(f"Duplicate filename sanitized: {filename}")
+        pages.append((i, out_path))
+
+    if pool is None:
+        written = render_pages_worker(file_path, pages, scan["dpi"])
+    else:
+        chunk = max(MIN_PAGES_PER_CHUNK, -(-total_pages // PDF_PROCESSES))
+        futures = [
+            pool.submit(render_pages_worker, file_path, pages[i:i + chunk], scan["dpi"])
+            for i in range(0, total_pages, chunk)
+        ]
+        written = [path for future in futures for path in future.result()]
+        for (_, reserved), path in zip(pages, written):
+            if path != reserved:
+                _name_index.claim(path)  # a worker found the reserved name taken on disk
+    print_success(f"Rendered {total_pages} pages at {scan['dpi']} dpi as images in {os.path.basename(file_path)}")
+    return written
+
+def extract_pdf(file_path, output_dir, choice=None, scan=None, pool=None):
+    """
+    Extract a PDF's images (choice "1") or render its pages (choice "2"); asks
+    when choice is None. scan is reused from scan_pdf when the caller already has it.
+    With pool, page rendering is spread over its processes. Returns the paths
+    written, or None on failure.
+    """
+    try:
+        if scan is None:
+            scan = scan_pdf(file_path)
+        if choice is None:
+            choice = choose_pdf_mode(file_path, scan)
+
+        if choice == "1":
+            return extract_pdf_images(file_path, output_dir, scan)
+        elif choice == "2":
+            return render_pdf_pages(file_path, output_dir, scan, pool)
+        print_error(f"Invalid extraction mode for PDF {os.path.basename(file_path)}: {choice!r}")
+        return None  # nothing extracted, so no manifest entry: the next run asks again
 
     except Exception as e:
         print_error(f"Failed to extract PDF {os.path.basename(file_path)}: {e}")
-        return False
+        return None
 
-def extract_rar(file_path, output_dir):
-    exe = os.path.join(os.path.dirname(__file__), "UnRAR.exe")
-    if not os.path.exists(exe):
-        print_error(f"Missing UnRAR.exe in {os.path.dirname(__file__)}")
-        return False
+def unrar_executable():
+    """The bundled UnRAR.exe on Windows, else an unrar found on PATH (Linux/macOS), else None."""
+    exe = os.path.join(os.path.dirname(os.path.abspath(__file__)), "UnRAR.exe")
+    if os.name == "nt" and os.path.exists(exe):
+        return exe
+    return shutil.which("unrar") or shutil.which("UnRAR")
 
-    try:
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # first test if archive requires a password
-            test_cmd = [exe, "t", "-y", "-p-", file_path]
-            test = subprocess.run(
-                test_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
-            )
-            needs_password = (
-                test.returncode in (1, 3)
-                or b"password" in test.stdout.lower()
-                or b"password" in test.stderr.lower()
-                or b"crc failed" in test.stdout.lower()
-                or b"crc failed" in test.stderr.lower()
-            )
-
-            while True:
-                cmd = [exe, "x", "-y"]
-
-                if needs_password:
-                    pw = input(f"Password required for {os.path.basename(file_path)}: ").strip()
-                    cmd.append(f"-p{pw}")
-                else:
-                    cmd.append("-p-")
+RAR4_MARKER = b"Rar!\x1a\x07\x00"
+RAR5_MARKER = b"Rar!\x1a\x07\x01\x00"
+RAR4_BLOCK = struct.Struct("<HBHH")  # crc, type, flags, size
+RAR4_FILE = struct.Struct("<LLBLLBBHL")  # pack size ... attributes
+UNRAR_BAD_PASSWORD = 11  # exit code of UnRAR 5+; older versions use 1 or 3
+
+def _rar_vint(buf, pos):
+    """Decode a RAR5 variable length integer at pos; returns (value, next pos)."""
+    value = shift = 0
+    while True:
+        byte = buf[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+def _rar4_unicode_name(std, data):
+    """Decode the compressed UTF-16 half of a RAR 2.x-4.x file name."""
+    out = []
+    high = data[0]
+    pos = 1
+    flags = flag_bits = 0
+    while pos < len(data):
+        if flag_bits == 0:
+            flags = data[pos]
+            pos += 1
+            flag_bits = 8
+        flag_bits -= 2
+        kind = (flags >> flag_bits) & 3
+        if kind == 0:
+            out.append(data[pos])
+            pos += 1
+        elif kind == 1:
+            out.append(data[pos] | (high << 8))
+            pos += 1
+        elif kind == 2:
+            out.append(data[pos] | (data[pos + 1] << 8))
+            pos += 2
+        else:
+            count = data[pos]
+            pos += 1
+            if count & 0x80:
+                correction = data[pos]
+                pos += 1
+                for _ in range((count & 0x7F) + 2):
+                    out.append(((std[len(out)] + correction) & 0xFF) | (high << 8))
+            else:
+                for _ in range(count + 2):
+                    out.append(std[len(out)])
+    return "".join(map(chr, out))
+
+def _rar4_headers(f, info):
+    f.seek(len(RAR4_MARKER))
+    while True:
+        block = f.read(RAR4_BLOCK.size)
+        if len(block) < RAR4_BLOCK.size:
+            return info
+        _, kind, flags, size = RAR4_BLOCK.unpack(block)
+        if size < RAR4_BLOCK.size:
+            raise ValueError("bad RAR block header")
+        body = f.read(size - RAR4_BLOCK.size)
+        data_size = struct.unpack_from("<L", body)[0] if flags & 0x8000 else 0
+        if kind == 0x73 and flags & 0x0080:  # main header: headers are encrypted
+            info["headers_encrypted"] = True
+            return info
+        if kind == 0x74:  # file
+            fields = RAR4_FILE.unpack_from(body)
+            name_size = fields[7]
+            pos = RAR4_FILE.size
+            if flags & 0x0100:  # 64-bit sizes
+                data_size += struct.unpack_from("<L", body, pos)[0] << 32
+                pos += 8
+            raw = body[pos:pos + name_size]
+            if flags & 0x0200 and b"\0" in raw:
+                std, _, encoded = raw.partition(b"\0")
+                try:
+                    name = _rar4_unicode_name(std, encoded)
+                except IndexError:
+                    name = std.decode("latin-1")
+            else:
+                name = raw.decode("utf-8", errors="replace")
+            name = name.replace("\\", "/")
+            if flags & 0x0004:
+                info["encrypted"] = True
+            (info["dirs"] if flags & 0x00E0 == 0x00E0 else info["files"]).append(name)
+        elif kind == 0x7B:  # end of archive
+            return info
+        f.seek(data_size, os.SEEK_CUR)
+
+def _rar5_headers(f, info):
+    f.seek(len(RAR5_MARKER))
+    while True:
+        head = f.read(7)  # crc32 + header size (a vint of up to 3 bytes)
+        if len(head) < 5:
+            return info
+        size, pos = _rar_vint(head, 4)
+        if size < 2:
+            raise ValueError("bad RAR5 header size")
+        header = head[pos:] + f.read(size - (len(head) - pos))
+        kind, pos = _rar_vint(header, 0)
+        flags, pos = _rar_vint(header, pos)
+        extra_size = data_size = 0
+        if flags & 0x0001:
+            extra_size, pos = _rar_vint(header, pos)
+        if flags & 0x0002:
+            data_size, pos = _rar_vint(header, pos)
+        if kind == 4:  # archive encryption header: everything after it is encrypted
+            info["headers_encrypted"] = True
+            return info
+        if kind == 2:  # file
+            file_flags, pos = _rar_vint(header, pos)
+            _, pos = _rar_vint(header, pos)  # unpacked size
+            _, pos = _rar_vint(header, pos)  # attributes
+            pos += (4 if file_flags & 0x0002 else 0) + (4 if file_flags & 0x0004 else 0)
+            _, pos = _rar_vint(header, pos)  # compression
+            _, pos = _rar_vint(header, pos)  # host OS
+            name_size, pos = _rar_vint(header, pos)
+            name = header[pos:pos + name_size].decode("utf-8", errors="replace")
+            extra = size - extra_size
+            while extra < size:
+                record_size, record = _rar_vint(header, extra)
+                if _rar_vint(header, record)[0] == 0x01:  # file encryption record
+                    info["encrypted"] = True
+                extra = record + record_size
+            (info["dirs"] if file_flags & 0x0001 else info["files"]).append(name)
+        elif kind == 5:  # end of archive
+            return info
+        f.seek(data_size, os.SEEK_CUR)
 
-                cmd.extend([file_path, temp_dir + os.sep])
+def read_rar_headers(file_path):
+    """
+    Read a RAR's block headers without decompressing anything. Returns
+    {"headers_encrypted", "encrypted", "files", "dirs"} (member names use "/"),
+    or None if the file does not start with a RAR 4 or RAR 5 signature.
+    With encrypted headers the name lists stay empty.
+    """
+    info = {"headers_encrypted": False, "encrypted": False, "files": [], "dirs": []}
+    with open(file_path, "rb") as f:
+        marker = f.read(len(RAR5_MARKER))
+        if marker == RAR5_MARKER:
+            return _rar5_headers(f, info)
+        if marker.startswith(RAR4_MARKER):
+            return _rar4_headers(f, info)
+    return None
 
+def list_rar_files(exe, file_path, password_args):
+    """
+    Member files of a RAR as listed by UnRAR (needed when its headers are
+    encrypted). Returns (files, failed CompletedProcess or None).
+    """
+    result = subprocess.run([exe, "lb", *password_args, file_path], stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+    if result.returncode != 0:
+        return None, result
+    names = [name.replace("\\", "/") for name in result.stdout.decode("utf-8", errors="replace").splitlines() if name]
+    parents = {os.path.dirname(name) for name in names}
+    # "lb" lists folders too; a name that is another name's parent is a folder
+    parents |= {os.path.dirname(parent) for parent in parents}
+    return [name for name in names if name not in parents], None
+
+def rar_password_failed(result):
+    """True when a failed UnRAR run looks like a missing or wrong password."""
+    output = (result.stdout + result.stderr).lower()
+    return (
+        result.returncode in (1, 3, UNRAR_BAD_PASSWORD)
+        or b"password" in output
+        or b"crc failed" in output
+    )
+
+def plan_rar_members(output_dir, files):
+    """Reserve an output path for every member; returns [(member, path)]."""
+    plan = []
+    for name in files:
+        rel_path = os.path.normpath(name)
+        unique = get_unique_path(output_dir, rel_path)
+        if unique != os.path.join(output_dir, rel_path):
+            print_warning(f"Duplicate filename sanitized: {rel_path}")
+        plan.append((name, unique))
+    return plan
+
+def unrar_extract(exe, file_path, dest_dir, password_args):
+    """One UnRAR "x" run over the whole archive into dest_dir, never overwriting; returns the CompletedProcess."""
+    return subprocess.run(
+        [exe, "x", "-o-", "-y", *password_args, file_path, dest_dir + os.sep],
+        stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+    )
+
+def unrar_into(exe, file_path, output_dir, plan, password_args):
+    """
+    Extract a RAR in one UnRAR run into a staging folder inside output_dir,
+    then move each member to its reserved path (a rename on the same disk,
+    never onto an existing file). No member masks are passed to UnRAR, so
+    names with wildcards or differing only in case are handled by the move;
+    members whose names collide on a case-insensitive disk are piped out
+    one by one instead. Returns (paths written, failed CompletedProcess or None).
+    """
+    staging = tempfile.mkdtemp(prefix=".unrar-", dir=output_dir)
+    try:
+        result = unrar_extract(exe, file_path, staging, password_args)
+        if result.returncode != 0:
+            return None, result
+
+        shared = Counter(os.path.normcase(os.path.normpath(name)) for name, _ in plan)
+        written = []
+        for name, path in plan:
+            src = os.path.join(staging, os.path.normpath(name))
+            if shared[os.path.normcase(os.path.normpath(name))] == 1 and os.path.isfile(src):
+                written.append(move_new(src, path))
+                continue
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            path, out_file = open_new(path)
+            with out_file:
                 result = subprocess.run(
-                    cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE
+                    [exe, "p", "-inul", *password_args, file_path, os.path.normpath(name)],
+                    stdout=out_file, stderr=subprocess.PIPE,
                 )
+            if result.returncode != 0:
+                os.remove(path)
+                result.stdout = b""
+                for done in written:
+                    os.remove(done)
+                return None, result
+            written.append(path)
+        return written, None
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
 
-                # check if extraction succeeded
-                if result.returncode == 0:
-                    break
-
-                if needs_password and (
-                    result.returncode in (1, 3)
-                    or b"password" in result.stdout.lower()
-                    or b"password" in result.stderr.lower()
-                    or b"crc failed" in result.stdout.lower()
-                    or b"crc failed" in result.stderr.lower()
-                ):
-                    print_warning("Incorrect password.")
-                    retry = input("Retry password? (y to retry / s to skip): ").strip().lower()
-                    if retry == "y":
-                        continue
-                    else:
-                        print_warning(f"Skipping {os.path.basename(file_path)}")
-                        return False
-                else:
-                    print_error(f"UnRAR failed on {os.path.basename(file_path)}")
-                    return False
+def read_password_file(path):
+    """Passwords to try on encrypted RARs, one per line (blank lines ignored)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.rstrip("\r\n") for line in f if line.strip()]
+
+def extract_rar(file_path, output_dir, passwords=(), on_encrypted="ask"):
+    """
+    Extract a RAR in a single pass. Encryption is read from the archive
+    headers, so the password is dealt with up front (no test pass), and
+    members end up in output_dir under names reserved by the index (see
+    unrar_into). Returns the paths written, or None on failure.
 
-            # move files safely into output_dir, preserving structure
-            for root, _, files in os.walk(temp_dir):
-                for f in files:
-                    src = os.path.join(root, f)
-                    rel_path = os.path.relpath(src, temp_dir)
-                    original = os.path.join(output_dir, rel_path)
-                    unique = get_unique_path(output_dir, rel_path)
+    An encrypted RAR is tried with each of passwords first; if none fits,
+    on_encrypted says whether to ask, skip it, or defer it (raises Deferred).
+    """
+    exe = unrar_executable()
+    if not exe:
+        print_error(f"Missing UnRAR.exe in {os.path.dirname(os.path.abspath(__file__))} (or unrar on PATH)")
+        return None
 
-                    if unique != original:
-                        print_warning(f"Duplicate filename sanitized: {rel_path}")
+    name = os.path.basename(file_path)
+    try:
+        try:
+            headers = read_rar_headers(file_path)
+        except (ValueError, IndexError, struct.error):
+            headers = None  # damaged or unusual headers: let UnRAR decide
+        needs_password = bool(headers) and (headers["encrypted"] or headers["headers_encrypted"])
+        plan = None
+        if headers and not headers["headers_encrypted"]:
+            plan = plan_rar_members(output_dir, headers["files"])
+
+        candidates = list(passwords)
+        while True:
+            from_file = False
+            password_args = ["-p-"]
+            if needs_password:
+                if candidates:
+                    pw = candidates.pop(0)
+                    from_file = True
+                elif on_encrypted in ("skip", "defer"):
+                    for _, path in plan or []:
+                        _name_index.release(path)  # nothing was kept; a later attempt gets the same names
+                    if on_encrypted == "defer":
+                        raise Deferred("needs a password")
+                    print_warning(f"Skipping {name}: password protected")
+                    return None
+                else:
+                    pw = ask_input(f"Password required for {name}: ").strip()
+                password_args = [f"-p{pw}"]
 
-                    os.makedirs(os.path.dirname(unique), exist_ok=True)
-                    shutil.move(src, unique)
+            failed = None
+            if plan is None:
+                files, failed = list_rar_files(exe, file_path, password_args)
+                if failed is None:
+                    plan = plan_rar_members(output_dir, files)
+            if failed is None:
+                written, failed = unrar_into(exe, file_path, output_dir, plan, password_args)
+            if failed is None:
+                return written
 
-        return True
+            if rar_password_failed(failed) and (needs_password or headers is None):
+                if needs_password and not from_file:
+                    print_warning("Incorrect password.")
+                    retry = ask_input("Retry password? (y to retry / s to skip): ").strip().lower()
+                    if retry != "y":
+                        print_warning(f"Skipping {name}")
+                        return None
+                needs_password = True
+                continue
+
+            print_error(f"UnRAR failed on {name}")
+            return None
+    except Deferred:
+        raise
     except Exception as e:
         print_error(f"Failed to extract RAR {file_path}: {e}")
-        return False
+        return None
 
 def safe_folder_name(path):
     return os.path.splitext(os.path.basename(path))[0]
 
-def main():
-    master_folder = ask_directory("Select Master Folder Containing CBZ/PDF/RAR")
+def destination_folder(path):
+    return os.path.join(os.path.dirname(path), safe_folder_name(path))
+
+def pdf_images_worker(file_path, output_dir, scan):
+    """
+    Runs extract_pdf's embedded-image mode in a worker process; returns
+    (paths written, printed output). The process' own name index starts
+    fresh for every call so it sees the files written since the last one;
+    the caller records the returned names in its index.
+    """
+    global _name_index
+    _name_index = NameIndex()
+    with redirect_stdout(StringIO()) as out:
+        written = extract_pdf(file_path, output_dir, "1", scan)
+    return written, out.getvalue()
+
+def extract_archive(path, dest_folder, pdf_plan=None, pdf_pool=None, passwords=(), on_encrypted="ask"):
+    """
+    Extract one archive into dest_folder. Returns the paths written, or None
+    on failure; raises Deferred when it has to wait for a human.
+    """
+    os.makedirs(dest_folder, exist_ok=True)
+    ext = os.path.splitext(path)[1].lower()
+    print(f"📁 Extracting: {os.path.basename(path)}")
+
+    try:
+        if ext == '.cbz':
+            return extract_cbz(path, dest_folder)
+        elif ext == '.pdf':
+            choice, scan = pdf_plan or (None, None)
+            if pdf_pool is not None and scan is None:
+                written = None  # scan_pdf already reported why the PDF cannot be opened
+            elif pdf_pool is not None and choice == "1":
+                # PyMuPDF is not thread-safe, so fitz never runs in this thread
+                written, output = pdf_pool.submit(pdf_images_worker, path, dest_folder, scan).result()
+                print(output, end="")
+                for out_path in written or []:
+                    _name_index.claim(out_path)
+            else:
+                written = extract_pdf(path, dest_folder, choice, scan, pdf_pool)
+        elif ext == '.rar':
+            written = extract_rar(path, dest_folder, passwords, on_encrypted)
+        else:
+            print_warning(f"Unsupported format: {path}")
+            return None
+
+        if written is None:
+            print_error(f"Failed to extract {os.path.basename(path)}")
+        return written
+
+    except Deferred:
+        raise
+    except Exception as e:
+        print_error(f"Extraction failed for {os.path.basename(path)}: {e}")
+        return None
+
+def archive_stamp(path):
+    """What identifies one version of an archive: its size and modification time."""
+    st = os.stat(path)
+    return {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+def read_manifest(dest_folder, filename=MANIFEST_NAME):
+    """{archive file name: {"size", "mtime_ns", "pages", "files"}} for dest_folder; {} if there is none."""
+    try:
+        with open(os.path.join(dest_folder, filename), encoding="utf-8") as f:
+            return json.load(f).get("archives", {})
+    except (OSError, ValueError, AttributeError):
+        return {}
+
+def write_manifest(dest_folder, manifest, filename=MANIFEST_NAME):
+    path = os.path.join(dest_folder, filename)
+    try:
+        with open(path + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"archives": manifest}, f, indent=1)
+        os.replace(path + ".tmp", path)
+    except OSError as e:
+        print_warning(f"Could not write {path}: {e}")
+
+def plan_extraction(archives, force=False):
+    """
+    Split archives into those to extract and those already extracted, going
+    by the manifest of each destination folder (read once per folder) and one
+    stat per archive. Returns (pending, skipped, manifests, stamps).
+    """
+    manifests = {}
+    stamps = {}
+    pending = []
+    skipped = []
+    for path in natsorted(archives):
+        dest = destination_folder(path)
+        if dest not in manifests:
+            manifests[dest] = read_manifest(dest)
+        stamps[path] = archive_stamp(path)
+        entry = manifests[dest].get(os.path.basename(path))
+        if not force and entry and all(entry.get(k) == v for k, v in stamps[path].items()):
+            skipped.append(path)
+        else:
+            pending.append(path)
+    return pending, skipped, manifests, stamps
+
+def remove_extracted(dest_folder, entry):
+    """Delete the files a previous extraction wrote, so the new version gets the same names."""
+    for rel_path in entry.get("files", []):
+        path = os.path.join(dest_folder, rel_path)
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        _name_index.release(path)
+
+def extract_group(paths, dest_folder, pdf_plans, pdf_pool, console, manifest, stamps, rar_policy, deferred):
+    """
+    Worker thread job: extract archives that share dest_folder one after
+    another (so their file names and manifest never race), emitting each
+    archive's output as one block. Archives that need a human go to deferred.
+    """
+    for path in paths:
+        name = os.path.basename(path)
+        with console.capture() as buffer:
+            previous = manifest.pop(name, None)
+            if previous:
+                print_info(f"{name} changed since it was last extracted; replacing its {previous.get('pages', 0)} pages.")
+                remove_extracted(dest_folder, previous)
+            try:
+                written = extract_archive(path, dest_folder, pdf_plans.get(path), pdf_pool, *rar_policy)
+            except Deferred as e:
+                print_warning(f"⏸️ {name} {e}; it will be handled at the end.")
+                deferred.append((path, str(e)))
+                if previous:
+                    write_manifest(dest_folder, manifest)
+                console.emit(buffer.getvalue(), True)
+                continue
+            if written is not None:
+                manifest[name] = {
+                    **stamps[path],
+                    "pages": sum(1 for p in written if p.lower().endswith(IMAGE_EXTS)),
+                    "files": [os.path.relpath(p, dest_folder) for p in written],
+                }
+            if written is not None or previous:
+                write_manifest(dest_folder, manifest)
+        console.emit(buffer.getvalue(), written is not None)
+
+def run_extraction(archives, jobs, manifests=None, stamps=None, pdf_mode="ask", passwords=(), on_encrypted="ask"):
+    """
+    Extract all archives in parallel. manifests and stamps come from
+    plan_extraction. Returns (number of failures, [(path, reason)] of the
+    archives deferred by the "defer" policies).
+    """
+    global _console
+
+    if manifests is None:
+        _, _, manifests, stamps = plan_extraction(archives, force=True)
+
+    # PDFs are scanned once here and the mode prompts happen one by one, before any worker starts
+    deferred = []
+    pdf_plans = {}
+    for path in natsorted(archives):
+        if path.lower().endswith(".pdf"):
+            try:
+                scan = scan_pdf(path)
+                pdf_plans[path] = (choose_pdf_mode(path, scan, pdf_mode), scan)
+            except Deferred as e:
+                print_warning(f"⏸️ {os.path.basename(path)}: {e}; it will be handled at the end.")
+                deferred.append((path, str(e)))
+            except Exception as e:
+                print_error(f"Failed to open PDF {os.path.basename(path)}: {e}")
+
+    groups = defaultdict(list)
+    waiting = {path for path, _ in deferred}
+    for path in natsorted(archives):
+        if path not in waiting:
+            groups[destination_folder(path)].append(path)
+
+    real_stdout = sys.stdout
+    console = GroupedConsole(real_stdout, len(archives) - len(waiting))
+    _console = console
+    sys.stdout = console
+    try:
+        # spawn, not fork: the PDF processes start while other threads may hold locks
+        pdf_pool = ProcessPoolExecutor(max_workers=PDF_PROCESSES, mp_context=multiprocessing.get_context("spawn"))
+        with ThreadPoolExecutor(max_workers=jobs) as pool, pdf_pool:
+            futures = [
+                pool.submit(extract_group, paths, dest, pdf_plans, pdf_pool, console, manifests[dest], stamps,
+                            (passwords, on_encrypted), deferred)
+                for dest, paths in groups.items()
+            ]
+            for future in as_completed(futures):
+                future.result()
+    finally:
+        sys.stdout = real_stdout
+        _console = None
+        console._clear_status()
+    return console.failed, deferred
+
+# ---- ARCHIVE TO CBZ ----
+def transcode_archive(file_path, target, pdf_plan=None, passwords=(), on_encrypted="ask"):
+    """
+    Write the pages of a CBZ/PDF/RAR straight into a new CBZ at target,
+    page by page, without an intermediate folder. Pages are renamed
+    0000.ext, 0001.ext, ... in reading order. Returns "ok", "failed" or
+    "deferred".
+    """
+    name = os.path.basename(file_path)
+    ext = os.path.splitext(file_path)[1].lower()
+    tmp_path = target + ".tmp"
+    try:
+        if ext == ".cbz":
+            pages = iter_cbz_pages(file_path)
+        elif ext == ".pdf":
+            choice, scan = pdf_plan
+            pages = iter_pdf_pages(file_path, choice, scan)
+        else:
+            pages = iter_rar_pages(file_path, passwords)
+
+        count = 0
+        with zipfile.ZipFile(tmp_path, "w") as cbz:
+            for member, data in pages:
+                page_ext = os.path.splitext(member)[1].lower()
+                compress = zipfile.ZIP_STORED if page_ext in STORED_PAGE_EXTS else zipfile.ZIP_DEFLATED
+                cbz.writestr(f"{count:04d}{page_ext}", data, compress_type=compress)
+                count += 1
+        if not count:
+            os.remove(tmp_path)
+            print_warning(f"No pages found in {name}")
+            return "failed"
+        os.replace(tmp_path, target)
+        print_success(f"Converted {name} → {os.path.basename(target)} ({count} pages)")
+        return "ok"
+
+    except Deferred as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        if on_encrypted == "skip":
+            print_warning(f"Skipping {name}: password protected")
+            return "failed"
+        print_warning(f"⏸️ {name} {e}; it will be handled at the end.")
+        return "deferred"
+    except Exception as e:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        print_error(f"Failed to convert {name}: {e}")
+        return "failed"
+
+def transcode_worker(file_path, target, pdf_plan, passwords, on_encrypted):
+    """Runs transcode_archive in a worker process; returns (status, printed output)."""
+    with redirect_stdout(StringIO()) as out:
+        status = transcode_archive(file_path, target, pdf_plan, passwords, on_encrypted)
+    return status, out.getvalue()
+
+def plan_cbz_targets(archives, output_dir=None, force=False):
+    """
+    Output CBZ of each archive: <name>.cbz next to it, or in output_dir.
+
+    CBZs written by earlier runs are known from the CBZ manifest of their
+    folder: they are not sources themselves, and an archive that was
+    converted before keeps its CBZ and is skipped while that CBZ exists and
+    the archive is unchanged (unless force). Any other target never lands
+    on a source archive or a file already there; such names get _1, _2, ...
+    A CBZ source stays where it is (it is only rewritten into another folder).
+    Returns ({archive: target}, skipped, [CBZs left in place], manifests).
+    """
+    def key(path):
+        return os.path.normcase(os.path.abspath(path))
+
+    def target_folder(path):
+        return os.path.normpath(output_dir or os.path.dirname(path))
+
+    manifests = {}
+    earlier = {}  # source -> CBZ an earlier run converted it to
+    for path in archives:
+        # the archive's own folder too, for CBZs converted there before (without --output)
+        for folder in {target_folder(path), os.path.normpath(os.path.dirname(path))}:
+            if folder not in manifests:
+                manifests[folder] = read_manifest(folder, CBZ_MANIFEST_NAME)
+                for cbz, entry in manifests[folder].items():
+                    earlier.setdefault(key(os.path.join(folder, entry.get("source", ""))), []).append(
+                        os.path.join(folder, cbz))
+    keys = {key(path) for path in archives}
+    results = {key(cbz) for source, cbzs in earlier.items() if source in keys for cbz in cbzs}
+
+    targets = {}
+    skipped = []
+    in_place = []
+    taken = set(keys)
+    for path in natsorted(archives):
+        if key(path) in results:
+            continue  # written by an earlier run from another archive of this library
+        folder = target_folder(path)
+        previous = next((cbz for cbz in earlier.get(key(path), [])
+                         if key(os.path.dirname(cbz)) == key(folder) and os.path.exists(cbz)), None)
+        if previous:
+            entry = manifests[folder][os.path.basename(previous)]
+            if not force and all(entry.get(k) == v for k, v in archive_stamp(path).items()):
+                skipped.append(path)
+            else:
+                targets[path] = previous
+            continue
+
+        base = safe_folder_name(path)
+        target = os.path.join(folder, base + ".cbz")
+        if key(target) == key(path):
+            in_place.append(path)
+            continue
+        counter = 1
+        while key(target) in taken or os.path.exists(target):
+            target = os.path.join(folder, f"{base}_{counter}.cbz")
+            counter += 1
+        taken.add(key(target))
+        targets[path] = target
+    return targets, skipped, in_place, manifests
+
+def record_conversion(manifests, path, target):
+    """Note in the CBZ manifest of target's folder that target was converted from path."""
+    folder = os.path.dirname(target)
+    manifest = manifests.setdefault(folder, read_manifest(folder, CBZ_MANIFEST_NAME))
+    manifest[os.path.basename(target)] = {"source": os.path.relpath(path, folder), **archive_stamp(path)}
+    write_manifest(folder, manifest, CBZ_MANIFEST_NAME)
+
+def run_transcode(targets, jobs, manifests, pdf_mode="ask", passwords=(), on_encrypted="ask"):
+    """
+    Convert archives to CBZs in a process pool, one archive per process so
+    PyMuPDF never shares a process between threads. Each CBZ written is
+    recorded in manifests (from plan_cbz_targets). Returns (number of
+    failures, [(path, reason)] of the archives deferred).
+    """
+    deferred = []
+    pdf_plans = {}
+    for path in natsorted(targets):
+        if path.lower().endswith(".pdf"):
+            try:
+                scan = scan_pdf(path)
+                pdf_plans[path] = (choose_pdf_mode(path, scan, pdf_mode), scan)
+            except Deferred as e:
+                print_warning(f"⏸️ {os.path.basename(path)}: {e}; it will be handled at the end.")
+                deferred.append((path, str(e)))
+            except Exception as e:
+                print_error(f"Failed to open PDF {os.path.basename(path)}: {e}")
+                pdf_plans[path] = None
+
+    todo = [path for path in natsorted(targets) if path not in {p for p, _ in deferred}]
+    console = GroupedConsole(sys.stdout, len(todo))
+    try:
+        with ProcessPoolExecutor(max_workers=jobs, mp_context=multiprocessing.get_context("spawn")) as pool:
+            futures = {}
+            for path in todo:
+                if path in pdf_plans and pdf_plans[path] is None:
+                    console.emit("", False)
+                    continue
+                futures[pool.submit(transcode_worker, path, targets[path], pdf_plans.get(path),
+                                    passwords, on_encrypted)] = path
+            for future in as_completed(futures):
+                status, output = future.result()
+                if status == "ok":
+                    record_conversion(manifests, futures[future], targets[futures[future]])
+                elif status == "deferred":
+                    deferred.append((futures[future], "needs a password"))
+                console.emit(output, status != "failed")
+    finally:
+        console._clear_status()
+    return console.failed, deferred
+
+def ask_deferred_passwords(deferred):
+    """Ask for the password of each deferred RAR; returns the passwords given."""
+    passwords = []
+    for path, _ in deferred:
+        if path.lower().endswith(".rar"):
+            pw = ask_input(f"Password required for {os.path.basename(path)}: ").strip()
+            if pw:
+                passwords.append(pw)
+    return passwords
+
+def convert_to_cbz(archives, args, passwords):
+    """main() for --to-cbz."""
+    if args.output:
+        os.makedirs(args.output, exist_ok=True)
+    targets, skipped, in_place, manifests = plan_cbz_targets(archives, args.output, args.force)
+    if in_place:
+        print_info(f"⏭️ Leaving {len(in_place)} CBZ(s) as they are (use --output to rewrite them into another folder).")
+    if skipped:
+        print_info(f"⏭️ Skipping {len(skipped)} archive(s) already converted (use --force to convert them again).")
+    if not targets:
+        print_success("Nothing new to convert.")
+        return 0
+
+    print_info(f"\n📦 Converting {len(targets)} archive(s) to CBZ with {args.jobs} jobs...\n")
+    failed, deferred = run_transcode(targets, args.jobs, manifests, args.pdf_mode, passwords, args.on_encrypted)
+    if deferred:
+        print_menu_header(f"\n⏸️ {len(deferred)} archive(s) need your input:")
+        for i, (path, reason) in enumerate(deferred, 1):
+            print_menu_option(str(i), f"{os.path.basename(path)}: {reason}")
+        retry = {path: targets[path] for path, _ in deferred}
+        more_failed, still_deferred = run_transcode(retry, 1, manifests, "ask", ask_deferred_passwords(deferred), "skip")
+        failed += more_failed + len(still_deferred)
+    if failed:
+        print_warning(f"\n{failed} archive(s) failed. See the messages above.")
+    print_success(f"\nAll done. The CBZs are in {args.output}." if args.output else "\nAll done. The CBZs are next to their archives.")
+    return 0
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Extract CBZ/PDF/RAR archives into folders next to them.")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Archives extracted at the same time (default: {DEFAULT_JOBS}).")
+    parser.add_argument("--force", action="store_true",
+                        help="Extract every archive again, even if its folder is up to date.")
+    parser.add_argument("--folder", help="Master folder to extract (skips the folder dialog).")
+    parser.add_argument("--pdf-mode", choices=list(PDF_MODES), default="ask",
+                        help="PDFs with pages lacking embedded images: ask, extract images, render pages, "
+                             "or defer the question to the end of the run (default: ask).")
+    parser.add_argument("--on-mixed", choices=MIXED_POLICIES, default="ask",
+                        help="When the folder holds more than one archive format (default: ask).")
+    parser.add_argument("--password-file",
+                        help="Text file with one password per line, tried on every password protected RAR.")
+    parser.add_argument("--on-encrypted", choices=ENCRYPTED_POLICIES, default="ask",
+                        help="Password protected RARs that no password from --password-file opens: "
+                             "ask, skip, or defer to the end of the run (default: ask).")
+    parser.add_argument("--to-cbz", action="store_true",
+                        help="Convert every archive to a CBZ in memory instead of extracting it to a folder.")
+    parser.add_argument("--output",
+                        help="With --to-cbz: folder for the new CBZs (default: next to each archive).")
+    args = parser.parse_args(argv)
+    if args.jobs < 1:
+        parser.error("--jobs must be at least 1")
+    if args.output and not args.to_cbz:
+        parser.error("--output only applies to --to-cbz")
+
+    passwords = []
+    if args.password_file:
+        try:
+            passwords = read_password_file(args.password_file)
+        except OSError as e:
+            parser.error(f"cannot read --password-file: {e}")
+
+    master_folder = args.folder or ask_directory("Select Master Folder Containing CBZ/PDF/RAR")
     if not master_folder:
         print_warning("No folder selected.")
         return 1
@@ -224,48 +1279,45 @@ def main():
         print_warning("No supported files found.")
         return 1
 
+    if args.to_cbz:
+        return convert_to_cbz(archives, args, passwords)
+
+    archives, skipped, manifests, stamps = plan_extraction(archives, args.force)
+    if skipped:
+        print_info(f"⏭️ Skipping {len(skipped)} archive(s) already extracted (use --force to extract them again).")
+    if not archives:
+        print_success("Nothing new to extract.")
+        return 0
+    ext_types = {os.path.splitext(path)[1].lower() for path in archives}
+
     if len(ext_types) > 1:
         print_warning(f"Mixed formats detected: {', '.join(ext_types)}")
-        choice = input("Proceed anyway? (y/n): ").strip().lower()
+        if args.on_mixed == "ask":
+            choice = input("Proceed anyway? (y/n): ").strip().lower()
+        else:
+            choice = "y" if args.on_mixed == "proceed" else "n"
         if choice != 'y':
             print_error("Aborted.")
             return 1
             
     # 👉 Detect collisions once, before extraction
-    collisions = detect_collisions(archives)      
+    collisions = detect_collisions(archives)
+    for (folder, base), paths in collisions.items():
+        print_warning(f"{len(paths)} archives share the folder name '{base}'; they will be extracted one after another.")
 
-    print_info(f"\n📦 Found {len(archives)} archive(s). Beginning extraction...\n")
+    print_info(f"\n📦 Found {len(archives)} archive(s) to extract. Beginning extraction with {args.jobs} jobs...\n")
 
-    for path in natsorted(archives):
-        name = safe_folder_name(path)
-        dest_folder = os.path.join(os.path.dirname(path), name)
-
-        if not os.path.exists(dest_folder):
-            os.makedirs(dest_folder)
-
-        ext = os.path.splitext(path)[1].lower()
-        print(f"📁 Extracting: {os.path.basename(path)}")
-
-        try:
-            if ext == '.cbz':
-                extract_cbz(path, dest_folder)
-            elif ext == '.pdf':
-                success = extract_pdf(path, dest_folder)
-                if not success:
-                    print_error(f"Failed to extract {os.path.basename(path)}")
-                    continue
-            elif ext == '.rar':
-                success = extract_rar(path, dest_folder)
-                if not success:
-                    print_error(f"Failed to extract {os.path.basename(path)}")
-                    continue
-            else:
-                print_warning(f"Unsupported format: {path}")
-                continue
-
-        except Exception as e:
-            print_error(f"Extraction failed for {os.path.basename(path)}: {e}")
-            continue
+    failed, deferred = run_extraction(archives, args.jobs, manifests, stamps,
+                                      args.pdf_mode, passwords, args.on_encrypted)
+    if deferred:
+        # The human queue: one archive at a time, asking as the interactive run would
+        print_menu_header(f"\n⏸️ {len(deferred)} archive(s) need your input:")
+        for i, (path, reason) in enumerate(deferred, 1):
+            print_menu_option(str(i), f"{os.path.basename(path)}: {reason}")
+        more_failed, _ = run_extraction([path for path, _ in deferred], 1, manifests, stamps)
+        failed += more_failed
+    if failed:
+        print_warning(f"\n{failed} archive(s) failed. See the messages above.")
     print_success("\nAll done. Extracted folders are next to their respective archive files.")
     return 0
 
@@ -8,6 +8,7 @@ BASE_DIR = Path(__file__).parent
 # Correct spelling now
 VIEWER_HTML = BASE_DIR / "viewer.html"
 EXTRACTOR_PY = BASE_DIR / "extractor.py"
+PAGESERVER_PY = BASE_DIR / "pageserver.py"
 
 def launch_viewer():
     print("Trying to access:", VIEWER_HTML.resolve())
@@ -25,22 +26,36 @@ def run_extractor():
     result = subprocess.run(cmd)
     if result.returncode != 0:
         print("Extractor exited with error.")
+
+def run_pageserver():
+    cmd = [sys.executable, str(PAGESERVER_PY)]
+    print(f"📚 Launching page server: {cmd}")
+    try:
+        result = subprocess.run(cmd)
+    except KeyboardInterrupt:
+        return
+    if result.returncode != 0:
+        print("Page server exited with error.")
     
 def main():
     print("Select manga format:")
     print(1, "Image Folder (viewer will open)")
     print(2, "CBZ/PDF/RAR archives (extractor will open)")
+    print(3, "CBZ/PDF/RAR archives, read without extracting (page server will open the viewer)")
 
     while True:
-        choice = input("Choice (1 or 2): ").strip()
+        choice = input("Choice (1, 2 or 3): ").strip()
         if choice == '1':
             launch_viewer()
             break
         elif choice == '2':
             run_extractor()
             break
+        elif choice == '3':
+            run_pageserver()
+            break
         else:
-            print("Invalid choice, please enter 1 or 2.")
+            print("Invalid choice, please enter 1, 2 or 3.")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,454 @@
+# Local page server for viewer.html.
+# Lists the CBZ/PDF/RAR files of a library folder and streams their pages
+# straight out of the archive, so nothing is extracted to disk:
+#   CBZ - the zip is memory-mapped; stored pages are sliced out of the map,
+#         deflated ones are inflated straight from it.
+#   PDF - pages are rendered on demand at the resolution of their scans and
+#         kept in an LRU cache.
+#   RAR - the first page request unpacks the book with one UnRAR run into a
+#         temporary folder (removed when the book is closed); pages are read
+#         from there and cached the same way.
+#
+#     python pageserver.py
+#     python pageserver.py --library D:\Manga --port 8765
+
+import os
+import sys
+import json
+import mmap
+import zlib
+import struct
+import zipfile
+import argparse
+import mimetypes
+import tempfile
+import threading
+import subprocess
+import webbrowser
+from collections import OrderedDict
+from urllib.parse import urlsplit, parse_qs
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import fitz  # PyMuPDF
+from natsort import natsorted
+
+from launcherlib.prints import print_success, print_warning, print_error, print_info
+from launcherlib.dialogs import ask_directory
+from extractor import (IMAGE_EXTS, find_archives, page_image_dpi, render_dpi, unrar_executable, unrar_extract,
+                       read_rar_headers, list_rar_files)
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+STATIC_FILES = {
+    "/": ("viewer.html", "text/html; charset=utf-8"),
+    "/viewer.html": ("viewer.html", "text/html; charset=utf-8"),
+    "/styles.css": ("styles.css", "text/css; charset=utf-8"),
+}
+
+HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+MAX_OPEN_BOOKS = 8  # archives kept open (mapped / parsed) at once
+PAGE_CACHE_BYTES = 256 * 1024 * 1024  # rendered PDF pages and piped RAR pages
+PAGE_MAX_AGE = 3600  # seconds the browser may reuse a page without asking again
+
+ZIP_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+ZIP_LOCAL_MAGIC = b"PK\x03\x04"
+
+# PyMuPDF is not thread-safe, even across separate documents
+_fitz_lock = threading.Lock()
+
+
+class PageCache:
+    """LRU of page bytes bounded by their total size."""
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is not None:
+                self._items.move_to_end(key)
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self._bytes -= len(evicted)
+
+
+class CbzBook:
+    """Pages of a CBZ read from a memory map of the archive."""
+
+    def __init__(self, path):
+        # ZipFile only parses the central directory (and reads the odd bzip2/lzma page)
+        self._zip = zipfile.ZipFile(path)
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            self._file.close()
+            self._zip.close()
+            raise
+        self._members = natsorted(
+            (info for info in self._zip.infolist()
+             if not info.is_dir() and info.filename.lower().endswith(IMAGE_EXTS)),
+            key=lambda info: info.filename,
+        )
+        self.pages = [info.filename for info in self._members]
+
+    def _data_offset(self, info):
+        header = self._map[info.header_offset:info.header_offset + ZIP_LOCAL_HEADER.size]
+        fields = ZIP_LOCAL_HEADER.unpack(header)
+        if fields[0] != ZIP_LOCAL_MAGIC:
+            raise zipfile.BadZipFile(f"Bad local header for {info.filename}")
+        return info.header_offset + ZIP_LOCAL_HEADER.size + fields[-2] + fields[-1]
+
+    def read(self, n):
+        info = self._members[n]
+        if info.flag_bits & 0x1:  # encrypted
+            return self._zip.read(info)
+        if info.compress_type == zipfile.ZIP_STORED:
+            start = self._data_offset(info)
+            return self._map[start:start + info.file_size]
+        if info.compress_type == zipfile.ZIP_DEFLATED:
+            start = self._data_offset(info)
+            return zlib.decompress(self._map[start:start + info.compress_size], -15, info.file_size or zlib.DEF_BUF_SIZE)
+        return self._zip.read(info)
+
+    def mime(self, n):
+        return mimetypes.guess_type(self.pages[n])[0] or "application/octet-stream"
+
+    def close(self):
+        self._zip.close()
+        self._map.close()
+        self._file.close()
+
+
+class PdfBook:
+    """Pages of a PDF rendered to PNG on demand."""
+
+    def __init__(self, path, cache):
+        self.path = path
+        self._cache = cache
+        with _fitz_lock:
+            self._doc = fitz.open(path)
+            count = self._doc.page_count
+        self.pages = [f"{i:03d}.png" for i in range(count)]
+
+    def read(self, n):
+        key = (self.path, n)
+        data = self._cache.get(key)
+        if data is None:
+            with _fitz_lock:
+                page = self._doc[n]
+                dpi = page_image_dpi(page, page.get_images())
+                data = page.get_pixmap(dpi=render_dpi([dpi] if dpi else [])).tobytes("png")
+            self._cache.put(key, data)
+        return data
+
+    def mime(self, n):
+        return "image/png"
+
+    def close(self):
+        with _fitz_lock:
+            self._doc.close()
+
+
+class RarBook:
+    """
+    Pages of a RAR, unpacked by one UnRAR run on the first read. A solid RAR
+    can only be decompressed front to back, so piping pages out one
+    "unrar p" at a time would start over for every page.
+    """
+
+    def __init__(self, path, cache):
+        self.path = path
+        self._cache = cache
+        self._unpacked = None  # TemporaryDirectory, once the first page was asked for
+        self._unpack_lock = threading.Lock()
+        self._exe = unrar_executable()
+        if not self._exe:
+            raise RuntimeError(f"Missing UnRAR.exe in {BASE_DIR} (or unrar on PATH)")
+        headers = read_rar_headers(path)
+        if headers and (headers["encrypted"] or headers["headers_encrypted"]):
+            raise RuntimeError(f"{os.path.basename(path)} is password protected (use the extractor)")
+        if headers:
+            names = headers["files"]
+        else:
+            names, failed = list_rar_files(self._exe, path, ["-p-"])
+            if failed is not None:
+                raise RuntimeError(f"UnRAR could not list {os.path.basename(path)}")
+        self.pages = natsorted(name for name in names if name.lower().endswith(IMAGE_EXTS))
+
+    def _unpack(self):
+        """The folder holding the unpacked book; the first caller runs UnRAR, the others wait for it."""
+        with self._unpack_lock:
+            if self._unpacked is None:
+                unpacked = tempfile.TemporaryDirectory(prefix="unrar-")
+                result = unrar_extract(self._exe, self.path, unpacked.name, ["-p-"])
+                if result.returncode != 0:
+                    unpacked.cleanup()
+                    raise RuntimeError(f"UnRAR failed on {os.path.basename(self.path)}")
+                self._unpacked = unpacked
+            return self._unpacked.name
+
+    def read(self, n):
+        key = (self.path, n)
+        data = self._cache.get(key)
+        if data is None:
+            try:
+                with open(os.path.join(self._unpack(), self.pages[n]), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                # The name could not be created on this disk as listed; pipe just this page
+                result = subprocess.run(
+                    [self._exe, "p", "-inul", "-p-", self.path, self.pages[n]],
+                    stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                )
+                if result.returncode != 0 or not result.stdout:
+                    raise RuntimeError(f"UnRAR failed on {self.pages[n]} in {os.path.basename(self.path)}")
+                data = result.stdout
+            self._cache.put(key, data)
+        return data
+
+    def mime(self, n):
+        return mimetypes.guess_type(self.pages[n])[0] or "application/octet-stream"
+
+    def close(self):
+        with self._unpack_lock:
+            if self._unpacked is not None:
+                self._unpacked.cleanup()
+                self._unpacked = None
+
+
+class Library:
+    """
+    The archives under one folder, opened lazily and kept in a small LRU.
+    Request threads hold a book between acquire() and release(); a book
+    evicted from the LRU while held is closed by the last release.
+    """
+
+    def __init__(self, root, cache_bytes=PAGE_CACHE_BYTES):
+        self.root = root
+        archives, _ = find_archives(root)
+        self.paths = {
+            os.path.relpath(path, root).replace(os.sep, "/"): path
+            for path in natsorted(archives)
+        }
+        self._cache = PageCache(cache_bytes)
+        self._open = OrderedDict()
+        self._readers = {}  # book -> request threads holding it
+        self._evicted = set()
+        self._lock = threading.Lock()
+
+    def acquire(self, book_id):
+        """The open book for book_id, held until release(book); None if it is not in the library."""
+        path = self.paths.get(book_id)
+        if path is None:
+            return None
+        with self._lock:
+            book = self._hold(book_id)
+        if book is not None:
+            return book
+
+        # Opening can be slow (fitz, "unrar lb"), so no other request waits for it
+        ext = os.path.splitext(path)[1].lower()
+        if ext == ".pdf":
+            opened = PdfBook(path, self._cache)
+        elif ext == ".rar":
+            opened = RarBook(path, self._cache)
+        else:
+            opened = CbzBook(path)
+
+        evicted = []
+        with self._lock:
+            book = self._hold(book_id)  # another request may have opened it meanwhile
+            if book is None:
+                book = opened
+                self._open[book_id] = book
+                self._readers[book] = 1
+                while len(self._open) > MAX_OPEN_BOOKS:
+                    _, old = self._open.popitem(last=False)
+                    if self._readers[old]:
+                        self._evicted.add(old)  # still being read; the last release closes it
+                    else:
+                        del self._readers[old]
+                        evicted.append(old)
+        if book is not opened:
+            evicted.append(opened)
+        for old in evicted:
+            old.close()
+        return book
+
+    def _hold(self, book_id):
+        """The open book for book_id with one more reader, or None; call with _lock held."""
+        book = self._open.get(book_id)
+        if book is not None:
+            self._open.move_to_end(book_id)
+            self._readers[book] += 1
+        return book
+
+    def release(self, book):
+        with self._lock:
+            self._readers[book] -= 1
+            if self._readers[book] or book not in self._evicted:
+                return
+            self._evicted.discard(book)
+            del self._readers[book]
+        book.close()
+
+    def close(self):
+        with self._lock:
+            for book in list(self._open.values()) + list(self._evicted):
+                book.close()
+            self._open.clear()
+            self._evicted.clear()
+            self._readers.clear()
+
+
+class PageHandler(BaseHTTPRequestHandler):
+    """
+    GET /                        viewer.html (styles.css next to it)
+    GET /api/books               [{"id", "name"}] for every archive in the library
+    GET /api/pages?book=ID       {"id", "name", "pages": [page names]}
+    GET /api/page?book=ID&n=N    the bytes of page N (0-based)
+    """
+
+    library = None  # set by serve()
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        book_id = query.get("book", [""])[0]
+
+        if url.path in STATIC_FILES:
+            filename, content_type = STATIC_FILES[url.path]
+            with open(os.path.join(BASE_DIR, filename), "rb") as f:
+                self._send(200, f.read(), content_type)
+        elif url.path == "/api/books":
+            books = [{"id": book_id, "name": os.path.basename(path)} for book_id, path in self.library.paths.items()]
+            self._send_json(books)
+        elif url.path == "/api/pages":
+            book = self._open_book(book_id)
+            if book is not None:
+                pages = book.pages
+                self.library.release(book)
+                name = os.path.basename(self.library.paths[book_id])
+                self._send_json({"id": book_id, "name": name, "pages": pages})
+        elif url.path == "/api/page":
+            book = self._open_book(book_id)
+            if book is None:
+                return
+            try:
+                n = int(query.get("n", [""])[0])
+            except ValueError:
+                n = -1
+            try:
+                if not 0 <= n < len(book.pages):
+                    self.send_error(404, "No such page")
+                    return
+                data = book.read(n)
+                mime = book.mime(n)
+            except Exception as e:
+                print_error(f"Failed to read page {n + 1} of {book_id}: {e}")
+                self.send_error(500, "Could not read page")
+                return
+            finally:
+                self.library.release(book)
+            self._send(200, data, mime, cache=True)
+        else:
+            self.send_error(404)
+
+    def _open_book(self, book_id):
+        """The book for book_id held by this request (release it when done), or None after sending an error."""
+        try:
+            book = self.library.acquire(book_id)
+        except Exception as e:
+            print_error(f"Failed to open {book_id}: {e}")
+            self.send_error(500, "Could not open archive")
+            return None
+        if book is None:
+            self.send_error(404, "No such archive")
+        return book
+
+    def _send_json(self, obj):
+        self._send(200, json.dumps(obj).encode("utf-8"), "application/json")
+
+    def _send(self, status, body, content_type, cache=False):
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", f"max-age={PAGE_MAX_AGE}" if cache else "no-store")
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the viewer moved on before the page arrived
+
+    def log_message(self, format, *args):
+        pass  # one line per page would bury the useful messages
+
+
+def serve(library, port):
+    """Start the server on HOST; falls back to a free port when port is taken."""
+    PageHandler.library = library
+    try:
+        server = ThreadingHTTPServer((HOST, port), PageHandler)
+    except OSError:
+        print_warning(f"Port {port} is busy, using a free one instead.")
+        server = ThreadingHTTPServer((HOST, 0), PageHandler)
+    server.daemon_threads = True
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Read CBZ/PDF/RAR archives in viewer.html without extracting them.")
+    parser.add_argument("--library", help="Folder containing the archives (asked for when omitted).")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help=f"Port to listen on (default: {DEFAULT_PORT}).")
+    parser.add_argument("--no-browser", action="store_true", help="Do not open the viewer in the browser.")
+    args = parser.parse_args(argv)
+
+    root = args.library or ask_directory("Select Master Folder Containing CBZ/PDF/RAR")
+    if not root:
+        print_warning("No folder selected.")
+        return 1
+    if not os.path.isdir(root):
+        print_error(f"Not a folder: {root}")
+        return 1
+
+    library = Library(root)
+    if not library.paths:
+        print_warning("No supported files found.")
+        return 1
+
+    server = serve(library, args.port)
+    url = f"http://{HOST}:{server.server_address[1]}/"
+    print_success(f"📚 Serving {len(library.paths)} archive(s) from {root}")
+    print_info(f"Viewer: {url}  (press Ctrl+C to stop)")
+    if not args.no_browser:
+        webbrowser.open(url)
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        library.close()
+    return 0
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main())
+    except KeyboardInterrupt:
+        print_warning("\n👋 Server stopped.")
+        sys.exit(0)
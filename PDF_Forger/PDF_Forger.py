@@ -3,35 +3,27 @@ import re
 import sys
 import math
 from io import BytesIO
-from tqdm import tqdm
-from natsort import natsorted
-from PyPDF2 import PdfMerger
-import img2pdf
-from PIL import Image, ImageDraw
-import pytesseract
-from reportlab.pdfgen import canvas
-from reportlab.lib.utils import ImageReader
-from launcherlib import (
-    ask_directory,
-    ask_file,
+from launcherlib.prints import (
     print_success,
     print_warning,
     print_error,
     print_info,
-    print_menu_option,
-    ask_yes_no,
-    ask_choice,
-    ask_float,
 )
-from concurrent.futures import ProcessPoolExecutor, as_completed
-from functools import partial
+import stage_timer
+# Deferred imports: every engine library is imported inside the functions that
+# use it, so startup and each spawned worker only load what the chosen engine needs.
+#   none      → img2pdf, PyPDF2
+#   tesseract → pytesseract, PIL, img2pdf, PyPDF2 (+ reportlab for visible text layers)
+#   paddle    → paddleocr, PIL, reportlab, PyPDF2
+# Dialogs (tkinter), tqdm and the process pool are only needed in the main process.
 MAX_WORKERS = 3  # Restrict the number of concurrent workers
 IMAGE_EXTS = (".jpg", ".jpeg", ".png", ".bmp", ".webp", ".tif", ".tiff")
+TEXT_LAYER_SUFFIX = "_ocr.pdf"  # Output suffix for PDFs that received a text layer
+VOLUME_SUFFIX = "_volume.pdf"  # Output suffix for omnibus volumes built from chapter PDFs
+TRACE_FILE = "pdf_forger_trace.json"  # Chrome trace written to the master folder on request
 
 import tempfile
 import atexit
-import os
-import sys
 import signal
 
 # Keep track of temp files in a set to avoid duplicates
@@ -57,12 +49,14 @@ def _cleanup_and_exit(signum=None, frame=None):
     cleanup_temp_files()
     sys.exit(0)
 
-# Normal exit
-atexit.register(cleanup_temp_files)
+def install_cleanup_handlers():
+    """Register temp-file cleanup; only the interactive main process needs this."""
+    # Normal exit
+    atexit.register(cleanup_temp_files)
 
-# Handle termination signals
-signal.signal(signal.SIGINT, _cleanup_and_exit)
-signal.signal(signal.SIGTERM, _cleanup_and_exit)
+    # Handle termination signals
+    signal.signal(signal.SIGINT, _cleanup_and_exit)
+    signal.signal(signal.SIGTERM, _cleanup_and_exit)
 
 
 paddle_model = None
@@ -131,6 +125,7 @@ def sanitize_filename(name):
     return valid if valid.strip() else "pdf"
 
 def sorted_images(folder):
+    from natsort import natsorted
     images = natsorted(
         f
         for f in os.listdir(folder)
@@ -147,22 +142,31 @@ def sorted_images(folder):
 
 # ---- FOLDER SELECTION ----
 def select_folder():
+    from launcherlib.dialogs import ask_directory
     folder = ask_directory("Select folder containing images")
     if not folder:
         sys.exit(1)
     return folder
 
 # ---- OCR FUNCTIONS ----
+def _page_stage(name, img_path):
+    """Time one stage of one page (see stage_timer.py)."""
+    return stage_timer.stage(name, os.path.dirname(img_path), os.path.basename(img_path))
+
 def perform_tesseract_ocr(img_path, lang, psm_args):
+    import pytesseract
+    from PIL import Image
     try:
-        with Image.open(img_path) as im:
-            image = im.convert("RGB")
+        with _page_stage("decode", img_path):
+            with Image.open(img_path) as im:
+                image = im.convert("RGB")
         config = f"-l {lang}"
         if psm_args:
             config += f" {psm_args}"
-        data = pytesseract.image_to_data(
-            image, config=config, output_type=pytesseract.Output.DICT
-        )
+        with _page_stage("ocr", img_path):
+            data = pytesseract.image_to_data(
+                image, config=config, output_type=pytesseract.Output.DICT
+            )
 
         text_items = []
         for i in range(len(data["text"])):
@@ -172,11 +176,13 @@ def perform_tesseract_ocr(img_path, lang, psm_args):
                 conf = -1.0
             txt = data["text"][i].strip()
             if txt:
-                text_items.append((txt, conf))
+                box = (data["left"][i], data["top"][i], data["width"][i], data["height"][i])
+                text_items.append((txt, conf, box))
 
-        pdf_data = pytesseract.image_to_pdf_or_hocr(
-            image, config=config, extension="pdf"
-        )
+        with _page_stage("ocr", img_path):
+            pdf_data = pytesseract.image_to_pdf_or_hocr(
+                image, config=config, extension="pdf"
+            )
         print_success(f"OCR successful: {os.path.basename(img_path)}")
         return pdf_data, text_items
 
@@ -186,10 +192,32 @@ def perform_tesseract_ocr(img_path, lang, psm_args):
             f.write(f"[TESS] {img_path} → {e}\n")
         return None, []
 
+def _paddle_box_geometry(box, x_scale, y_scale, orig_w, orig_h):
+    """Map a PaddleOCR box onto PDF coordinates; return (points, angle, font_size)."""
+    cx = orig_w / 2
+    cy = orig_h / 2
+    pts = box.tolist() if hasattr(box, "tolist") else box
+    scaled = []
+    for x, y in pts:
+        sx = cx + ((x * x_scale - cx) * zoom)
+        sy = orig_h - (cy + ((y * y_scale - cy) * zoom)) + offset_y
+        scaled.append((sx, sy))
+
+    # Calculate angle and font size
+    p1, p2, p3, p4 = scaled
+    dx, dy = p3[0] - p4[0], p3[1] - p4[1]
+    angle = math.degrees(math.atan2(dy, dx))
+    height = max(1, math.hypot(p1[0] - p4[0], p1[1] - p4[1]))
+    font_size = max(1, min(height * 0.9, 50))  # clamp to avoid reportlab errors
+    return scaled, angle, font_size
+
 def perform_paddleocr_overlay_from_result(img_path, result, visible=True, threshold=0.6):
     """
     Create a PDF overlay from a precomputed PaddleOCR result.
     """
+    from PIL import Image
+    from reportlab.pdfgen import canvas
+    from reportlab.lib.utils import ImageReader
     try:
         boxes = result.get("dt_polys", [])
         texts = result.get("rec_texts", [])
@@ -205,8 +233,6 @@ def perform_paddleocr_overlay_from_result(img_path, result, visible=True, thresh
         ocr_h, ocr_w = ocr_img.shape[:2]
         x_scale = orig_w / ocr_w
         y_scale = orig_h / ocr_h
-        cx = orig_w / 2
-        cy = orig_h / 2
 
         buffer = BytesIO()
         c = canvas.Canvas(buffer, pagesize=(orig_w, orig_h))
@@ -227,12 +253,9 @@ def perform_paddleocr_overlay_from_result(img_path, result, visible=True, thresh
                 if conf < threshold or not text:
                     continue
 
-                pts = box.tolist() if hasattr(box, "tolist") else box
-                scaled = []
-                for x, y in pts:
-                    sx = cx + ((x * x_scale - cx) * zoom)
-                    sy = orig_h - (cy + ((y * y_scale - cy) * zoom)) + offset_y
-                    scaled.append((sx, sy))
+                scaled, angle, font_size = _paddle_box_geometry(
+                    box, x_scale, y_scale, orig_w, orig_h
+                )
 
                 # Draw box if visible
                 if visible:
@@ -242,12 +265,7 @@ def perform_paddleocr_overlay_from_result(img_path, result, visible=True, thresh
                         p1, p2 = scaled[j], scaled[(j + 1) % 4]
                         c.line(p1[0], p1[1], p2[0], p2[1])
 
-                # Calculate angle and font size
-                p1, p2, p3, p4 = scaled
-                dx, dy = p3[0] - p4[0], p3[1] - p4[1]
-                angle = math.degrees(math.atan2(dy, dx))
-                height = max(1, math.hypot(p1[0] - p4[0], p1[1] - p4[1]))
-                font_size = max(1, min(height * 0.9, 50))  # clamp to avoid reportlab errors
+                p4 = scaled[3]
 
                 # Draw text
                 if visible:
@@ -276,9 +294,38 @@ def perform_paddleocr_overlay_from_result(img_path, result, visible=True, thresh
             f.write(f"[PADDLE] {img_path} → {e}\n")
         return None
 
+def paddle_text_items(img_path, result, threshold=0.6):
+    """Return (text, conf, (x, y, w, h)) tuples in original image pixels from a PaddleOCR result."""
+    from PIL import Image
+    boxes = result.get("dt_polys", [])
+    texts = result.get("rec_texts", [])
+    confs = result.get("rec_scores", [])
+    ocr_img = result.get("doc_preprocessor_res", {}).get("output_img")
+    if ocr_img is None:
+        return []
+
+    with Image.open(img_path) as img:
+        orig_w, orig_h = img.size
+    ocr_h, ocr_w = ocr_img.shape[:2]
+    x_scale = orig_w / ocr_w
+    y_scale = orig_h / ocr_h
+
+    text_items = []
+    for box, text, conf in zip(boxes, texts, confs):
+        if conf < threshold or not text:
+            continue
+        pts = box.tolist() if hasattr(box, "tolist") else box
+        xs = [x * x_scale for x, _ in pts]
+        ys = [y * y_scale for _, y in pts]
+        text_items.append(
+            (text, float(conf), (min(xs), min(ys), max(xs) - min(xs), max(ys) - min(ys)))
+        )
+    return text_items
+
 def perform_image_only_pdf(img_path):
+    import img2pdf
     try:
-        with open(img_path, "rb") as f:
+        with _page_stage("convert", img_path), open(img_path, "rb") as f:
             return BytesIO(img2pdf.convert(f))
     except Exception as e:
         print_error(f"IMG2PDF failed: {os.path.basename(img_path)} → {e}")
@@ -286,29 +333,49 @@ def perform_image_only_pdf(img_path):
             f.write(f"[IMG2PDF] {img_path} → {e}\n")
         return None
 
-def create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, threshold):
+def pdf_output_path(folder, engine):
+    """Return the path of the PDF built from folder (saved next to the folder)."""
+    safe_name = sanitize_filename(os.path.basename(folder))
+    suffix = {
+        "tesseract": ".pdf",
+        "paddle": "_paddle.pdf",
+        "none": "_images.pdf",
+    }.get(engine, ".pdf")
+    return os.path.join(os.path.dirname(folder), safe_name + suffix)
+
+def create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, threshold, index_path=None):
+    """Build one PDF from an image folder; return its path, or None if nothing was written."""
+    from PyPDF2 import PdfMerger
     images = sorted_images(folder)
     if not images:
         print_warning(f"No images found in folder: {folder}")
-        return
+        return None
 
     print_info(f"Creating PDF for folder: {os.path.basename(folder)} using {engine}")
     merger = PdfMerger()
+    indexed_pages = []  # (page_no, text_items) for the OCR search index
 
-    def append_buffer_to_merger(buffer):
+    def append_buffer_to_merger(buffer, img_path):
         try:
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
-                tmp_file.write(buffer.read())
-                tmp_path = tmp_file.name
-            try:
-                merger.append(tmp_path)
-            finally:
-                if os.path.exists(tmp_path):
-                    os.remove(tmp_path)
+            with _page_stage("merge", img_path):
+                with tempfile.NamedTemporaryFile(delete=False, suffix=".pdf") as tmp_file:
+                    tmp_file.write(buffer.read())
+                    tmp_path = tmp_file.name
+                try:
+                    merger.append(tmp_path)
+                finally:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+            return True
         except Exception as e:
             print_error(f"Failed to append buffer to PDF → {e}")
             with open(LOG_FILE, "a", encoding="utf-8") as f:
                 f.write(f"[PDFMERGE] {folder} → {e}\n")
+            return False
+
+    def record_text(text_items):
+        if index_path and text_items:
+            indexed_pages.append((len(merger.pages), text_items))
 
     if engine == "paddle":
         BATCH_SIZE = 5
@@ -317,7 +384,9 @@ def create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, thr
             batch_paths = [os.path.join(folder, img) for img in batch_imgs]
 
             try:
-                batch_results = paddle_model.predict(batch_paths)
+                # Paddle predicts a whole batch at once, so OCR is timed per batch
+                with stage_timer.stage("ocr", folder):
+                    batch_results = paddle_model.predict(batch_paths)
             except Exception as e:
                 print_error(f"PaddleOCR batch failed for images {batch_paths} → {e}")
                 with open(LOG_FILE, "a", encoding="utf-8") as f:
@@ -325,11 +394,12 @@ def create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, thr
                 continue
 
             for img_path, result in zip(batch_paths, batch_results):
-                buffer = perform_paddleocr_overlay_from_result(
-                    img_path, result, visible=overlays_visible, threshold=threshold
-                )
-                if buffer:
-                    append_buffer_to_merger(buffer)
+                with _page_stage("overlay", img_path):
+                    buffer = perform_paddleocr_overlay_from_result(
+                        img_path, result, visible=overlays_visible, threshold=threshold
+                    )
+                if buffer and append_buffer_to_merger(buffer, img_path):
+                    record_text(paddle_text_items(img_path, result, threshold))
 
     else:
         for img in images:
@@ -337,17 +407,17 @@ def create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, thr
             try:
                 if engine == "tesseract":
                     if overlays_visible:
-                        buffer = generate_tesseract_overlay_pdf(full_path, lang, psm_args)
-                        if buffer:
-                            append_buffer_to_merger(buffer)
+                        buffer, text_items = generate_tesseract_overlay_pdf(full_path, lang, psm_args)
+                        if buffer and append_buffer_to_merger(buffer, full_path):
+                            record_text(text_items)
                     else:
-                        pdf_data, _ = perform_tesseract_ocr(full_path, lang, psm_args)
-                        if pdf_data:
-                            append_buffer_to_merger(BytesIO(pdf_data))
+                        pdf_data, text_items = perform_tesseract_ocr(full_path, lang, psm_args)
+                        if pdf_data and append_buffer_to_merger(BytesIO(pdf_data), full_path):
+                            record_text(text_items)
                 elif engine == "none":
                     buffer = perform_image_only_pdf(full_path)
                     if buffer:
-                        append_buffer_to_merger(buffer)
+                        append_buffer_to_merger(buffer, full_path)
             except Exception as e:
                 print_error(f"Failed processing image {full_path} → {e}")
                 with open(LOG_FILE, "a", encoding="utf-8") as f:
@@ -355,25 +425,32 @@ def create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, thr
                 continue
 
     # Save merged PDF
-    if merger.pages:
-        base = os.path.basename(folder)
-        safe_name = sanitize_filename(base)
-        suffix = {
-            "tesseract": ".pdf",
-            "paddle": "_paddle.pdf",
-            "none": "_images.pdf",
-        }.get(engine, ".pdf")
-        out_path = os.path.join(os.path.dirname(folder), safe_name + suffix)
+    if not merger.pages:
+        return None
+    out_path = pdf_output_path(folder, engine)
+    try:
+        with stage_timer.stage("write", folder), open(out_path, "wb") as f:
+            merger.write(f)
+        merger.close()
+        print_success(f"PDF created: {out_path}")
+    except Exception as e:
+        print_error(f"Failed to save PDF {out_path} → {e}")
+        merger.close()
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(f"[PDF_SAVE] {out_path} → {e}\n")
+        return None
+
+    if index_path and indexed_pages:
         try:
-            with open(out_path, "wb") as f:
-                merger.write(f)
-            merger.close()
-            print_success(f"PDF created: {out_path}")
+            from ocr_index import index_folder
+            with stage_timer.stage("index", folder):
+                count = index_folder(index_path, folder, indexed_pages)
+            print_info(f"Indexed {count} text items from {os.path.basename(folder)}")
         except Exception as e:
-            print_error(f"Failed to save PDF {out_path} → {e}")
-            merger.close()
+            print_error(f"Failed to index OCR text for {folder} → {e}")
             with open(LOG_FILE, "a", encoding="utf-8") as f:
-                f.write(f"[PDF_SAVE] {out_path} → {e}\n")
+                f.write(f"[OCR_INDEX] {folder} → {e}\n")
+    return out_path
 
 # --- Master folder analysis ---
 def analyze_master_folder(master_folder):
@@ -385,45 +462,43 @@ def analyze_master_folder(master_folder):
     return folders_to_process
 
 
-# --- Worker for parallel execution ---
-def process_folder_worker(args):
-    """Worker function for Tesseract/No-OCR PDF creation."""
-    folder, lang, psm_args, engine, overlays_visible, threshold = args
-    try:
-        create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, threshold)
-        return folder, True
-    except Exception as e:
-        with open(LOG_FILE, "a", encoding="utf-8") as f:
-            f.write(f"[WORKER] {folder} → {e}\n")
-        return folder, False
-
+# --- Worker for parallel execution lives in pdf_worker.py ---
 
 # --- Sequential wrapper for single folder ---
-def process_subfolder(folder, lang, psm_args, engine, overlays_visible, threshold):
-    """Wrapper to process a single folder; returns success flag."""
+def process_subfolder(folder, lang, psm_args, engine, overlays_visible, threshold, index_path=None):
+    """Wrapper to process a single folder; returns (folder, pdf path or None)."""
     try:
-        create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, threshold)
-        return folder, True
+        out_path = create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, threshold, index_path)
+        return folder, out_path
     except Exception as e:
         with open(LOG_FILE, "a", encoding="utf-8") as f:
             f.write(f"[WORKER] {folder} → {e}\n")
-        return folder, False
+        return folder, None
 
 
 # --- Parallel runner ---
-def run_parallel(master_folder, lang, psm_args, engine, overlays_visible, threshold):
-    folders_to_process = analyze_master_folder(master_folder)
+def run_parallel(master_folder, lang, psm_args, engine, overlays_visible, threshold, index_path=None,
+                 folders_to_process=None):
+    """Build one PDF per image folder; return {folder: pdf path} for the folders that succeeded."""
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from tqdm import tqdm
+    from pdf_worker import process_folder_worker
+    if folders_to_process is None:
+        folders_to_process = analyze_master_folder(master_folder)
     print_info(f"Found {len(folders_to_process)} image folders.")
+    created = {}
 
     if engine == "paddle":
         # PaddleOCR handled sequentially in batch mode
         for folder in tqdm(folders_to_process, desc="Processing (PaddleOCR)"):
-            process_subfolder(folder, lang, psm_args, engine, overlays_visible, threshold)
+            _, out_path = process_subfolder(folder, lang, psm_args, engine, overlays_visible, threshold, index_path)
+            if out_path:
+                created[folder] = out_path
 
     else:
         # Tesseract / No-OCR: parallel execution
         args_list = [
-            (folder, lang, psm_args, engine, overlays_visible, threshold)
+            (folder, lang, psm_args, engine, overlays_visible, threshold, index_path)
             for folder in folders_to_process
         ]
 
@@ -433,8 +508,10 @@ def run_parallel(master_folder, lang, psm_args, engine, overlays_visible, thresh
             for future in tqdm(as_completed(futures), total=len(futures), desc="Processing (Parallel)"):
                 folder_done = futures[future]
                 try:
-                    folder_result, success = future.result()
-                    if success:
+                    folder_result, out_path, timings = future.result()
+                    stage_timer.add(timings)
+                    if out_path:
+                        created[folder_result] = out_path
                         print_success(f"Finished PDF for folder: {folder_done}")
                     else:
                         print_error(f"Worker failed for folder: {folder_done}")
@@ -443,8 +520,401 @@ def run_parallel(master_folder, lang, psm_args, engine, overlays_visible, thresh
                     with open(LOG_FILE, "a", encoding="utf-8") as f:
                         f.write(f"[WORKER_EXC] {folder_done} → {e}\n")
 
+    return created
+
+# ---- OMNIBUS VOLUME ----
+def join_chapter_pdfs(chapters, out_path):
+    """
+    Join chapter PDFs into one volume by copying their page objects
+    (nothing is re-rendered). chapters is a list of (title, pdf path);
+    every chapter gets its own outline entry.
+    """
+    from PyPDF2 import PdfReader, PdfWriter
+    writer = PdfWriter()
+    for title, pdf_path in chapters:
+        try:
+            reader = PdfReader(pdf_path)
+            first_page = len(writer.pages)
+            with stage_timer.stage("merge", pdf_path):
+                for page in reader.pages:
+                    writer.add_page(page)
+            if len(writer.pages) > first_page:
+                writer.add_outline_item(title, first_page)
+        except Exception as e:
+            print_error(f"Failed to add chapter {title} → {e}")
+            with open(LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(f"[VOLUME] {pdf_path} → {e}\n")
+
+    if not writer.pages:
+        return None
+    with stage_timer.stage("write", out_path), open(out_path, "wb") as f:
+        writer.write(f)
+    return out_path
+
+def build_volume(master_folder, lang, psm_args, engine, overlays_visible, threshold, index_path=None):
+    """Build every chapter PDF (in parallel where the engine allows) and join them into one volume."""
+    from natsort import natsorted
+    chapters = natsorted(
+        folder for folder in analyze_master_folder(master_folder)
+        if os.path.abspath(folder) != os.path.abspath(master_folder)
+    )
+    if not chapters:
+        print_warning(f"No chapter folders found in: {master_folder}")
+        return None
+
+    created = run_parallel(
+        master_folder, lang, psm_args, engine, overlays_visible, threshold, index_path,
+        folders_to_process=chapters,
+    )
+    missing = [folder for folder in chapters if folder not in created]
+    for folder in missing:
+        print_warning(f"Chapter left out of the volume: {folder}")
+
+    out_path = os.path.join(
+        os.path.dirname(master_folder),
+        sanitize_filename(os.path.basename(master_folder)) + VOLUME_SUFFIX,
+    )
+    joined = [
+        (os.path.relpath(folder, master_folder).replace(os.sep, "/"), created[folder])
+        for folder in chapters if folder in created
+    ]
+    try:
+        if join_chapter_pdfs(joined, out_path):
+            print_success(f"Volume created: {out_path} ({len(joined)} chapters)")
+            return out_path
+        print_error("No chapter PDFs were created; volume not written.")
+    except Exception as e:
+        print_error(f"Failed to save volume {out_path} → {e}")
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(f"[VOLUME] {out_path} → {e}\n")
+    return None
+
+# ---- TEXT LAYER FOR EXISTING PDFs ----
+def _uses_fonts(resources):
+    """True if a resource dict (or a form XObject in it) declares fonts; text can't be drawn without one."""
+    if not resources:
+        return False
+    resources = resources.get_object()
+    if resources.get("/Font"):
+        return True
+    xobjects = resources.get("/XObject")
+    for xobj in (xobjects.get_object().values() if xobjects else ()):
+        xobj = xobj.get_object()
+        if xobj.get("/Subtype") == "/Form" and xobj.get("/Resources") and xobj["/Resources"].get_object().get("/Font"):
+            return True
+    return False
+
+def has_text_layer(pdf_path):
+    """
+    True as soon as one page of the PDF has extractable text (OCR'd elsewhere
+    or born-digital). Pages without fonts are skipped without parsing their
+    content, so an image-only PDF costs one resource lookup per page.
+    """
+    from PyPDF2 import PdfReader
+    try:
+        for page in PdfReader(pdf_path).pages:
+            if _uses_fonts(page.get("/Resources")) and page.extract_text().strip():
+                return True
+    except Exception:
+        pass  # unreadable here; add_text_layer_to_pdf reports the real error
+    return False
+
+def find_image_only_pdfs(master_folder):
+    """Return PDFs under master_folder that have no text layer yet (ours or any other)."""
+    from natsort import natsorted
+    pdfs = []
+    skipped = 0
+    for root, _, files in os.walk(master_folder):
+        for f in files:
+            if not f.lower().endswith(".pdf") or f.lower().endswith(TEXT_LAYER_SUFFIX):
+                continue
+            pdf_path = os.path.join(root, f)
+            if os.path.exists(os.path.splitext(pdf_path)[0] + TEXT_LAYER_SUFFIX) or has_text_layer(pdf_path):
+                skipped += 1
+            else:
+                pdfs.append(pdf_path)
+    if skipped:
+        print_info(f"Skipped {skipped} PDFs that already have text or a *{TEXT_LAYER_SUFFIX} copy.")
+    return natsorted(pdfs)
+
+def extract_page_image(page):
+    """
+    Return (PIL image, XObject name) for the largest image embedded in a PDF page,
+    or (None, None). The name lets merge_text_layer find where the image is drawn.
+    """
+    from PIL import Image
+    best, best_name = None, None
+    for img_file in page.images:
+        try:
+            im = Image.open(BytesIO(img_file.data))
+            im.load()
+        except Exception:
+            continue
+        if best is None or im.width * im.height > best.width * best.height:
+            best, best_name = im, "/" + os.path.splitext(img_file.name)[0]
+    return best, best_name
+
+def _concat_matrix(m, n):
+    """PDF matrix product m × n (apply m, then n) on 6-element [a b c d e f] lists."""
+    return [
+        m[0] * n[0] + m[1] * n[2], m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2], m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4], m[4] * n[1] + m[5] * n[3] + n[5],
+    ]
+
+def image_placement(page, xobject_name):
+    """
+    Return the matrix that maps the unit square of image xobject_name onto the page,
+    as set up by the content stream. Falls back to filling the crop box.
+    """
+    from PyPDF2.generic import ContentStream
+    box = page.cropbox
+    fallback = [float(box.width), 0, 0, float(box.height), float(box.left), float(box.bottom)]
+    contents = page.get_contents()
+    if not xobject_name or contents is None:
+        return fallback
+    ctm, stack = [1, 0, 0, 1, 0, 0], []
+    for operands, op in ContentStream(contents, page.pdf).operations:
+        if op == b"q":
+            stack.append(ctm)
+        elif op == b"Q" and stack:
+            ctm = stack.pop()
+        elif op == b"cm" and len(operands) == 6:
+            ctm = _concat_matrix([float(x) for x in operands], ctm)
+        elif op == b"Do" and operands and operands[0] == xobject_name:
+            return ctm
+    return fallback
+
+def display_quarter_turns(page, placement):
+    """Quarter turns (counter-clockwise) the image is shown at, counting /Rotate."""
+    angle = math.degrees(math.atan2(placement[1], placement[0])) - page.rotation
+    return round(angle / 90) % 4
+
+def perform_tesseract_text_layer(image, lang, psm_args, visible=False):
+    """
+    OCR a PIL image and return a single page PDF holding only its text.
+    The text is invisible unless visible is set, in which case it is drawn
+    in red with its word boxes, like the PaddleOCR overlays.
+    """
+    import pytesseract
+    if visible:
+        return _tesseract_visible_layer(image, lang, psm_args)
+    config = f"-l {lang} -c textonly_pdf=1"
+    if psm_args:
+        config += f" {psm_args}"
+    return pytesseract.image_to_pdf_or_hocr(
+        image.convert("RGB"), config=config, extension="pdf"
+    )
+
+def _tesseract_visible_layer(image, lang, psm_args):
+    """Red word boxes and text on an image-sized page, from Tesseract word data."""
+    import pytesseract
+    from reportlab.pdfgen import canvas
+    data = pytesseract.image_to_data(
+        image.convert("RGB"), config=f"-l {lang} {psm_args or ''}",
+        output_type=pytesseract.Output.DICT
+    )
+    w, h = image.size
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(w, h))
+    c.setStrokeColorRGB(1, 0, 0)
+    c.setFillColorRGB(1, 0, 0)
+    c.setLineWidth(0.5)
+    for i, txt in enumerate(data["text"]):
+        txt = txt.strip()
+        if not txt:
+            continue
+        x, y = int(data["left"][i]), int(data["top"][i])
+        bw, bh = int(data["width"][i]), int(data["height"][i])
+        bottom = h - (y + bh)  # Tesseract counts from the top, PDF from the bottom
+        c.rect(x, bottom, bw, bh)
+        text_obj = c.beginText(x, bottom)
+        text_obj.setFont("Helvetica", max(1, min(bh * 0.9, 50)))
+        text_obj.textLine(txt)
+        c.drawText(text_obj)
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def perform_paddleocr_text_layer(size, result, visible=False, threshold=0.6, source=""):
+    """
+    Build a text-only PDF page from a PaddleOCR result for an image of the given size.
+    A box that fails is skipped (and logged under source) instead of losing the page.
+    """
+    from reportlab.pdfgen import canvas
+    boxes = result.get("dt_polys", [])
+    texts = result.get("rec_texts", [])
+    confs = result.get("rec_scores", [])
+    ocr_img = result.get("doc_preprocessor_res", {}).get("output_img")
+    if not boxes or ocr_img is None:
+        return None
+
+    orig_w, orig_h = size
+    ocr_h, ocr_w = ocr_img.shape[:2]
+    x_scale = orig_w / ocr_w
+    y_scale = orig_h / ocr_h
+
+    buffer = BytesIO()
+    c = canvas.Canvas(buffer, pagesize=(orig_w, orig_h))
+    for i, box in enumerate(boxes):
+        try:
+            conf = confs[i] if i < len(confs) else 0
+            text = texts[i] if i < len(texts) else ""
+            if conf < threshold or not text:
+                continue
+
+            scaled, angle, font_size = _paddle_box_geometry(box, x_scale, y_scale, orig_w, orig_h)
+            if visible:
+                c.setStrokeColorRGB(1, 0, 0)
+                c.setLineWidth(0.5)
+                for j in range(4):
+                    p1, p2 = scaled[j], scaled[(j + 1) % 4]
+                    c.line(p1[0], p1[1], p2[0], p2[1])
+
+            # Text is always written; render mode 3 keeps it invisible but searchable
+            c.saveState()
+            try:
+                c.translate(scaled[3][0], scaled[3][1])
+                c.rotate(angle)
+                text_obj = c.beginText(0, 0)
+                text_obj.setFont("Helvetica", font_size)
+                text_obj.setTextRenderMode(0 if visible else 3)
+                c.setFillColorRGB(1, 0, 0)
+                text_obj.textLine(text)
+                c.drawText(text_obj)
+            finally:
+                c.restoreState()
+
+        except Exception as e:
+            print_warning(f"Paddle box {i} failed on {source or 'page'} → {e}")
+            with open(LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(f"[PADDLE] {source} box {i} → {e}\n")
+            continue
+
+    c.showPage()
+    c.save()
+    return buffer.getvalue()
+
+def merge_text_layer(page, layer_pdf, placement, quarter_turns=0):
+    """
+    Stamp a text-only PDF onto page over the image it was OCR'd from.
+    placement is the image's matrix from image_placement; quarter_turns is how far
+    the image was turned upright before OCR, and is undone here. Image streams
+    are left untouched.
+    """
+    from PyPDF2 import PdfReader, Transformation
+    layer = PdfReader(BytesIO(layer_pdf)).pages[0]
+    box = layer.mediabox
+    # Layer page → unit square of the upright image → unit square of the stored image
+    matrix = [1 / float(box.width), 0, 0, 1 / float(box.height),
+              -float(box.left) / float(box.width), -float(box.bottom) / float(box.height)]
+    for _ in range(quarter_turns):
+        matrix = _concat_matrix(matrix, [0, -1, 1, 0, 0, 1])
+    layer.add_transformation(Transformation(tuple(_concat_matrix(matrix, placement))), expand=True)
+    layer.trimbox = layer.mediabox  # merge_page clips the layer to its trim box
+    page.merge_page(layer)
+
+def add_text_layer_to_pdf(pdf_path, lang, psm_args, engine, overlays_visible, threshold):
+    """
+    OCR every page of an image-only PDF and write <name>_ocr.pdf next to it.
+    The original page objects (and their image streams) are copied as-is;
+    only a text layer is added on top.
+    """
+    from PyPDF2 import PdfReader, PdfWriter
+    name = os.path.basename(pdf_path)
+    out_path = os.path.splitext(pdf_path)[0] + TEXT_LAYER_SUFFIX
+    reader = PdfReader(pdf_path)
+    writer = PdfWriter()
+    print_info(f"Adding text layer to: {name} using {engine}")
+
+    for page_no, page in enumerate(reader.pages, start=1):
+        try:
+            with stage_timer.stage("decode", pdf_path, page_no):
+                image, xobject_name = extract_page_image(page)
+                if image is not None:
+                    placement = image_placement(page, xobject_name)
+                    turns = display_quarter_turns(page, placement)
+                    if turns:
+                        image = image.rotate(90 * turns, expand=True)  # OCR upright text
+            if image is None:
+                print_warning(f"No image found on page {page_no} of {name}; copied without text.")
+            else:
+                if engine == "paddle":
+                    import numpy as np
+                    rgb = np.array(image.convert("RGB"))[:, :, ::-1]  # Paddle expects BGR
+                    with stage_timer.stage("ocr", pdf_path, page_no):
+                        result = paddle_model.predict(rgb)[0]
+                    with stage_timer.stage("overlay", pdf_path, page_no):
+                        layer_pdf = perform_paddleocr_text_layer(
+                            image.size, result, visible=overlays_visible, threshold=threshold,
+                            source=f"{name} page {page_no}"
+                        )
+                else:
+                    with stage_timer.stage("ocr", pdf_path, page_no):
+                        layer_pdf = perform_tesseract_text_layer(
+                            image, lang, psm_args, visible=overlays_visible
+                        )
+                if layer_pdf:
+                    with stage_timer.stage("merge", pdf_path, page_no):
+                        merge_text_layer(page, layer_pdf, placement, turns)
+        except Exception as e:
+            print_error(f"Text layer failed on page {page_no} of {name} → {e}")
+            with open(LOG_FILE, "a", encoding="utf-8") as f:
+                f.write(f"[TEXT_LAYER] {pdf_path} page {page_no} → {e}\n")
+        writer.add_page(page)
+
+    try:
+        with stage_timer.stage("write", pdf_path), open(out_path, "wb") as f:
+            writer.write(f)
+        print_success(f"PDF created: {out_path}")
+    except Exception as e:
+        print_error(f"Failed to save PDF {out_path} → {e}")
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(f"[PDF_SAVE] {out_path} → {e}\n")
+        raise
+
+def run_text_layer(master_folder, lang, psm_args, engine, overlays_visible, threshold, pdfs=None):
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+    from tqdm import tqdm
+    from pdf_worker import text_layer_worker
+    if pdfs is None:
+        pdfs = find_image_only_pdfs(master_folder)
+    print_info(f"Found {len(pdfs)} PDFs.")
+    args_list = [
+        (pdf_path, lang, psm_args, engine, overlays_visible, threshold)
+        for pdf_path in pdfs
+    ]
+
+    if engine == "paddle":
+        # PaddleOCR model lives in this process, so run sequentially
+        for pdf_path, *settings in tqdm(args_list, desc="Text layer (PaddleOCR)"):
+            try:
+                add_text_layer_to_pdf(pdf_path, *settings)
+            except Exception as e:
+                with open(LOG_FILE, "a", encoding="utf-8") as f:
+                    f.write(f"[WORKER] {pdf_path} → {e}\n")
+        return
+
+    with ProcessPoolExecutor(max_workers=MAX_WORKERS) as executor:
+        futures = {executor.submit(text_layer_worker, args): args[0] for args in args_list}
+
+        for future in tqdm(as_completed(futures), total=len(futures), desc="Text layer (Parallel)"):
+            pdf_done = futures[future]
+            try:
+                _, success, timings = future.result()
+                stage_timer.add(timings)
+                if success:
+                    print_success(f"Finished text layer for: {pdf_done}")
+                else:
+                    print_error(f"Worker failed for PDF: {pdf_done}")
+            except Exception as e:
+                print_error(f"Worker exception for PDF: {pdf_done} → {e}")
+                with open(LOG_FILE, "a", encoding="utf-8") as f:
+                    f.write(f"[WORKER_EXC] {pdf_done} → {e}\n")
+
 # ---- PREVIEWS ----
 def preview_paddle(threshold):
+    from launcherlib.dialogs import ask_file, ask_choice
     global paddle_model
     if paddle_model is None:
         print_error("PaddleOCR model not loaded.")
@@ -495,6 +965,7 @@ def preview_paddle(threshold):
             return response
 
 def preview_tesseract(lang, psm_args, overlays_visible):
+    from launcherlib.dialogs import ask_file, ask_choice
     while True:
         path = ask_file(title="Select image for preview")
         if not path:
@@ -505,7 +976,7 @@ def preview_tesseract(lang, psm_args, overlays_visible):
 
         try:
             if overlays_visible:
-                buffer = generate_tesseract_overlay_pdf(path, lang, psm_args)
+                buffer, text_items = generate_tesseract_overlay_pdf(path, lang, psm_args)
                 if buffer:
                     preview_pdf = tempfile.NamedTemporaryFile(delete=False, suffix=".pdf")
                     preview_pdf.write(buffer.read())
@@ -513,8 +984,6 @@ def preview_tesseract(lang, psm_args, overlays_visible):
                     os.startfile(preview_pdf.name)
                     _temp_files.add(preview_pdf.name)  # Track temp file
                     print_info(f"Preview saved as {preview_pdf.name}")
-
-                _, text_items = perform_tesseract_ocr(path, lang, psm_args)
             else:
                 pdf_data, text_items = perform_tesseract_ocr(path, lang, psm_args)
                 if pdf_data:
@@ -532,7 +1001,7 @@ def preview_tesseract(lang, psm_args, overlays_visible):
 
         if text_items:
             print_info("\nText preview with confidence:")
-            for txt, conf in text_items:
+            for txt, conf, _ in text_items:
                 print(f"[{conf}%] {txt}")
 
         response = ask_choice(
@@ -553,9 +1022,24 @@ def preview_tesseract(lang, psm_args, overlays_visible):
 
 # ---- MAIN ----
 def run():
+    from launcherlib.dialogs import ask_directory, ask_yes_no, ask_choice, ask_float
+    from ocr_index import INDEX_PATH
     while True:
+        # ---- MODE ----
+        mode = ask_choice(
+            "What do you want to do?",
+            {
+                "1": "Create PDFs from image folders",
+                "2": "Add a text layer to existing image-only PDFs",
+                "3": "Build one volume PDF from a folder of chapters",
+            }
+        )
+        add_text_layer = mode == "2"
+        volume_mode = mode == "3"
+
         # ---- OCR CONFIGURATION ----
-        use_ocr = ask_yes_no("Do you want to OCR your PDF?")
+        # A text layer needs OCR, so skip the question in that mode
+        use_ocr = "yes" if add_text_layer else ask_yes_no("Do you want to OCR your PDF?")
         lang, psm_args, threshold = None, None, None
 
         if use_ocr == "no":
@@ -592,6 +1076,7 @@ def run():
             elif engine_choice == "2":
                 selected_engine = "tesseract"
                 overlays_visible = False
+                import pytesseract
                 pytesseract.pytesseract.tesseract_cmd = "tesseract"
 
                 lang_input = input(f"Enter Tesseract languages (default: {DEFAULT_LANGUAGES}): ").strip()
@@ -614,35 +1099,74 @@ def run():
                     "Do you want OCR overlays (text + rectangles) to be visible?"
                 ) == "yes"
 
+        # ---- SEARCH INDEX ----
+        build_index = False
+        if selected_engine != "none" and not add_text_layer:
+            build_index = ask_yes_no(
+                f"Store the OCR text in the searchable library index ({INDEX_PATH})?"
+            ) == "yes"
+
+        # ---- TIMING TRACE ----
+        save_trace = ask_yes_no(
+            f"Save a Chrome trace of the run ({TRACE_FILE})?", default="no"
+        ) == "yes"
+
         # ---- CONFIRM SETTINGS ----
         if ask_yes_no("Proceed with current settings?") == "no":
             continue  # restart loop to reconfigure
 
         # ---- MASTER FOLDER SELECTION ----
-        master_folder = ask_directory("Select Master Folder")
+        master_folder = ask_directory(
+            "Select Volume Folder (one subfolder per chapter)" if volume_mode else "Select Master Folder"
+        )
         if not master_folder:
             print_error("Cancelled.")
             continue
         master_folder = os.path.abspath(master_folder)
+        stage_timer.drain()  # time this run only
 
-        # ---- SUBFOLDER COLLECTION ----
-        subfolders = [
-            root for root, _, files in os.walk(master_folder)
-            if any(f.lower().endswith(IMAGE_EXTS) for f in files)
-        ]
+        if add_text_layer:
+            # ---- TEXT LAYER ----
+            pdfs = find_image_only_pdfs(master_folder)
+            if not pdfs:
+                print_error("No image-only PDFs found.")
+                continue
 
-        if not subfolders:
-            print_error("No subfolders with images found.")
-            continue
+            run_text_layer(master_folder, lang, psm_args, selected_engine, overlays_visible, threshold, pdfs)
 
-        print_info(f"Found {len(subfolders)} image folders.")
+            print_success(f"\nDone. Searchable PDFs saved next to the originals as *{TEXT_LAYER_SUFFIX}.")
+        else:
+            # ---- SUBFOLDER COLLECTION ----
+            subfolders = [
+                root for root, _, files in os.walk(master_folder)
+                if any(f.lower().endswith(IMAGE_EXTS) for f in files)
+            ]
+
+            if not subfolders:
+                print_error("No subfolders with images found.")
+                continue
+
+            print_info(f"Found {len(subfolders)} image folders.")
 
-        # ---- PDF CREATION ----
-        run_parallel(master_folder, lang, psm_args, selected_engine, overlays_visible, threshold)
+            # ---- PDF CREATION ----
+            index_path = INDEX_PATH if build_index else None
+            if volume_mode:
+                build_volume(master_folder, lang, psm_args, selected_engine, overlays_visible, threshold, index_path)
+            else:
+                run_parallel(master_folder, lang, psm_args, selected_engine, overlays_visible, threshold, index_path)
 
-        print_success("\nDone. All PDFs saved to the master folder.")
+            print_success("\nDone. All PDFs saved to the master folder.")
+            if index_path:
+                print_info("Search the OCR text with: python ocr_index.py \"words\"")
         print_info(f"Check '{LOG_FILE}' for any warnings or errors.")
 
+        # ---- TIMINGS ----
+        timings = stage_timer.drain()
+        stage_timer.print_summary(timings)
+        if save_trace and timings:
+            trace_path = stage_timer.write_trace(timings, os.path.join(master_folder, TRACE_FILE))
+            print_info(f"Trace saved as {trace_path} (open in chrome://tracing or ui.perfetto.dev)")
+
         # ---- NEXT ACTION ----
         choice = ask_choice(
             "\nWhat do you want to do next?",
@@ -655,51 +1179,60 @@ def run():
 
 
 def generate_tesseract_overlay_pdf(img_path, lang, psm_args):
+    import img2pdf
+    import pytesseract
+    from PIL import Image, ImageDraw
     try:
-        with Image.open(img_path) as image:
-            image = image.convert("RGB")
-            draw = ImageDraw.Draw(image)
+        with _page_stage("decode", img_path):
+            with Image.open(img_path) as image:
+                image = image.convert("RGB")
+                draw = ImageDraw.Draw(image)
 
         config = f"-l {lang} {psm_args or ''}"
-        data = pytesseract.image_to_data(
-            image, config=config, output_type=pytesseract.Output.DICT
-        )
+        with _page_stage("ocr", img_path):
+            data = pytesseract.image_to_data(
+                image, config=config, output_type=pytesseract.Output.DICT
+            )
 
-        for i in range(len(data["text"])):
-            txt = data["text"][i].strip()
-            try:
-                conf = float(data["conf"][i])
-            except ValueError:
-                conf = -1.0
-            if not txt:
-                continue
+        with _page_stage("overlay", img_path):
+            text_items = []
+            for i in range(len(data["text"])):
+                txt = data["text"][i].strip()
+                try:
+                    conf = float(data["conf"][i])
+                except ValueError:
+                    conf = -1.0
+                if not txt:
+                    continue
 
-            x, y, w, h = (
-                int(data["left"][i]),
-                int(data["top"][i]),
-                int(data["width"][i]),
-                int(data["height"][i]),
-            )
+                x, y, w, h = (
+                    int(data["left"][i]),
+                    int(data["top"][i]),
+                    int(data["width"][i]),
+                    int(data["height"][i]),
+                )
+                text_items.append((txt, conf, (x, y, w, h)))
 
-            draw.rectangle([(x, y), (x + w, y + h)], outline="red", width=1)
-            text_y = max(y - 10, 0)
-            draw.text((x, text_y), txt, fill="red")
+                draw.rectangle([(x, y), (x + w, y + h)], outline="red", width=1)
+                text_y = max(y - 10, 0)
+                draw.text((x, text_y), txt, fill="red")
 
-        image_bytes = BytesIO()
-        image.save(image_bytes, format="JPEG")
-        image_bytes.seek(0)
+            image_bytes = BytesIO()
+            image.save(image_bytes, format="JPEG")
+            image_bytes.seek(0)
 
-        buffer = BytesIO()
-        buffer.write(img2pdf.convert(image_bytes))
-        buffer.seek(0)
-        return buffer
+            buffer = BytesIO()
+            buffer.write(img2pdf.convert(image_bytes))
+            buffer.seek(0)
+        return buffer, text_items
 
     except Exception as e:
         print_error(f"Tesseract overlay failed: {os.path.basename(img_path)} → {e}")
         with open(LOG_FILE, "a", encoding="utf-8") as f:
             f.write(f"[TESS-OVERLAY] {img_path} → {e}\n")
-        return None
+        return None, []
 
 
 if __name__ == "__main__":
+    install_cleanup_handlers()
     run()
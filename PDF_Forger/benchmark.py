@@ -0,0 +1,295 @@
+# OCR throughput benchmark for PDF_Forger.
+# Generates synthetic manga pages (panels, speech bubbles with text and
+# screentone noise) at several sizes, then builds a PDF from them with each
+# engine and reports pages/sec and peak RSS.
+#
+# Every engine/size run happens in its own Python process so peak memory is
+# measured per run and one engine's imports never skew another's numbers.
+#
+#     python benchmark.py
+#     python benchmark.py --engines none,tesseract --sizes 1600x2400 --pages 20 --json bench.json
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import argparse
+import tempfile
+import subprocess
+from importlib.util import find_spec
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+ENGINES = ("none", "tesseract", "paddle")
+DEFAULT_SIZES = ("800x1200", "1600x2400", "2400x3600")
+DEFAULT_PAGES = 10
+BENCH_LANG = "eng"  # always installed with Tesseract, unlike jpn
+
+WORDS = (
+    "WHAT", "ARE", "YOU", "DOING", "HERE", "RUN", "WAIT", "NO", "WAY", "THIS",
+    "CAN'T", "BE", "HAPPENING", "I", "WILL", "PROTECT", "EVERYONE", "LET'S", "GO",
+)
+
+
+# ---- SYNTHETIC PAGES ----
+def _screentone_tile(spacing, radius):
+    from PIL import Image, ImageDraw
+    tile = Image.new("L", (spacing * 8, spacing * 8), 255)
+    draw = ImageDraw.Draw(tile)
+    for y in range(0, tile.height, spacing):
+        offset = spacing // 2 if (y // spacing) % 2 else 0
+        for x in range(offset, tile.width, spacing):
+            draw.ellipse((x - radius, y - radius, x + radius, y + radius), fill=110)
+    return tile
+
+
+def _fill_screentone(page, box, tile):
+    """Tile a dot pattern over box."""
+    x0, y0, x1, y1 = box
+    region = page.crop(box)
+    for y in range(0, y1 - y0, tile.height):
+        for x in range(0, x1 - x0, tile.width):
+            region.paste(tile, (x, y))
+    page.paste(region, (x0, y0))
+
+
+def _font(size):
+    from PIL import ImageFont
+    try:
+        return ImageFont.load_default(size=size)
+    except TypeError:  # Pillow < 10.1 has a single bitmap size
+        return ImageFont.load_default()
+
+
+def make_page(width, height, seed):
+    """Return a grayscale PIL image that looks roughly like a manga page."""
+    from PIL import Image, ImageDraw, ImageChops
+
+    rng = random.Random(seed)
+    page = Image.new("L", (width, height), 255)
+    draw = ImageDraw.Draw(page)
+    margin = width // 20
+    gutter = max(4, width // 60)
+    border = max(2, width // 300)
+    tile = _screentone_tile(max(4, width // 150), max(1, width // 600))
+    font = _font(max(12, width // 40))
+
+    # Panels: 3-4 rows of 1-3 panels each
+    rows = rng.randint(3, 4)
+    row_h = (height - 2 * margin - (rows - 1) * gutter) // rows
+    for r in range(rows):
+        y0 = margin + r * (row_h + gutter)
+        cols = rng.randint(1, 3)
+        col_w = (width - 2 * margin - (cols - 1) * gutter) // cols
+        for c in range(cols):
+            x0 = margin + c * (col_w + gutter)
+            box = (x0, y0, x0 + col_w, y0 + row_h)
+            if rng.random() < 0.5:
+                _fill_screentone(page, box, tile)
+            draw.rectangle(box, outline=0, width=border)
+
+            # Speech bubble with a few words
+            if rng.random() < 0.8:
+                lines = [" ".join(rng.choice(WORDS) for _ in range(rng.randint(1, 3)))
+                         for _ in range(rng.randint(1, 3))]
+                text_w = max(draw.textlength(line, font=font) for line in lines)
+                bw = int(col_w * rng.uniform(0.45, 0.7))
+                bw = min(col_w - border * 4, max(bw, int(text_w * 1.4)))  # keep the text inside
+                bh = int(row_h * rng.uniform(0.3, 0.45))
+                bx = x0 + rng.randint(border * 2, max(border * 2, col_w - bw - border * 2))
+                by = y0 + rng.randint(border * 2, max(border * 2, row_h - bh - border * 2))
+                draw.ellipse((bx, by, bx + bw, by + bh), fill=255, outline=0, width=border)
+                line_h = font.getbbox("Ag")[3] + border * 2
+                ty = by + (bh - line_h * len(lines)) // 2
+                for line in lines:
+                    tw = draw.textlength(line, font=font)
+                    draw.text((bx + (bw - tw) / 2, ty), line, fill=0, font=font)
+                    ty += line_h
+
+    # Scanner noise on top
+    noise = Image.effect_noise((width, height), 24).point(lambda v: 255 if v > 128 else 235)
+    return ImageChops.darker(page, noise)
+
+
+def generate_pages(folder, size, count):
+    width, height = size
+    os.makedirs(folder, exist_ok=True)
+    for i in range(count):
+        make_page(width, height, seed=i).save(os.path.join(folder, f"{i + 1:03d}.png"))
+
+
+# ---- MEASUREMENT ----
+def peak_rss_bytes():
+    """Peak resident set size of this process."""
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        ctypes.windll.psapi.GetProcessMemoryInfo(
+            ctypes.windll.kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb
+        )
+        return counters.PeakWorkingSetSize
+
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024  # Linux reports KiB
+
+
+def engine_skip_reason(engine):
+    if engine == "tesseract" and shutil.which("tesseract") is None:
+        return "tesseract binary not found on PATH"
+    if engine == "paddle" and find_spec("paddleocr") is None:
+        return "paddleocr not installed"
+    return None
+
+
+def run_child(engine, folder):
+    """Build one PDF from folder with engine in this process; print a JSON result line."""
+    import contextlib
+    import PDF_Forger
+    import stage_timer
+
+    threshold = PDF_Forger.DEFAULT_THRESHOLDS.get(engine)
+    pages = len(os.listdir(folder))
+    with contextlib.redirect_stdout(open(os.devnull, "w", encoding="utf-8")):
+        if engine == "paddle" and not PDF_Forger.load_paddleocr(BENCH_LANG):
+            raise SystemExit("PaddleOCR failed to load")
+        stage_timer.drain()
+        start = time.perf_counter()
+        out_path = PDF_Forger.create_pdf_from_folder(folder, BENCH_LANG, None, engine, False, threshold)
+        elapsed = time.perf_counter() - start
+
+    stages = {
+        name: round(total, 4)
+        for name, _, total, _, _, _ in stage_timer.summarize(stage_timer.drain())
+    }
+    print(json.dumps({
+        "ok": out_path is not None,
+        "pages": pages,
+        "seconds": elapsed,
+        "peak_rss": peak_rss_bytes(),
+        "stages": stages,
+    }))
+
+
+def run_engine(engine, folder):
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join([HERE, ROOT, env.get("PYTHONPATH", "")])
+    proc = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", engine, folder],
+        cwd=HERE, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding="utf-8", errors="replace",
+    )
+    lines = proc.stdout.strip().splitlines()
+    if proc.returncode != 0 or not lines:
+        err = proc.stderr.strip().splitlines()
+        raise RuntimeError(err[-1] if err else f"exit code {proc.returncode}")
+    result = json.loads(lines[-1])
+    if not result["ok"]:
+        raise RuntimeError(f"no PDF written (see {os.path.join(HERE, 'log.txt')})")
+    return result
+
+
+def parse_size(text):
+    w, _, h = text.lower().partition("x")
+    return int(w), int(h)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="PDF_Forger OCR throughput benchmark on synthetic manga pages.")
+    parser.add_argument("--engines", default=",".join(ENGINES), help=f"Comma-separated engines (default: {','.join(ENGINES)}).")
+    parser.add_argument("--sizes", default=",".join(DEFAULT_SIZES), help=f"Comma-separated WxH page sizes (default: {','.join(DEFAULT_SIZES)}).")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help=f"Pages per size (default: {DEFAULT_PAGES}).")
+    parser.add_argument("--json", help="Also write results to this JSON file.")
+    parser.add_argument("--keep", action="store_true", help="Keep the generated pages and PDFs.")
+    parser.add_argument("--child", nargs=2, metavar=("ENGINE", "FOLDER"), help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        run_child(*args.child)
+        return 0
+
+    from launcherlib.prints import print_info, print_warning, print_error, print_success
+
+    engines = [e.strip() for e in args.engines.split(",") if e.strip()]
+    unknown = [e for e in engines if e not in ENGINES]
+    if unknown:
+        print_error(f"Unknown engine(s): {', '.join(unknown)}")
+        return 2
+    sizes = [parse_size(s) for s in args.sizes.split(",") if s.strip()]
+
+    work_dir = tempfile.mkdtemp(prefix="pdf_forger_bench_")
+    results = []
+    try:
+        for width, height in sizes:
+            folder = os.path.join(work_dir, f"{width}x{height}")
+            print_info(f"Generating {args.pages} synthetic pages at {width}x{height}...")
+            generate_pages(folder, (width, height), args.pages)
+
+            for engine in engines:
+                reason = engine_skip_reason(engine)
+                row = {"engine": engine, "size": f"{width}x{height}", "pages": args.pages}
+                if reason:
+                    print_warning(f"Skipping {engine}: {reason}")
+                    results.append({**row, "skipped": reason})
+                    continue
+                try:
+                    res = run_engine(engine, folder)
+                except RuntimeError as e:
+                    print_error(f"{engine} at {width}x{height} failed: {e}")
+                    results.append({**row, "error": str(e)})
+                    continue
+                row.update(
+                    seconds=round(res["seconds"], 3),
+                    pages_per_sec=round(res["pages"] / res["seconds"], 3) if res["seconds"] else None,
+                    peak_rss_mb=round(res["peak_rss"] / (1024 * 1024), 1),
+                    stages=res["stages"],
+                )
+                results.append(row)
+    finally:
+        if args.keep:
+            print_info(f"Benchmark files kept in {work_dir}")
+        else:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    print("\nBenchmark results:")
+    print("------------------------------------------------------------------")
+    print("{:<10} {:<10} {:>6} {:>10} {:>10} {:>14}".format("Engine", "Size", "Pages", "Seconds", "Pages/s", "Peak RSS (MB)"))
+    print("------------------------------------------------------------------")
+    for r in results:
+        if "pages_per_sec" in r:
+            print("{:<10} {:<10} {:>6} {:>10.2f} {:>10.2f} {:>14.1f}".format(
+                r["engine"], r["size"], r["pages"], r["seconds"], r["pages_per_sec"], r["peak_rss_mb"]))
+        else:
+            print("{:<10} {:<10} {:>6}   {}".format(
+                r["engine"], r["size"], r["pages"], "skipped: " + r["skipped"] if "skipped" in r else "error"))
+    print("------------------------------------------------------------------\n")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print_success(f"Results written to {args.json}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,102 @@
+# Run this script to make sure PDF_Forger still starts fast.
+# It imports PDF_Forger and its worker module under `python -X importtime`
+# and fails if any heavy engine library is loaded at import time.
+# Every spawned worker (Windows) pays this cost again, so keep it low.
+
+import os
+import sys
+import argparse
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(HERE)
+
+# Modules that must only be imported once an engine actually needs them
+HEAVY_MODULES = (
+    "PyPDF2",
+    "img2pdf",
+    "PIL",
+    "pytesseract",
+    "reportlab",
+    "paddleocr",
+    "paddle",
+    "numpy",
+    "tqdm",
+    "natsort",
+    "tkinter",
+    "concurrent.futures.process",
+)
+
+ENTRY_MODULES = ("PDF_Forger", "pdf_worker")
+
+DEFAULT_BUDGET_MS = 150  # cumulative import time allowed per entry module
+
+
+def import_times(module):
+    """Return {module name: cumulative microseconds} for importing module in a fresh interpreter."""
+    env = os.environ.copy()
+    env["PYTHONPATH"] = os.pathsep.join([HERE, ROOT, env.get("PYTHONPATH", "")])
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=HERE, env=env, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        text=True, encoding="utf-8", errors="replace",
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "import failed")
+
+    times = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        try:
+            _, cumulative, name = line[len("import time:"):].split("|")
+            times[name.strip()] = int(cumulative)
+        except ValueError:
+            continue  # header line
+    return times
+
+
+def check(module, budget_ms):
+    times = import_times(module)
+    heavy = sorted(
+        name for name in times
+        if any(name == h or name.startswith(h + ".") for h in HEAVY_MODULES)
+    )
+    total_ms = times.get(module, 0) / 1000
+
+    ok = True
+    print(f"\n📦 {module}: {total_ms:.1f} ms (budget {budget_ms} ms)")
+    if heavy:
+        ok = False
+        print(f"❌ Heavy modules imported at startup: {', '.join(heavy)}")
+    if total_ms > budget_ms:
+        ok = False
+        print("❌ Import time over budget.")
+    if ok:
+        print("✔️ OK")
+    return ok
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import-time regression check for PDF_Forger.")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS,
+                        help=f"Cumulative import time allowed per module (default: {DEFAULT_BUDGET_MS}).")
+    args = parser.parse_args(argv)
+
+    results = []
+    for module in ENTRY_MODULES:
+        try:
+            results.append(check(module, args.budget_ms))
+        except RuntimeError as e:
+            print(f"\n❌ Could not import {module}: {e}")
+            results.append(False)
+
+    if all(results):
+        print("\n✅ Import-time check passed.")
+        return 0
+    print("\n❌ Import-time check failed.")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
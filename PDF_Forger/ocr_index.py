@@ -0,0 +1,154 @@
+# Full-text search index for OCR output produced by PDF_Forger.
+# Text found during a run is stored in a SQLite FTS5 table together with
+# the series, folder, page number and box of every hit.
+#
+# One index covers the whole library (INDEX_PATH); re-running a folder
+# replaces only that folder's entries.
+#
+# Query it from the command line:
+#     python ocr_index.py "search words"
+
+import os
+import sys
+import time
+import json
+import sqlite3
+import argparse
+
+INDEX_PATH = os.path.join(os.path.expanduser("~"), ".pdf_forger", "ocr_index.db")  # Default library-wide index
+
+# FTS5 can't index its UNINDEXED columns, so ocr_rows maps every ocr_text
+# rowid to its folder; replacing a folder then deletes by rowid, not by a scan.
+_SCHEMA = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS ocr_text USING fts5(
+        text,
+        series UNINDEXED,
+        folder UNINDEXED,
+        page UNINDEXED,
+        box UNINDEXED,
+        conf UNINDEXED
+    )
+    """,
+    "CREATE TABLE IF NOT EXISTS ocr_rows (id INTEGER PRIMARY KEY, folder TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS ocr_rows_folder ON ocr_rows (folder)",
+)
+
+
+def open_index(db_path):
+    """Open (and create if needed) the index database."""
+    os.makedirs(os.path.dirname(os.path.abspath(db_path)), exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=60)  # Workers write concurrently; wait for the lock
+    conn.execute("PRAGMA journal_mode=WAL")
+    with conn:
+        conn.execute("BEGIN IMMEDIATE")  # one worker at a time creates / upgrades the schema
+        tables = {name for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        for statement in _SCHEMA:
+            conn.execute(statement)
+        if "ocr_text" in tables and "ocr_rows" not in tables:  # index written before ocr_rows existed
+            conn.execute("INSERT INTO ocr_rows (id, folder) SELECT rowid, folder FROM ocr_text")
+    return conn
+
+
+def index_folder(db_path, folder, pages):
+    """
+    Replace the index entries of one image folder.
+
+    :param folder: image folder the PDF was built from.
+    :param pages: list of (page_no, text_items) where text_items holds
+                  (text, conf, (x, y, w, h)) tuples in image pixels.
+    """
+    folder = os.path.abspath(folder)
+    series = os.path.basename(os.path.dirname(folder))
+    rows = [
+        (text, series, folder, page_no, ",".join(str(round(v)) for v in box), conf)
+        for page_no, items in pages
+        for text, conf, box in items
+    ]
+    conn = open_index(db_path)
+    try:
+        with conn:  # one transaction per folder
+            conn.execute(
+                "DELETE FROM ocr_text WHERE rowid IN (SELECT id FROM ocr_rows WHERE folder = ?)", (folder,)
+            )
+            conn.execute("DELETE FROM ocr_rows WHERE folder = ?", (folder,))
+            for row in rows:
+                rowid = conn.execute("INSERT INTO ocr_rows (folder) VALUES (?)", (folder,)).lastrowid
+                conn.execute(
+                    "INSERT INTO ocr_text (rowid, text, series, folder, page, box, conf) VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (rowid, *row),
+                )
+    finally:
+        conn.close()
+    return len(rows)
+
+
+def _fts_query(query):
+    """Quote every word so user input is never parsed as FTS5 syntax."""
+    terms = query.split()
+    return " ".join('"' + t.replace('"', '""') + '"' for t in terms)
+
+
+def search_index(db_path, query, limit=50, raw=False):
+    """Return a list of hit dicts ordered by relevance."""
+    conn = open_index(db_path)
+    try:
+        cur = conn.execute(
+            "SELECT series, folder, page, box, conf, text FROM ocr_text "
+            "WHERE ocr_text MATCH ? ORDER BY rank LIMIT ?",
+            (query if raw else _fts_query(query), limit),
+        )
+        hits = []
+        for series, folder, page, box, conf, text in cur:
+            hits.append({
+                "series": series,
+                "folder": folder,
+                "page": page,
+                "box": [int(v) for v in box.split(",")] if box else [],
+                "conf": conf,
+                "text": text,
+            })
+        return hits
+    finally:
+        conn.close()
+
+
+def main(argv=None):
+    from launcherlib.prints import print_info, print_warning, print_error
+
+    parser = argparse.ArgumentParser(description="Search the OCR text index built by PDF_Forger.")
+    parser.add_argument("query", help="Words to search for.")
+    parser.add_argument("--db", default=INDEX_PATH, help=f"Index database (default: {INDEX_PATH}).")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum number of hits (default: 50).")
+    parser.add_argument("--raw", action="store_true", help="Pass the query to FTS5 unchanged (AND/OR/NEAR, prefix*).")
+    parser.add_argument("--json", action="store_true", help="Print hits as JSON.")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.db):
+        print_error(f"Index not found: {args.db}")
+        return 1
+
+    start = time.perf_counter()
+    try:
+        hits = search_index(args.db, args.query, args.limit, args.raw)
+    except sqlite3.OperationalError as e:
+        print_error(f"Invalid query: {e}")
+        return 1
+    elapsed_ms = (time.perf_counter() - start) * 1000
+
+    if args.json:
+        print(json.dumps(hits, ensure_ascii=False, indent=2))
+        return 0
+
+    if not hits:
+        print_warning("No hits.")
+    for hit in hits:
+        x, y, w, h = hit["box"] or (0, 0, 0, 0)
+        print(f"{hit['series']} | {os.path.basename(hit['folder'])} | page {hit['page']} "
+              f"| box ({x}, {y}, {w}x{h}) | {hit['text']}")
+    print_info(f"{len(hits)} hit(s) in {elapsed_ms:.1f} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,36 @@
+# Lightweight entry point for PDF_Forger's process pool.
+# Workers are spawned fresh on Windows, so this module imports nothing heavy:
+# PDF_Forger itself only defers to the engine libraries once a task needs them.
+# Stage timings collected during a task are returned with its result.
+
+import stage_timer
+
+
+def process_folder_worker(args):
+    """Worker function for Tesseract/No-OCR PDF creation; returns (folder, pdf path or None, timings)."""
+    from PDF_Forger import create_pdf_from_folder, LOG_FILE
+
+    folder, lang, psm_args, engine, overlays_visible, threshold, index_path = args
+    stage_timer.drain()  # drop anything inherited from a forked parent
+    try:
+        out_path = create_pdf_from_folder(folder, lang, psm_args, engine, overlays_visible, threshold, index_path)
+        return folder, out_path, stage_timer.drain()
+    except Exception as e:
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(f"[WORKER] {folder} → {e}\n")
+        return folder, None, stage_timer.drain()
+
+
+def text_layer_worker(args):
+    """Worker function for adding a Tesseract text layer to one PDF; returns (pdf, success, timings)."""
+    from PDF_Forger import add_text_layer_to_pdf, LOG_FILE
+
+    pdf_path, lang, psm_args, engine, overlays_visible, threshold = args
+    stage_timer.drain()  # drop anything inherited from a forked parent
+    try:
+        add_text_layer_to_pdf(pdf_path, lang, psm_args, engine, overlays_visible, threshold)
+        return pdf_path, True, stage_timer.drain()
+    except Exception as e:
+        with open(LOG_FILE, "a", encoding="utf-8") as f:
+            f.write(f"[WORKER] {pdf_path} → {e}\n")
+        return pdf_path, False, stage_timer.drain()
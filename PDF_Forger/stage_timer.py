@@ -0,0 +1,110 @@
+# Per-page, per-stage timing for PDF_Forger.
+# Engines wrap their work in `with stage("ocr", folder, page):`; every process
+# keeps its own list of records, workers hand theirs back with their result,
+# and the main process prints a summary table and can export a Chrome trace
+# (open it in chrome://tracing or https://ui.perfetto.dev).
+
+import os
+import json
+import time
+import threading
+from contextlib import contextmanager
+
+# Stage names in the order they happen to a page
+STAGES = ("decode", "ocr", "overlay", "convert", "merge", "write", "index")
+
+_records = []
+
+
+@contextmanager
+def stage(name, folder=None, page=None):
+    """Time the enclosed block and record it under stage name."""
+    start = time.time()
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        _records.append({
+            "stage": name,
+            "folder": folder,
+            "page": page,
+            "start": start,
+            "dur": time.perf_counter() - t0,
+            "pid": os.getpid(),
+            "tid": threading.get_ident(),
+        })
+
+
+def drain():
+    """Return the records collected in this process and start over."""
+    records = _records[:]
+    del _records[:]
+    return records
+
+
+def add(records):
+    """Merge records handed back by a worker process."""
+    if records:
+        _records.extend(records)
+
+
+def summarize(records):
+    """Return [(stage, calls, total_s, mean_ms, max_ms, percent)] in STAGES order."""
+    totals = {}
+    for r in records:
+        calls, total, longest = totals.get(r["stage"], (0, 0.0, 0.0))
+        totals[r["stage"]] = (calls + 1, total + r["dur"], max(longest, r["dur"]))
+
+    grand_total = sum(total for _, total, _ in totals.values()) or 1.0
+    order = [s for s in STAGES if s in totals] + sorted(s for s in totals if s not in STAGES)
+    return [
+        (name, calls, total, total / calls * 1000, longest * 1000, total / grand_total * 100)
+        for name in order
+        for calls, total, longest in [totals[name]]
+    ]
+
+
+def print_summary(records):
+    rows = summarize(records)
+    if not rows:
+        return
+    pages = len({(r["folder"], r["page"]) for r in records if r["page"] is not None})
+    print(f"\nStage timings ({pages} pages, {len({r['pid'] for r in records})} processes):")
+    print("------------------------------------------------------------------")
+    print("{:<10} {:>8} {:>11} {:>11} {:>11} {:>8}".format("Stage", "Calls", "Total (s)", "Mean (ms)", "Max (ms)", "Share"))
+    print("------------------------------------------------------------------")
+    for name, calls, total, mean_ms, max_ms, percent in rows:
+        print("{:<10} {:>8} {:>11.2f} {:>11.1f} {:>11.1f} {:>7.1f}%".format(
+            name, calls, total, mean_ms, max_ms, percent))
+    print("------------------------------------------------------------------")
+    print("Totals are summed over all worker processes, so they can exceed wall time.\n")
+
+
+def write_trace(records, path):
+    """Write records as Chrome trace-event JSON; one track per process/thread."""
+    events = []
+    main_pid = os.getpid()
+    for pid in sorted({r["pid"] for r in records}):
+        events.append({
+            "name": "process_name", "ph": "M", "pid": pid,
+            "args": {"name": "main" if pid == main_pid else f"worker {pid}"},
+        })
+    for r in records:
+        args = {}
+        if r["folder"]:
+            args["folder"] = r["folder"]
+        if r["page"] is not None:
+            args["page"] = r["page"]
+        events.append({
+            "name": r["stage"],
+            "cat": "pdf_forger",
+            "ph": "X",
+            "ts": round(r["start"] * 1e6),
+            "dur": round(r["dur"] * 1e6),
+            "pid": r["pid"],
+            "tid": r["tid"],
+            "args": args,
+        })
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+    return path